@@ -0,0 +1,79 @@
+"""
+Bytes on the wire and server CPU per request for the dashboard routes:
+uncompressed, gzip, brotli (when installed) and a revalidation that is
+answered 304 Not Modified. Runs in-process against the offline stub; CPU
+is the request thread's, so the stub's own work is not counted.
+
+    python bench/bench_compression.py --requests 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+sys.path.insert(0, ROOT)
+
+ADDRESS = "0x87d1910BE2AaE6D9C22F15AC9009Ec8Ca8706BAd"
+
+# name -> (method, path, JSON body)
+ROUTES = {
+    "index": ("GET", "/", None),
+    "account_info": ("POST", "/get_account_info", {"address": ADDRESS}),
+    "open_orders": ("POST", "/get_open_orders", {"address": ADDRESS}),
+    "portfolio_summary": ("POST", "/get_portfolio_summary", {}),
+    "balances": ("GET", f"/api/v1/balances?address={ADDRESS}", None),
+    "history": ("GET", f"/api/history?address={ADDRESS}", None),
+}
+
+
+def wire_bytes(response):
+    """Status line, headers and body as they would be sent"""
+    headers = sum(len(name) + len(value) + 4 for name, value in response.headers.items())
+    return len(f"HTTP/1.1 {response.status}\r\n") + headers + 2 + len(response.data)
+
+
+def measure(client, method, path, body, headers, requests_count):
+    sizes = []
+    start = time.thread_time()
+    for _ in range(requests_count):
+        response = client.open(path, method=method, json=body, headers=headers)
+        sizes.append(wire_bytes(response))
+    cpu = (time.thread_time() - start) / requests_count
+    return response.status_code, sum(sizes) / len(sizes), cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200, help="requests per route and mode")
+    args = parser.parse_args()
+
+    from stub_server import STUB_CLIENT_ENV, start_stub_server
+    _, stub_url = start_stub_server()
+    os.environ["HL_API_URL"] = stub_url
+    os.environ.update(STUB_CLIENT_ENV)
+    os.environ["HL_HISTORY_DB"] = os.path.join(tempfile.mkdtemp(), "history.db")
+    import ux
+
+    client = ux.app.test_client()
+    ux.take_snapshot([ADDRESS])
+    modes = {"identity": {}, "gzip": {"Accept-Encoding": "gzip"}}
+    if ux.brotli is not None:
+        modes["br"] = {"Accept-Encoding": "br, gzip"}
+
+    print(f"{'route':<18} {'mode':<9} {'status':>6} {'bytes':>8} {'CPU/request':>12}")
+    for name, (method, path, body) in ROUTES.items():
+        client.open(path, method=method, json=body)  # warm caches
+        for mode, headers in modes.items():
+            status, size, cpu = measure(client, method, path, body, headers, args.requests)
+            print(f"{name:<18} {mode:<9} {status:>6} {size:>8.0f} {cpu * 1000:>10.3f}ms")
+        etag = client.open(path, method=method, json=body, headers={"Accept-Encoding": "gzip"}).headers.get("ETag")
+        headers = {"Accept-Encoding": "gzip", "If-None-Match": etag}
+        status, size, cpu = measure(client, method, path, body, headers, args.requests)
+        print(f"{name:<18} {'304':<9} {status:>6} {size:>8.0f} {cpu * 1000:>10.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Order and cancel latency: example_utils_3.setup per call (old behaviour)
+against the shared warm exchange client.
+
+Runs against the local stub by default; example_utils_3 still needs its
+config with a signing key.
+
+    python bench/bench_exchange_client.py --orders 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_server import STUB_CLIENT_ENV, start_stub_server  # noqa: E402
+
+
+def report(label, samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<24} p50={statistics.median(samples) * 1000:8.2f}ms p99={p99 * 1000:8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=50)
+    parser.add_argument("--base-url", help="API base URL (defaults to a local stub)")
+    args = parser.parse_args()
+
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        _, base_url = start_stub_server()
+    os.environ["HL_API_URL"] = base_url
+    os.environ.update(STUB_CLIENT_ENV)
+    import example_utils_3
+    import ux
+
+    cold_orders, cold_cancels, warm_orders, warm_cancels = [], [], [], []
+    for _ in range(args.orders):
+        start = time.perf_counter()
+        _, _, exchange = example_utils_3.setup(base_url=base_url, skip_ws=True)
+        result = exchange.order("@153", True, 20.0, 0.9, {"limit": {"tif": "Gtc"}})
+        cold_orders.append(time.perf_counter() - start)
+        oid = result["response"]["data"]["statuses"][0]["resting"]["oid"]
+
+        start = time.perf_counter()
+        _, _, exchange = example_utils_3.setup(base_url=base_url, skip_ws=True)
+        exchange.cancel("@153", oid)
+        cold_cancels.append(time.perf_counter() - start)
+
+    ux.get_exchange_client()  # warm up
+    for _ in range(args.orders):
+        start = time.perf_counter()
+        result = ux.runtime.run(ux.make_an_order("@153", True, 20.0, 0.9))
+        warm_orders.append(time.perf_counter() - start)
+        oid = result["response"]["data"]["statuses"][0]["resting"]["oid"]
+
+        start = time.perf_counter()
+        ux.run_async_cancel("@153", oid)
+        warm_cancels.append(time.perf_counter() - start)
+
+    report("order, setup per call", cold_orders)
+    report("order, warm client", warm_orders)
+    report("cancel, setup per call", cold_cancels)
+    report("cancel, warm client", warm_cancels)
+
+
+if __name__ == "__main__":
+    main()
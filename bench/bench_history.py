@@ -0,0 +1,83 @@
+"""
+Portfolio history: range queries against a store holding months of
+minute-level snapshots, through the hourly rollup and the raw table.
+
+    python bench/bench_history.py --days 90 --coins 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ux  # noqa: E402
+
+ADDRESS = "0x0000000000000000000000000000000000000001"
+
+
+def fill(store, days, coins, interval):
+    rng = random.Random(7)
+    end = int(time.time()) // interval * interval
+    start = end - days * 86400
+    prices = [rng.uniform(1, 100) for _ in range(coins)]
+    rows = []
+    for ts in range(start, end, interval):
+        total = 0.0
+        for j in range(coins):
+            prices[j] *= 1 + rng.gauss(0, 0.001)
+            value = 100 * prices[j]
+            total += value
+            rows.append((ts, ADDRESS, f"TKN{j}", 100.0, 0.0, prices[j], value))
+        rows.append((ts, ADDRESS, ux.WALLET_TOTAL, total, 0.0, 1.0, total))
+        if len(rows) >= 100000:
+            store.append(rows)
+            rows = []
+    store.append(rows)
+    return start, end
+
+
+def timed(label, func, repeat=20):
+    func()  # warm the page cache and connection
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    print(f"{label:<52} {(time.perf_counter() - start) * 1000 / repeat:8.2f}ms  ({len(result['t'])} buckets)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--coins", type=int, default=5)
+    parser.add_argument("--interval", type=int, default=60)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ux.HistoryStore(os.path.join(tmp, "history.db"))
+        began = time.perf_counter()
+        start, end = fill(store, args.days, args.coins, args.interval)
+        rows = (end - start) // args.interval * (args.coins + 1)
+        print(f"{rows:,} snapshot rows over {args.days} days in {time.perf_counter() - began:.1f}s")
+
+        day = end - 86400
+        week = end - 7 * 86400
+        timed("wallet total, full range, auto bucket",
+              lambda: store.query(ADDRESS, ux.WALLET_TOTAL, start, end, ux.history_bucket(start, end)))
+        timed("wallet total, full range, daily OHLC",
+              lambda: store.query(ADDRESS, ux.WALLET_TOTAL, start, end, 86400))
+        timed("one coin, last week, hourly OHLC",
+              lambda: store.query(ADDRESS, "TKN0", week, end, 3600))
+        timed("wallet total, last day, 5 minute OHLC (raw rows)",
+              lambda: store.query(ADDRESS, ux.WALLET_TOTAL, day, end, 300))
+        timed("wallet total, last 3 days, 5 minute OHLC (raw rows)",
+              lambda: store.query(ADDRESS, ux.WALLET_TOTAL, end - 3 * 86400, end, 300))
+        timed("wallet total, full range, unbounded raw scan",
+              lambda: store.query(ADDRESS, ux.WALLET_TOTAL, start, end, 900), repeat=3)
+        print(f"/api/history serves a 15 minute request over {args.days} days with "
+              f"{ux.history_bucket(start, end, 900)}s buckets from the rollup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Time-to-first-byte for GET / under concurrent load, with and without
+If-None-Match revalidation.
+
+    python bench/bench_index.py --requests 2000 --threads 16
+"""
+import argparse
+import http.client
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ux  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(port, requests_count, threads, headers):
+    local = threading.local()
+    ttfb = []
+
+    def fetch(_):
+        if not hasattr(local, "conn"):
+            local.conn = http.client.HTTPConnection("127.0.0.1", port)
+        start = time.perf_counter()
+        local.conn.request("GET", "/", headers=headers)
+        response = local.conn.getresponse()  # returns once the status line and headers arrived
+        ttfb.append(time.perf_counter() - start)
+        response.read()
+        return response.status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        statuses = list(pool.map(fetch, range(requests_count)))
+    elapsed = time.perf_counter() - start
+    return statuses, ttfb, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    server = make_server("127.0.0.1", 0, ux.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+    etag = f'"{ux._index_page[1]}"'
+
+    for label, headers in (("full page", {}), ("If-None-Match", {"If-None-Match": etag})):
+        statuses, ttfb, elapsed = run(port, args.requests, args.threads, headers)
+        print(f"{label:<14} status={sorted(set(statuses))} req/s={len(ttfb) / elapsed:8.1f} "
+              f"ttfb p50={statistics.median(ttfb) * 1000:6.2f}ms p99={percentile(ttfb, 99) * 1000:6.2f}ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
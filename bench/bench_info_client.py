@@ -0,0 +1,73 @@
+"""
+Compare bare requests.post against the pooled /info session.
+
+Reports upstream connections opened (one handshake each) and p50/p99
+latency for sequential and concurrent callers against the local stub.
+Every call asks about a different user, so the pooled session can't
+answer concurrent callers from one coalesced request.
+
+    python bench/bench_info_client.py --calls 500 --threads 8
+"""
+import argparse
+import itertools
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_server import STUB_CLIENT_ENV, start_stub_server  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(label, call, calls, threads, server):
+    server.connections = 0
+    server.requests = 0
+    latencies = []
+
+    def timed(_):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(timed, range(calls)))
+
+    print(f"{label:<28} conns={server.connections:<5} reqs={server.requests:<5} "
+          f"p50={statistics.median(latencies) * 1000:7.2f}ms p99={percentile(latencies, 99) * 1000:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server()
+    os.environ["HL_API_URL"] = base_url
+    os.environ.update(STUB_CLIENT_ENV)
+    import ux
+
+    users = itertools.count()
+
+    def bare():
+        requests.post(f"{base_url}/info", json={"type": "openOrders", "user": f"0x{next(users):040x}"},
+                      headers={"Content-Type": "application/json"}, timeout=10).json()
+
+    def pooled():
+        ux.make_api_request("openOrders", f"0x{next(users):040x}")
+
+    for threads in (1, args.threads):
+        run(f"bare requests.post x{threads}", bare, args.calls, threads, server)
+        run(f"pooled session x{threads}", pooled, args.calls, threads, server)
+
+
+if __name__ == "__main__":
+    main()
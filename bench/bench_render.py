@@ -0,0 +1,64 @@
+"""
+Payload size and server time: legacy pre-rendered HTML endpoints against
+the /api/v1 JSON endpoints, for an account with many balances and orders.
+
+    python bench/bench_render.py --balances 300 --orders 200 --requests 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import stub_server  # noqa: E402
+
+
+def scale_fixtures(balances, orders):
+    """Grow the stub's account to the requested number of balances and open orders"""
+    stub_server.INFO_RESPONSES["spotClearinghouseState"] = {"balances": [
+        {"coin": "HYPE" if i % 2 else "FUSD", "token": 2, "total": f"{1000 + i}.125", "hold": "1.5", "entryNtl": "0.0"}
+        for i in range(balances)
+    ]}
+    stub_server.INFO_RESPONSES["openOrders"] = [
+        {"coin": "@153", "side": "B" if i % 2 else "A", "limitPx": "0.999", "sz": f"{10 + i}.0", "oid": 5000 + i,
+         "timestamp": 1760000000000 + i, "origSz": f"{10 + i}.0"}
+        for i in range(orders)
+    ]
+
+
+def measure(client, method, url, body, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        response = client.open(url, method=method, json=body)
+    elapsed = (time.perf_counter() - start) / count
+    return len(response.data), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--balances", type=int, default=300)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    scale_fixtures(args.balances, args.orders)
+    _, base_url = stub_server.start_stub_server()
+    os.environ["HL_API_URL"] = base_url
+    os.environ.update(stub_server.STUB_CLIENT_ENV)
+    import ux
+
+    client = ux.app.test_client()
+    address = ux.LEDGER_ADDRESS
+    cases = [
+        ("POST /get_account_info", "POST", "/get_account_info", {"address": address}),
+        ("GET /api/v1/balances", "GET", f"/api/v1/balances?address={address}", None),
+        ("POST /get_open_orders", "POST", "/get_open_orders", {"address": address}),
+        ("GET /api/v1/orders", "GET", f"/api/v1/orders?address={address}", None),
+    ]
+    for label, method, url, body in cases:
+        size, elapsed = measure(client, method, url, body, args.requests)
+        print(f"{label:<26} {size:>9,} bytes  {elapsed * 1000:7.2f}ms/request")
+
+
+if __name__ == "__main__":
+    main()
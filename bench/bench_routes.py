@@ -0,0 +1,181 @@
+"""
+Throughput and latency of every Flask route, tracked across commits.
+
+By default the app runs in-process against the offline stub; pass
+--base-url to measure a server that is already running (for example
+`python ux.py serve` with HL_API_URL pointing at bench/stub_server.py
+--fund <signing address> and HL_INFO_WEIGHT_LIMIT lifted as in
+stub_server.STUB_CLIENT_ENV).
+Each run is appended to --results with the current commit and compared
+with the previous run for the same base URL.
+
+    python bench/bench_routes.py --requests 300 --clients 8
+    python bench/bench_routes.py --base-url http://127.0.0.1:5000 --routes balances,orders
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+sys.path.insert(0, ROOT)
+
+ADDRESS = "0x87d1910BE2AaE6D9C22F15AC9009Ec8Ca8706BAd"
+DEFAULT_RESULTS = os.path.join(ROOT, "bench", "results", "routes.jsonl")
+
+# name -> (method, path, JSON body); every request must answer 200 with success true
+ROUTES = {
+    "index": ("GET", "/", None),
+    "tokens": ("GET", "/api/tokens", None),
+    "balances": ("GET", f"/api/v1/balances?address={ADDRESS}", None),
+    "orders": ("GET", f"/api/v1/orders?address={ADDRESS}", None),
+    "account_info": ("POST", "/get_account_info", {"address": ADDRESS}),
+    "open_orders": ("POST", "/get_open_orders", {"address": ADDRESS}),
+    "portfolio_summary": ("POST", "/get_portfolio_summary", {}),
+    "history": ("GET", f"/api/history?address={ADDRESS}", None),
+    "market_data_status": ("GET", "/api/v1/market_data/status", None),
+    "scheduler_status": ("GET", "/api/v1/info_scheduler/status", None),
+    "order_mirror_status": ("GET", "/api/v1/order_mirror/status", None),
+    "metrics": ("GET", "/metrics", None),
+    "make_order": ("POST", "/make_order", {"coin": "@153", "buy_or_sell": True, "size": 20, "price": 0.99}),
+    "make_orders": ("POST", "/make_orders", {"orders": [
+        {"coin": "@153", "buy_or_sell": True, "size": 20, "price": 0.99},
+        {"coin": "@107", "buy_or_sell": False, "size": 1, "price": 40},
+    ]}),
+    "cancel_all_orders": ("POST", "/cancel_all_orders", {"coin": "@153"}),
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def succeeded(response, payload):
+    if response.status != 200:
+        return False
+    if response.getheader("Content-Type", "").startswith("application/json"):
+        return json.loads(payload).get("success", False)
+    return True
+
+
+def measure(host, port, method, path, body, requests_count, clients):
+    local = threading.local()
+    data = json.dumps(body) if body is not None else None
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    latencies = []
+
+    def fetch(_):
+        if not hasattr(local, "conn"):
+            local.conn = http.client.HTTPConnection(host, port, timeout=30)
+        start = time.perf_counter()
+        try:
+            local.conn.request(method, path, body=data, headers=headers)
+            response = local.conn.getresponse()
+            ok = succeeded(response, response.read())
+        except (OSError, http.client.HTTPException):
+            local.conn.close()
+            del local.conn
+            ok = False
+        latencies.append(time.perf_counter() - start)
+        return ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(fetch, range(requests_count)))
+    elapsed = time.perf_counter() - start
+    return {
+        "rps": len(results) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": results.count(False),
+    }
+
+
+def start_local_app():
+    """Serve ux in-process against the stub and return its base URL"""
+    from stub_server import STUB_CLIENT_ENV, start_stub_server
+    from werkzeug.serving import make_server
+
+    stub, stub_url = start_stub_server()
+    os.environ["HL_API_URL"] = stub_url
+    os.environ.update(STUB_CLIENT_ENV)
+    os.environ["HL_HISTORY_DB"] = os.path.join(tempfile.mkdtemp(), "history.db")
+    import ux
+    stub.fund(ux.get_exchange_client()[0])  # the order routes are checked against the signer's balances
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # no access log line per request
+    server = make_server("127.0.0.1", 0, ux.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def previous_run(path, base_url):
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path) as f:
+        for line in f:
+            run = json.loads(line)
+            if run.get("base_url") == base_url:
+                previous = run
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", help="server to measure; default runs ux in-process against the stub")
+    parser.add_argument("--requests", type=int, default=300, help="requests per route")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent keep-alive clients")
+    parser.add_argument("--routes", help=f"comma-separated subset of: {', '.join(ROUTES)}")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="JSON lines file runs are appended to")
+    args = parser.parse_args()
+
+    base_url = args.base_url or start_local_app()
+    label = args.base_url or "in-process"
+    target = urlsplit(base_url)
+    names = args.routes.split(",") if args.routes else list(ROUTES)
+    previous = previous_run(args.results, label)
+    commit = current_commit()
+
+    print(f"{commit}: {args.requests} requests per route from {args.clients} clients against {base_url}")
+    if previous:
+        print(f"compared with {previous['commit']} ({previous['timestamp']})")
+    routes = {}
+    for name in names:
+        method, path, body = ROUTES[name]
+        measure(target.hostname, target.port, method, path, body, args.clients, args.clients)  # warm up
+        result = routes[name] = measure(target.hostname, target.port, method, path, body, args.requests, args.clients)
+        change = ""
+        before = (previous or {}).get("routes", {}).get(name)
+        if before:
+            change = f"  rps {(result['rps'] / before['rps'] - 1) * 100:+6.1f}%  p99 {(result['p99_ms'] / before['p99_ms'] - 1) * 100:+6.1f}%"
+        print(f"  {name:<20} {result['rps']:8.0f} req/s  p50 {result['p50_ms']:7.1f}ms  p99 {result['p99_ms']:7.1f}ms"
+              f"  errors {result['errors']}{change}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    with open(args.results, "a") as f:
+        f.write(json.dumps({"commit": commit, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "base_url": label,
+                            "requests": args.requests, "clients": args.clients, "routes": routes}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+/info scheduler: upstream requests for a burst of identical refreshes with
+single-flight coalescing, and how long order-critical queries wait behind
+background refreshes once the rate-limit budget runs out.
+
+    python bench/bench_scheduler.py --callers 50 --latency 0.05
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_server import start_stub_server  # noqa: E402
+
+ADDRESS = "0x87d1910BE2AaE6D9C22F15AC9009Ec8Ca8706BAd"
+
+
+def burst(ux, server, callers, body):
+    """Fire callers identical queries at once; return (upstream requests, wall time)"""
+    before = server.requests
+    barrier = threading.Barrier(callers)
+
+    def call(_):
+        barrier.wait()
+        return ux.post_info(body).status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        statuses = list(pool.map(call, range(callers)))
+    assert statuses == [200] * callers
+    return server.requests - before, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--callers", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub upstream latency in seconds")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(latency=args.latency)
+    os.environ["HL_API_URL"] = url
+    import ux
+
+    print(f"{args.callers} concurrent identical queries, {args.latency * 1000:.0f}ms upstream latency")
+    for body in ({"type": "spotMetaAndAssetCtxs"}, {"type": "openOrders", "user": ADDRESS}):
+        upstream, elapsed = burst(ux, server, args.callers, body)
+        print(f"  {body['type']:<22} {upstream:3d} upstream requests in {elapsed * 1000:6.1f}ms")
+
+    # A tiny budget (20 weight, refilled at 2 weight/s) that a burst of background refreshes overruns
+    ux.info_scheduler = ux.InfoScheduler(weight_limit=20, window=10)
+    waits = {"background": [], "order": []}
+
+    def timed(kind, body, priority):
+        start = time.perf_counter()
+        ux.post_info(body, priority=priority)
+        waits[kind].append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        futures = [pool.submit(timed, "background", {"type": "spotClearinghouseState", "user": f"0x{i:040x}"},
+                               ux.PRIORITY_BACKGROUND) for i in range(20)]
+        time.sleep(0.5)  # the bucket is empty and ten refreshes are queued
+        futures += [pool.submit(timed, "order", {"type": "orderStatus", "user": ADDRESS, "oid": i}, None)
+                    for i in range(4)]
+        time.sleep(0.1)
+        status = ux.info_scheduler.status()
+        print(f"budget {status['budget_available']:.1f}/{status['budget_capacity']:.0f}, "
+              f"queued by priority {status['queue_by_priority']}")
+        for future in futures:
+            future.result()
+
+    for kind, samples in waits.items():
+        print(f"  {kind:<22} mean wait {statistics.mean(samples):6.2f}s  max {max(samples):6.2f}s")
+
+if __name__ == "__main__":
+    main()
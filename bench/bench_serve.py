@@ -0,0 +1,118 @@
+"""
+Load test for POST /get_account_info against the stub upstream: the
+Flask development server against `python ux.py serve` under gunicorn.
+
+    python bench/bench_serve.py --clients 32 --requests 4000 --workers 4 --threads 8
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+from stub_server import STUB_CLIENT_ENV  # noqa: E402
+ADDRESS = "0x87d1910BE2AaE6D9C22F15AC9009Ec8Ca8706BAd"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"nothing listening on port {port}")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(port, requests_count, clients):
+    local = threading.local()
+    body = json.dumps({"address": ADDRESS})
+    latencies = []
+
+    def fetch(_):
+        if not hasattr(local, "conn"):
+            local.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        start = time.perf_counter()
+        try:
+            local.conn.request("POST", "/get_account_info", body=body, headers={"Content-Type": "application/json"})
+            response = local.conn.getresponse()
+            ok = response.status == 200 and json.loads(response.read()).get("success")
+        except (OSError, http.client.HTTPException):
+            local.conn.close()
+            del local.conn
+            ok = False
+        latencies.append(time.perf_counter() - start)
+        return ok
+
+    run_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(fetch, range(requests_count)))
+    return results, latencies, time.perf_counter() - run_start
+
+
+def bench(label, command, port, env, args):
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(port)
+        run(port, args.clients * 4, args.clients)  # warm the caches and exchange client
+        results, latencies, elapsed = run(port, args.requests, args.clients)
+    finally:
+        server.terminate()
+        server.wait()
+    errors = results.count(False)
+    print(f"{label:<36} {len(results) / elapsed:8.0f} req/s   p50 {statistics.median(latencies) * 1000:6.1f}ms"
+          f"   p99 {percentile(latencies, 99) * 1000:7.1f}ms   errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    stub_port = free_port()
+    stub = subprocess.Popen([sys.executable, os.path.join(ROOT, "bench", "stub_server.py"), "--port", str(stub_port)],
+                            stdout=subprocess.DEVNULL)
+    wait_for(stub_port)
+    env = dict(os.environ, HL_API_URL=f"http://127.0.0.1:{stub_port}", HL_SNAPSHOT_INTERVAL="0", PYTHONUNBUFFERED="1",
+               **STUB_CLIENT_ENV)
+    print(f"{args.requests} requests from {args.clients} keep-alive clients")
+
+    try:
+        port = free_port()
+        bench("flask dev server (threaded)",
+              [sys.executable, "-c", f"import ux; ux.app.run(host='127.0.0.1', port={port}, threaded=True)"],
+              port, env, args)
+        port = free_port()
+        bench(f"ux.py serve ({args.workers} workers x {args.threads} threads)",
+              [sys.executable, "ux.py", "serve", "--bind", f"127.0.0.1:{port}",
+               "--workers", str(args.workers), "--threads", str(args.threads)],
+              port, env, args)
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
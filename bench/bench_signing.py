@@ -0,0 +1,76 @@
+"""
+Order signing: one EIP-712 signature per order action on a single thread
+(what the SDK does on every order) against SigningService's process pool,
+for bursts of 1, 10 and 100 orders.
+
+    python bench/bench_signing.py --workers 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import eth_account
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ux  # noqa: E402
+from hyperliquid.utils import constants, signing  # noqa: E402
+
+BURSTS = (1, 10, 100)
+
+
+def order_actions(count):
+    return [signing.order_wires_to_order_action([{
+        "a": 10153, "b": True, "p": signing.float_to_wire(0.99), "s": signing.float_to_wire(20 + i),
+        "r": False, "t": {"limit": {"tif": "Gtc"}},
+    }]) for i in range(count)]
+
+
+def serial(exchange, actions):
+    for action in actions:
+        signing.sign_l1_action(exchange.wallet, action, None, signing.get_timestamp_ms(), None, True)
+
+
+def pooled(service, exchange, actions):
+    async def sign_all():
+        return await asyncio.gather(*(service.sign(exchange, action) for action in actions))
+    ux.runtime.run(sign_all())
+
+
+def orders_per_second(func, count, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return count * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    wallet = eth_account.Account.create()
+    exchange = SimpleNamespace(wallet=wallet, vault_address=None, expires_after=None, base_url=constants.MAINNET_API_URL)
+    service = ux.SigningService(workers=args.workers)
+    service.start(wallet)
+    threaded = ux.SigningService(workers=0)
+
+    print(f"{os.cpu_count()} CPUs, {args.workers} signing processes")
+    print(f"{'orders':>6} {'serial':>12} {'SDK threads':>12} {'process pool':>13}   orders/s")
+    for count in BURSTS:
+        actions = order_actions(count)
+        repeat = max(args.repeat * 10 // count, 1)
+        rates = [
+            orders_per_second(lambda: serial(exchange, actions), count, repeat),
+            orders_per_second(lambda: pooled(threaded, exchange, actions), count, repeat),
+            orders_per_second(lambda: pooled(service, exchange, actions), count, repeat),
+        ]
+        print(f"{count:>6} {rates[0]:>12.0f} {rates[1]:>12.0f} {rates[2]:>13.0f}")
+    service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
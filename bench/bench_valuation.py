@@ -0,0 +1,87 @@
+"""
+Portfolio valuation: the previous per-dict loop against the columnar
+engine (value_portfolios), for many wallets holding many tokens. The
+summarize_portfolios rows are the whole /get_portfolio_summary valuation,
+with per-wallet asset records and without them (what the page asks for).
+
+    python bench/bench_valuation.py --wallets 1000 --tokens 300
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ux  # noqa: E402
+
+
+def per_dict_value(balances, asset_data):
+    """The per-coin valuation loop used before the columnar engine"""
+    symbol_to_id, prices = asset_data
+    portfolio = []
+    total_value_usdc = 0.0
+    for balance in balances:
+        coin = balance.get('coin', '')
+        try:
+            balance_amount = float(balance.get('total', '0'))
+            hold_amount = float(balance.get('hold', '0') or 0)
+            if balance_amount <= 0:
+                continue
+        except (ValueError, TypeError):
+            continue
+        asset_id = symbol_to_id.get(coin, coin)
+        if coin == 'USDC':
+            price_usdc = 1.0
+        else:
+            price_usdc = prices.get(asset_id, 0.0) or prices.get(coin, 0.0)
+        usdc_value = balance_amount * price_usdc
+        portfolio.append({'coin': coin, 'asset_id': asset_id, 'total_balance': balance_amount,
+                          'hold_balance': hold_amount, 'price_usdc': price_usdc, 'value_usdc': usdc_value})
+        total_value_usdc += usdc_value
+    portfolio.sort(key=lambda x: x['value_usdc'], reverse=True)
+    return portfolio, total_value_usdc
+
+
+def make_accounts(wallets, tokens):
+    rng = random.Random(7)
+    names = ['USDC'] + [f"TKN{i}" for i in range(1, tokens)]
+    symbol_to_id = {name: f"@{i}" for i, name in enumerate(names)}
+    prices = {f"@{i}": rng.uniform(0.001, 100.0) for i in range(tokens)}
+    accounts = [
+        [{'coin': name, 'token': i, 'total': f"{rng.uniform(0, 10000):.8f}", 'hold': f"{rng.uniform(0, 10):.8f}"}
+         for i, name in enumerate(names)]
+        for _ in range(wallets)
+    ]
+    return accounts, (symbol_to_id, prices)
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<44} {(time.perf_counter() - start) * 1000:9.1f}ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--wallets", type=int, default=1000)
+    parser.add_argument("--tokens", type=int, default=300)
+    args = parser.parse_args()
+
+    accounts, asset_data = make_accounts(args.wallets, args.tokens)
+    print(f"{args.wallets} wallets x {args.tokens} tokens")
+
+    loop = timed("per-dict loop, every wallet", lambda: [per_dict_value(b, asset_data) for b in accounts])
+    valuation = timed("value_portfolios, one matrix", lambda: ux.value_portfolios(accounts, asset_data))
+    timed("per-wallet asset dicts from the matrix", lambda: [valuation.wallet_assets(i) for i in range(args.wallets)])
+    by_address = {f"wallet{i}": balances for i, balances in enumerate(accounts)}
+    timed("summarize_portfolios, with wallet assets", lambda: ux.summarize_portfolios(by_address, asset_data))
+    timed("summarize_portfolios, totals and per coin", lambda: ux.summarize_portfolios(by_address, asset_data, False))
+
+    expected = sum(total for _, total in loop)
+    print(f"grand total check: loop={expected:,.2f} engine={valuation.wallet_totals.sum():,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Mixed browser-like load for locust; --host is the server under test.
+
+    HL_API_URL=http://127.0.0.1:8765 HL_INFO_WEIGHT_LIMIT=1000000000 python ux.py serve --bind 127.0.0.1:5000
+    locust -f bench/locustfile.py --host http://127.0.0.1:5000 --headless -u 50 -r 10 -t 1m --csv bench/results/locust
+
+Order placement is off unless HL_LOCUST_ORDERS=1, so pointing this at a
+server wired to mainnet cannot trade. Against the stub, start it with
+--fund <signing address> so the orders pass the pre-trade balance check.
+"""
+import os
+
+from locust import HttpUser, between, tag, task
+
+ADDRESSES = [
+    "0x87d1910BE2AaE6D9C22F15AC9009Ec8Ca8706BAd",
+    "0x2a21Cc5D8Bcaa0D10078C99606B03Ee46C58817d",
+    "0x62E485fD0e5c7D32f8cCF11aa356A1179C76e400",
+]
+PLACE_ORDERS = os.environ.get("HL_LOCUST_ORDERS", "0") == "1"
+
+
+class PortfolioUser(HttpUser):
+    wait_time = between(0.5, 2)
+
+    def on_start(self):
+        self.address = ADDRESSES[id(self) % len(ADDRESSES)]
+        self.client.get("/", name="/")
+        self.client.get("/api/tokens", name="/api/tokens")
+
+    def get_json(self, path, name):
+        with self.client.get(path, name=name, catch_response=True) as response:
+            if response.status_code == 200 and not response.json().get("success"):
+                response.failure(response.json().get("error"))
+
+    @task(5)
+    def balances(self):
+        self.get_json(f"/api/v1/balances?address={self.address}", "/api/v1/balances")
+
+    @task(5)
+    def orders(self):
+        self.get_json(f"/api/v1/orders?address={self.address}", "/api/v1/orders")
+
+    @task(2)
+    def portfolio_summary(self):
+        self.client.post("/get_portfolio_summary", json={}, name="/get_portfolio_summary")
+
+    @task(1)
+    def history(self):
+        self.get_json(f"/api/history?address={self.address}", "/api/history")
+
+    @tag("orders")
+    @task(1)
+    def place_and_cancel(self):
+        if not PLACE_ORDERS:
+            return
+        submission = self.client.post("/make_order", json={"coin": "@153", "buy_or_sell": True, "size": 20,
+                                                           "price": 0.99}, name="/make_order").json()
+        if submission.get("success"):
+            self.client.get(f"/order_status/{submission['data']['id']}?wait=10", name="/order_status/[id]")
+            self.client.post("/cancel_all_orders", json={"coin": "@153"}, name="/cancel_all_orders")
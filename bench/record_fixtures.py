@@ -0,0 +1,58 @@
+"""
+Record live /info payloads into bench/fixtures for the stub server to replay.
+
+    python bench/record_fixtures.py --address 0x... [--coins @107,@153] [--per-user]
+
+Without --per-user the wallet's balances and open orders become the default
+answer for every user; with it they are saved for that address only.
+"""
+import argparse
+import json
+import os
+import sys
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from stub_server import FIXTURES_DIR  # noqa: E402
+
+MAINNET_INFO_URL = "https://api.hyperliquid.xyz/info"
+GLOBAL_TYPES = ("meta", "spotMeta", "spotMetaAndAssetCtxs", "allMids")
+USER_TYPES = ("spotClearinghouseState", "clearinghouseState", "openOrders")
+
+
+def save(directory, name, payload):
+    path = os.path.join(directory, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+    print(f"wrote {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--address", required=True)
+    parser.add_argument("--coins", default="@107,@153,PURR/USDC", help="l2Book snapshots to record")
+    parser.add_argument("--per-user", action="store_true")
+    parser.add_argument("--info-url", default=MAINNET_INFO_URL)
+    parser.add_argument("--out", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    session = requests.Session()
+
+    def query(body):
+        response = session.post(args.info_url, json=body, timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    for request_type in GLOBAL_TYPES:
+        save(args.out, request_type, query({"type": request_type}))
+    for request_type in USER_TYPES:
+        name = f"{request_type}.{args.address.lower()}" if args.per_user else request_type
+        save(args.out, name, query({"type": request_type, "user": args.address}))
+    for coin in filter(None, args.coins.split(",")):
+        save(args.out, f"l2Book.{coin.replace('/', '-')}", query({"type": "l2Book", "coin": coin}))
+
+
+if __name__ == "__main__":
+    main()
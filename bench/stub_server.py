@@ -0,0 +1,301 @@
+"""
+Offline stand-in for the Hyperliquid /info and /exchange endpoints.
+
+/info replays the recorded payloads in bench/fixtures (see
+record_fixtures.py): <type>.json answers every query of that type, and
+<type>.<user>.json or <type>.<coin>.json (with / written as -) answer one
+user or coin. /exchange verifies the signer of order and cancel actions and
+keeps the orders it accepts, so they show up in openOrders and orderStatus
+and can be cancelled. Latency, HTTP errors and dropped connections can be
+injected at startup or at runtime through POST /_stub/config. The recorded
+balances are small, so the wallet that places orders (which the app checks
+them against) can be funded with STUB_FUNDING of every spot token.
+
+    python bench/stub_server.py --port 8765 --latency 0.05 --error-rate 0.01
+    python bench/stub_server.py --port 8765 --fund 0xSignerAddress
+    HL_API_URL=http://127.0.0.1:8765 HL_INFO_WEIGHT_LIMIT=1000000000 python ux.py serve
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from hyperliquid.utils.signing import recover_agent_or_user_from_l1_action
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SPOT_ASSET_OFFSET = 10000  # spot asset ids in signed actions are 10000 + the spot market index
+# The stub has no rate limit, so clients measured against it lift their /info budget too
+STUB_CLIENT_ENV = {"HL_INFO_WEIGHT_LIMIT": "1000000000"}
+STUB_FUNDING = 1e9  # of every spot token, for funded wallets
+DEFAULT_CONFIG = {
+    "latency": 0.0,  # seconds added to every answer
+    "jitter": 0.0,  # up to this many extra seconds, uniformly distributed
+    "error_rate": 0.0,  # share of requests answered with error_status
+    "error_status": 500,
+    "drop_rate": 0.0,  # share of requests whose connection is closed without an answer
+}
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """Read every <type>[.<key>].json in directory into {"type" or "type.key": payload}"""
+    fixtures = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".json"):
+            with open(os.path.join(directory, filename)) as f:
+                fixtures[filename[:-len(".json")]] = json.load(f)
+    return fixtures
+
+
+INFO_RESPONSES = load_fixtures()
+
+
+class StubExchange:
+    """Orders accepted by the stub, keyed by oid, and the recorded orders users cancelled"""
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self._lock = threading.Lock()
+        self._next_oid = 2000
+        self.orders = {}
+        self.cancelled = set()  # (user, oid) of fixture orders
+
+    def coin_for_asset(self, asset):
+        for market in self.fixtures.get("spotMeta", {}).get("universe", []):
+            if SPOT_ASSET_OFFSET + market["index"] == asset:
+                return market["name"]
+        for index, market in enumerate(self.fixtures.get("meta", {}).get("universe", [])):
+            if index == asset:
+                return market["name"]
+        return None
+
+    def open_orders(self, user, recorded):
+        user = (user or "").lower()
+        with self._lock:
+            orders = [order for order in recorded or [] if (user, order.get("oid")) not in self.cancelled]
+            orders += [dict(order) for order in self.orders.values() if order["user"] == user]
+        for order in orders:
+            order.pop("user", None)
+        return orders
+
+    def place(self, user, action):
+        statuses = []
+        with self._lock:
+            for wire in action.get("orders", []):
+                coin = self.coin_for_asset(wire.get("a"))
+                if coin is None:
+                    statuses.append({"error": f"Invalid asset {wire.get('a')}"})
+                    continue
+                oid = self._next_oid
+                self._next_oid += 1
+                self.orders[oid] = {
+                    "coin": coin, "side": "B" if wire.get("b") else "A", "limitPx": wire.get("p"), "sz": wire.get("s"),
+                    "oid": oid, "timestamp": int(time.time() * 1000), "origSz": wire.get("s"), "cloid": wire.get("c"),
+                    "user": user,
+                }
+                statuses.append({"resting": {"oid": oid}})
+        return {"status": "ok", "response": {"type": "order", "data": {"statuses": statuses}}}
+
+    def cancel(self, user, action, recorded):
+        recorded_oids = {order.get("oid") for order in recorded or []}
+        statuses = []
+        with self._lock:
+            for cancel in action.get("cancels", []):
+                oid = cancel.get("o")
+                if oid in self.orders and self.orders[oid]["user"] == user:
+                    del self.orders[oid]
+                    statuses.append("success")
+                elif oid in recorded_oids and (user, oid) not in self.cancelled:
+                    self.cancelled.add((user, oid))
+                    statuses.append("success")
+                else:
+                    statuses.append({"error": f"Order was never placed, already canceled, or filled. asset={cancel.get('a')}"})
+        return {"status": "ok", "response": {"type": "cancel", "data": {"statuses": statuses}}}
+
+    def order_status(self, user, oid):
+        with self._lock:
+            for order in self.orders.values():
+                if order["user"] == (user or "").lower() and oid in (order["oid"], order["cloid"]):
+                    public = {key: value for key, value in order.items() if key != "user"}
+                    return {"status": "order", "order": {"order": public, "status": "open",
+                                                         "statusTimestamp": order["timestamp"]}}
+        return {"status": "unknownOid"}
+
+    def reset(self):
+        with self._lock:
+            self.orders.clear()
+            self.cancelled.clear()
+
+
+def recover_signer(body):
+    """Address that signed an /exchange request (the agent, for agent-signed actions), lowercased"""
+    try:
+        return recover_agent_or_user_from_l1_action(body["action"], body["signature"], body.get("vaultAddress"),
+                                                    body["nonce"], body.get("expiresAfter"), False).lower()
+    except Exception:
+        return None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections alive between requests
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def setup(self):
+        super().setup()
+        with self.server.stats_lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        if self.path == "/_stub/stats":
+            self.send_json(200, self.server.stats())
+        else:
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.startswith("/_stub/"):
+            return self.control(body)
+
+        kind = body.get("type") if self.path == "/info" else body.get("action", {}).get("type")
+        with self.server.stats_lock:
+            self.server.requests += 1
+            self.server.by_type[kind] = self.server.by_type.get(kind, 0) + 1
+
+        config = self.server.config
+        delay = config["latency"] + random.uniform(0, config["jitter"])
+        if delay:
+            time.sleep(delay)
+        if random.random() < config["drop_rate"]:
+            self.close_connection = True  # the client sees the connection reset with no answer
+            return
+        if random.random() < config["error_rate"]:
+            return self.send_json(config["error_status"], {"error": "Injected error"})
+
+        if self.path == "/exchange":
+            self.send_json(200, self.exchange(body))
+        elif self.path == "/info":
+            self.send_json(200, self.info(body))
+        else:
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def info(self, body):
+        request_type = body.get("type")
+        fixtures = self.server.fixtures
+        user = (body.get("user") or "").lower()
+        if request_type == "orderStatus":
+            return self.server.exchange.order_status(user, body.get("oid"))
+        payload = fixtures.get(request_type)
+        for key in (body.get("user"), user, (body.get("coin") or "").replace("/", "-")):
+            if key and f"{request_type}.{key}" in fixtures:
+                payload = fixtures[f"{request_type}.{key}"]
+                break
+        if request_type in ("openOrders", "frontendOpenOrders"):
+            return self.server.exchange.open_orders(user, payload)
+        return payload
+
+    def exchange(self, body):
+        action = body.get("action", {})
+        user = recover_signer(body)
+        if user is None:
+            return {"status": "err", "response": "Invalid signature"}
+        if action.get("type") == "order":
+            return self.server.exchange.place(user, action)
+        if action.get("type") == "cancel":
+            recorded = self.server.fixtures.get(f"openOrders.{user}", self.server.fixtures.get("openOrders"))
+            return self.server.exchange.cancel(user, action, recorded)
+        return {"status": "err", "response": f"Unsupported action {action.get('type')}"}
+
+    def control(self, body):
+        if self.path == "/_stub/config":
+            unknown = set(body) - set(DEFAULT_CONFIG)
+            if unknown:
+                return self.send_json(400, {"error": f"Unknown settings {sorted(unknown)}"})
+            self.server.config = dict(self.server.config, **body)
+            return self.send_json(200, self.server.config)
+        if self.path == "/_stub/reset":
+            self.server.reset()
+            return self.send_json(200, self.server.stats())
+        self.send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def send_json(self, status, result):
+        payload = json.dumps(result).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixtures, config):
+        super().__init__(address, StubHandler)
+        self.fixtures = fixtures
+        self.config = config
+        self.exchange = StubExchange(fixtures)
+        self.stats_lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.by_type = {}
+
+    def fund(self, address, amount=STUB_FUNDING):
+        """Answer spotClearinghouseState for address with amount of every spot token"""
+        balances = [{"coin": token["name"], "token": token["index"], "total": str(amount), "hold": "0.0", "entryNtl": "0.0"}
+                    for token in self.fixtures.get("spotMeta", {}).get("tokens", [])]
+        self.fixtures = dict(self.fixtures, **{f"spotClearinghouseState.{address.lower()}": {"balances": balances}})
+
+    def stats(self):
+        with self.stats_lock:
+            return {"connections": self.connections, "requests": self.requests, "by_type": dict(self.by_type),
+                    "open_orders": len(self.exchange.orders), "config": self.config}
+
+    def reset(self):
+        with self.stats_lock:
+            self.connections = self.requests = 0
+            self.by_type.clear()
+        self.exchange.reset()
+
+
+def start_stub_server(host="127.0.0.1", port=0, fixtures=None, **config):
+    """
+    Start the stub in a daemon thread and return (server, base_url).
+
+    config overrides DEFAULT_CONFIG (latency, jitter, error_rate, error_status,
+    drop_rate); fixtures defaults to the shared INFO_RESPONSES.
+    """
+    unknown = set(config) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise TypeError(f"Unknown stub settings {sorted(unknown)}")
+    server = StubServer((host, port), INFO_RESPONSES if fixtures is None else fixtures, dict(DEFAULT_CONFIG, **config))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in for the Hyperliquid API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory of recorded /info payloads")
+    parser.add_argument("--fund", action="append", default=[], metavar="ADDRESS",
+                        help="wallet to give STUB_FUNDING of every spot token (repeatable)")
+    for name, default in DEFAULT_CONFIG.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+    args = parser.parse_args()
+
+    config = {name: getattr(args, name) for name in DEFAULT_CONFIG}
+    server, url = start_stub_server(args.host, args.port, load_fixtures(args.fixtures), **config)
+    for address in args.fund:
+        server.fund(address)
+    print(f"Stub Hyperliquid API listening on {url} with {config}")
+    threading.Event().wait()
+
+
+if __name__ == "__main__":
+    main()
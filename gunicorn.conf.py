@@ -0,0 +1,48 @@
+"""
+gunicorn settings for the trading interface.
+
+    python ux.py serve --workers 4 --threads 8
+    gunicorn -c gunicorn.conf.py ux:app
+
+HL_BIND, HL_WORKERS and HL_THREADS set the defaults for both; HL_MAX_PARKED
+caps each worker's open order streams and long-polls (half its threads).
+PROMETHEUS_MULTIPROC_DIR is where workers keep their metrics for /metrics
+(a fresh temporary directory by default); it is emptied on startup.
+"""
+import glob
+import os
+import tempfile
+
+# Must be set before ux imports prometheus_client
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    for path in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+        os.remove(path)
+else:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="hl-metrics-")
+
+bind = os.environ.get("HL_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("HL_WORKERS", "2"))
+threads = int(os.environ.get("HL_THREADS", "8"))
+# gthread: every open SSE stream and status long-poll holds one of a worker's
+# threads, so workers * threads bounds them together with ordinary requests.
+# HL_MAX_PARKED (default threads / 2) caps them per worker; past it they get 503.
+worker_class = "gthread"
+preload_app = True  # import ux once in the master; post_fork gives every worker its own state
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+
+def pre_fork(server, worker):
+    import ux
+    ux.assign_nonce_slot(server, worker)
+
+
+def post_fork(server, worker):
+    import ux
+    ux.worker_started(server.num_workers, server.cfg.threads, worker.nonce_slot)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,563 @@
+// Client-side logic for the Hyperliquid Trading Interface
+// LEDGER_ADDRESS, TRADE_WALLET and DEX_WALLET are defined inline by index.html
+
+function updateStatus(message) {
+    document.getElementById('status').textContent = new Date().toLocaleTimeString() + ' - ' + message;
+}
+
+// Server-Timing of the last API response, e.g. "balances 12ms · market_data 0.1ms · total 14ms"
+let lastServerTiming = '';
+
+function recordServerTiming(response) {
+    const header = response.headers.get('Server-Timing') || '';
+    lastServerTiming = header.split(',')
+        .map(metric => metric.trim().match(/^([^;]+);dur=([\d.]+)/))
+        .filter(match => match)
+        .map(match => `${match[1]} ${match[2]}ms`)
+        .join(' · ');
+}
+
+function timingSuffix() {
+    return lastServerTiming ? ` (${lastServerTiming})` : '';
+}
+
+function showLoading() {
+    document.getElementById('loading').style.display = 'block';
+    document.getElementById('results').style.display = 'none';
+}
+
+function hideLoading() {
+    document.getElementById('loading').style.display = 'none';
+    document.getElementById('results').style.display = 'block';
+}
+
+function appendResults(text) {
+    const resultsDiv = document.getElementById('results');
+    resultsDiv.innerHTML += text;
+    resultsDiv.scrollTop = resultsDiv.scrollHeight;
+}
+
+function setResults(text) {
+    const resultsDiv = document.getElementById('results');
+    resultsDiv.innerHTML = text;
+    resultsDiv.scrollTop = resultsDiv.scrollHeight;
+}
+
+function clearResults() {
+    stopWatchingOrders();
+    document.getElementById('results').innerHTML = '';
+    updateStatus('Results cleared 🧹');
+}
+
+function toggleOrderForm() {
+    const orderContent = document.getElementById('orderContent');
+    orderContent.classList.toggle('active');
+}
+
+function getCurrentAddress() {
+    const customAddress = document.getElementById('customAddress').value.trim();
+    if (customAddress) {
+        return customAddress;
+    }
+
+    const selectedWallet = document.querySelector('input[name="wallet"]:checked').value;
+    if (selectedWallet === 'ledger') return LEDGER_ADDRESS;
+    if (selectedWallet === 'trade') return TRADE_WALLET;
+    if (selectedWallet === 'dex') return DEX_WALLET;
+    return LEDGER_ADDRESS;
+}
+
+async function placeOrder() {
+    const coin = document.getElementById('coinSelect').value;
+    const size = parseFloat(document.getElementById('orderSize').value);
+    const price = parseFloat(document.getElementById('orderPrice').value);
+    const orderType = document.querySelector('input[name="orderType"]:checked').value;
+    const buy_or_sell = orderType === 'buy';
+
+    // Validation
+    if (!size || size <= 0) {
+        alert('Please enter a valid size');
+        return;
+    }
+
+    if (!price || price <= 0) {
+        alert('Please enter a valid price');
+        return;
+    }
+
+    const coinName = getCoinName(coin);
+    const orderTypeText = buy_or_sell ? 'BUY' : 'SELL';
+
+    if (!confirm(`Place ${orderTypeText} order for ${size} ${coinName} at $${price}?`)) {
+        return;
+    }
+
+    updateStatus(`Placing ${orderTypeText} order for ${coinName}...`);
+    appendResults(`\n⚡ Placing ${orderTypeText} order for ${size} ${coinName} at $${price}...\n`);
+
+    try {
+        showLoading();
+        const response = await fetch('/make_order', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                coin: coin,
+                buy_or_sell: buy_or_sell,
+                size: size,
+                price: price
+            })
+        });
+
+        const submitted = await response.json();
+        hideLoading();
+
+        if (!submitted.success) {
+            updateStatus(`❌ Failed to place ${orderTypeText} order`);
+            appendResults(`<pre>❌ Error placing order: ${submitted.error}\n</pre>`);
+            alert(`❌ Error placing order: ${submitted.error}`);
+            return;
+        }
+
+        updateStatus(`⏳ ${orderTypeText} order queued, waiting for the exchange...`);
+        appendResults(`<pre>⏳ Order queued (submission ${submitted.data.id}, cloid ${submitted.data.cloid})\n</pre>`);
+
+        const result = await waitForSubmission(submitted.data.id);
+
+        if (result.success && result.data.status === 'placed') {
+            updateStatus(`✅ ${orderTypeText} order placed successfully`);
+            appendResults(`<pre>✅ ${orderTypeText} Order Placed Successfully!\nResult: ${JSON.stringify(result.data.result, null, 2)}\n</pre>`);
+
+            // Clear form
+            document.getElementById('orderSize').value = '';
+            document.getElementById('orderPrice').value = '';
+
+            // Show success popup
+            alert(`✅ ${orderTypeText} order for ${size} ${coinName} placed successfully!`);
+        } else {
+            const error = result.success ? result.data.error : result.error;
+            updateStatus(`❌ Failed to place ${orderTypeText} order`);
+            appendResults(`<pre>❌ Error placing order: ${error}\n</pre>`);
+            alert(`❌ Error placing order: ${error}`);
+        }
+    } catch (error) {
+        hideLoading();
+        updateStatus(`❌ Network error placing order`);
+        appendResults(`<pre>❌ Network error: ${error.message}\n</pre>`);
+        alert(`❌ Network error: ${error.message}`);
+    }
+}
+
+const FINAL_ORDER_STATES = ['placed', 'rejected', 'failed'];
+
+async function waitForSubmission(submissionId) {
+    // Long-poll until the background placement reaches a final state
+    while (true) {
+        const response = await fetch(`/order_status/${submissionId}?wait=25`);
+        if (response.status === 503) {
+            // Every long-poll slot on this server is taken; ask again after Retry-After
+            const delay = Number(response.headers.get('Retry-After')) || 15;
+            updateStatus(`⏳ Server busy, checking the order again in ${delay}s...`);
+            await new Promise(resolve => setTimeout(resolve, delay * 1000));
+            continue;
+        }
+        const result = await response.json();
+        if (!result.success || FINAL_ORDER_STATES.includes(result.data.status)) {
+            return result;
+        }
+        updateStatus(`⏳ Order ${result.data.status} (attempt ${result.data.attempts})...`);
+    }
+}
+
+async function getJson(url) {
+    showLoading();
+    try {
+        const response = await fetch(url);
+        recordServerTiming(response);
+        const data = await response.json();
+        hideLoading();
+        return data;
+    } catch (error) {
+        hideLoading();
+        return { success: false, error: 'Network error: ' + error.message };
+    }
+}
+
+// Last successful answer and its ETag per POST query; the server replies 304
+// with no body when nothing changed (browsers only do this for GETs themselves)
+const conditionalCache = new Map();
+
+async function postJsonConditional(url, body) {
+    const payload = JSON.stringify(body);
+    const key = `${url} ${payload}`;
+    const cached = conditionalCache.get(key);
+    const headers = { 'Content-Type': 'application/json' };
+    if (cached) {
+        headers['If-None-Match'] = cached.etag;
+    }
+    const response = await fetch(url, { method: 'POST', headers, body: payload });
+    recordServerTiming(response);
+    if (response.status === 304 && cached) {
+        return cached.result;
+    }
+    const result = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag && result.success) {
+        conditionalCache.set(key, { etag, result });
+    }
+    return result;
+}
+
+function formatAmount(value) {
+    if (value >= 1) {
+        return value.toLocaleString('en-US', { maximumFractionDigits: 2 });
+    }
+    return parseFloat(value.toFixed(6)).toString();
+}
+
+function formatPrice(value) {
+    return '$' + parseFloat(value.toFixed(6)).toString();
+}
+
+function renderOpenOrders(data) {
+    if (data.orders.length === 0) {
+        return '<pre>📭 No open orders found.\n</pre>';
+    }
+
+    let text = `<pre>Found ${data.orders.length} open order(s):\n` + '='.repeat(50) + '\n\n';
+    data.orders.forEach((order, i) => {
+        const sideText = order.side === 'B' ? '(Buy order)' : order.side === 'A' ? '(Sell order)' : '';
+        text += `📋 Order #${i + 1}:\n`;
+        text += `  🪙 Symbol: ${order.coin} (${order.coin_name})\n`;
+        text += `  📈 Side: ${order.side} ${sideText}\n`;
+        text += `  📏 Size: ${order.size}\n`;
+        text += `  💰 Price: ${order.limit_price}\n`;
+        text += `  🆔 Order ID: ${order.oid}\n`;
+        text += `  ⏰ Timestamp: ${order.timestamp}\n`;
+        text += `  🗑️ Action: </pre><button class='cancel-btn' onclick='cancelOrder("${order.coin}", "${order.oid}")'>Cancel Order</button><pre>\n`;
+        text += '-'.repeat(30) + '\n';
+    });
+    return text + '</pre>';
+}
+
+function renderBalances(data) {
+    if (data.balances.length === 0) {
+        return '<pre>No spot balances found.\n</pre>';
+    }
+
+    let text = '<pre>💰 Spot Balances with USDC Values:\n' + '='.repeat(60) + '\n\n';
+    data.balances.forEach(balance => {
+        let line = `${balance.coin} (${balance.asset_id || 'N/A'}) bal ${formatAmount(balance.total)}`;
+        if (balance.hold > 0) {
+            line += ` (hold: ${formatAmount(balance.hold)})`;
+        }
+        if (balance.price_usdc > 0) {
+            line += ` @ ${formatPrice(balance.price_usdc)} = ${formatUsd(balance.value_usdc)}`;
+        } else {
+            line += ' @ $0 = $0.00 (no price data)';
+        }
+        text += line + exitSuffix(balance, balance.total) + '\n';
+    });
+
+    text += '\n' + '='.repeat(60) + '\n';
+    text += `💎 TOTAL PORTFOLIO VALUE: ${formatUsd(data.total_value_usdc)} USDC\n`;
+    if (data.total_exit_value_usdc !== undefined) {
+        text += `📉 EXIT VALUE (selling into the bids): ${formatUsd(data.total_exit_value_usdc)} USDC\n`;
+    }
+    text += '='.repeat(60) + '\n\n</pre>';
+    return text;
+}
+
+// Live open orders pushed by /stream/orders while the open-orders view is shown
+let orderStream = null;
+let orderStreamAddress = null;
+let orderStreamRetry = null;
+let streamedOrders = new Map();
+const ORDER_STREAM_RETRY_MS = 15000;
+
+function renderStreamedOrders() {
+    setResults(renderOpenOrders({ orders: Array.from(streamedOrders.values()) }));
+}
+
+function watchOrders(address, orders) {
+    streamedOrders = new Map(orders.map(order => [order.oid, order]));
+    if (orderStream && orderStreamAddress === address) {
+        return;
+    }
+    stopWatchingOrders();
+    orderStreamAddress = address;
+    orderStream = new EventSource(`/stream/orders?address=${encodeURIComponent(address)}`);
+
+    orderStream.addEventListener('snapshot', event => {
+        const snapshot = JSON.parse(event.data);
+        streamedOrders = new Map(snapshot.orders.map(order => [order.oid, order]));
+        renderStreamedOrders();
+    });
+
+    orderStream.addEventListener('order', event => {
+        const diff = JSON.parse(event.data);
+        if (diff.order) {
+            streamedOrders.set(diff.oid, diff.order);
+        } else {
+            streamedOrders.delete(diff.oid);
+        }
+        renderStreamedOrders();
+        updateStatus(`📡 Order ${diff.oid} ${diff.status}`);
+    });
+
+    orderStream.addEventListener('fill', event => {
+        const fill = JSON.parse(event.data).fill;
+        updateStatus(`💥 Fill: ${fill.side === 'B' ? 'bought' : 'sold'} ${fill.sz} ${getCoinName(fill.coin)} @ ${fill.px}`);
+    });
+
+    orderStream.addEventListener('error', event => {
+        // EventSource reconnects by itself after a dropped connection but gives
+        // up on a refusal (503 when the server's stream slots are full)
+        if (event.target !== orderStream || event.target.readyState !== EventSource.CLOSED) {
+            return;
+        }
+        const orders = Array.from(streamedOrders.values());
+        stopWatchingOrders();
+        updateStatus('⚠️ Live order updates unavailable, server busy; retrying shortly');
+        orderStreamRetry = setTimeout(() => watchOrders(address, orders), ORDER_STREAM_RETRY_MS);
+    });
+}
+
+function stopWatchingOrders() {
+    clearTimeout(orderStreamRetry);
+    orderStreamRetry = null;
+    if (orderStream) {
+        orderStream.close();
+    }
+    orderStream = null;
+    orderStreamAddress = null;
+}
+
+async function getOpenOrders() {
+    const address = getCurrentAddress();
+    updateStatus(`Fetching open orders for ${address.substring(0, 10)}...`);
+    appendResults(`\n🔍 Fetching open orders for: ${address}\n`);
+
+    const result = await getJson(`/api/v1/orders?address=${encodeURIComponent(address)}`);
+
+    if (result.success) {
+        setResults(renderOpenOrders(result.data));
+        updateStatus('✅ Open orders retrieved successfully' + timingSuffix());
+        watchOrders(address, result.data.orders);
+    } else {
+        appendResults(`<pre>❌ Error: ${result.error}\n</pre>`);
+        updateStatus('❌ Error fetching open orders');
+    }
+}
+
+async function getAccountInfo() {
+    stopWatchingOrders();
+    const address = getCurrentAddress();
+    updateStatus(`Fetching portfolio info for ${address.substring(0, 10)}...`);
+    appendResults(`\n💰 Fetching portfolio info for: ${address}\n`);
+
+    const exit = exitValueRequested() ? '&exit=1' : '';
+    const result = await getJson(`/api/v1/balances?address=${encodeURIComponent(address)}${exit}`);
+
+    if (result.success) {
+        setResults(renderBalances(result.data));
+        updateStatus('✅ Portfolio info retrieved successfully' + timingSuffix());
+    } else {
+        appendResults(`<pre>❌ Error: ${result.error}\n</pre>`);
+        updateStatus('❌ Error fetching portfolio info');
+    }
+}
+
+function formatUsd(value) {
+    return '$' + value.toLocaleString(undefined, { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+}
+
+// Exit value of one balance, when the server walked the order book for it
+function exitSuffix(record, size) {
+    if (record.exit_value_usdc === undefined || size <= 0) {
+        return '';
+    }
+    let suffix = `\n    ↳ exit ${formatUsd(record.exit_value_usdc)}`;
+    if (record.exit_price_usdc !== null) {
+        suffix += ` @ ${formatPrice(record.exit_price_usdc)}`;
+    }
+    if (record.slippage !== null) {
+        suffix += ` (slippage ${(record.slippage * 100).toFixed(2)}%)`;
+    }
+    if (record.unfilled > 0) {
+        suffix += ` ⚠️ ${formatAmount(record.unfilled)} beyond book depth`;
+    }
+    return suffix;
+}
+
+function exitValueRequested() {
+    return document.getElementById('exitValue').checked;
+}
+
+function renderPortfolioSummary(summary) {
+    let text = '<pre>📊 Portfolio Summary (all wallets)\n' + '='.repeat(60) + '\n\n';
+
+    summary.wallets.forEach(wallet => {
+        if (wallet.success) {
+            text += `💼 ${wallet.address}: ${formatUsd(wallet.total_value_usdc)}\n`;
+        } else {
+            text += `💼 ${wallet.address}: ❌ ${wallet.error}\n`;
+        }
+    });
+
+    text += '\n🪙 Per coin:\n';
+    summary.coins.forEach(coin => {
+        const hold = coin.hold_balance > 0 ? ` (hold: ${coin.hold_balance})` : '';
+        text += `${coin.coin} (${coin.asset_id}) bal ${coin.total_balance}${hold} @ $${coin.price_usdc} = ${formatUsd(coin.value_usdc)}`;
+        text += exitSuffix(coin, coin.total_balance) + '\n';
+    });
+
+    text += '\n' + '='.repeat(60) + '\n';
+    text += `💎 TOTAL VALUE: ${formatUsd(summary.total_value_usdc)} USDC\n`;
+    if (summary.total_exit_value_usdc !== undefined) {
+        text += `📉 EXIT VALUE (selling into the bids): ${formatUsd(summary.total_exit_value_usdc)} USDC\n`;
+    }
+    text += '='.repeat(60) + '\n</pre>';
+    return text;
+}
+
+async function getPortfolioSummary() {
+    stopWatchingOrders();
+    updateStatus('Fetching portfolio summary for all wallets...');
+    appendResults('\n📊 Fetching portfolio summary for all wallets\n');
+    showLoading();
+
+    try {
+        const result = await postJsonConditional('/get_portfolio_summary', {
+            addresses: [LEDGER_ADDRESS, TRADE_WALLET, DEX_WALLET],
+            exit_value: exitValueRequested(),
+            include_assets: false  // only wallet totals and the per-coin table are rendered
+        });
+        hideLoading();
+
+        if (result.success) {
+            setResults(renderPortfolioSummary(result.data));
+            updateStatus('✅ Portfolio summary retrieved successfully' + timingSuffix());
+        } else {
+            appendResults(`<pre>❌ Error: ${result.error}\n</pre>`);
+            updateStatus('❌ Error fetching portfolio summary');
+        }
+    } catch (error) {
+        hideLoading();
+        appendResults(`<pre>❌ Network error: ${error.message}\n</pre>`);
+        updateStatus('❌ Network error fetching portfolio summary');
+    }
+}
+
+async function cancelOrder(coin_symbol, oid) {
+    // Get the friendly name for display purposes
+    const coin_name = getCoinName(coin_symbol);
+
+    if (!confirm(`Are you sure you want to cancel this ${coin_name} order?`)) {
+        return;
+    }
+
+    updateStatus(`Cancelling ${coin_name} order...`);
+
+    try {
+        const response = await fetch('/cancel_order', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ 
+                coin: coin_symbol,  // Pass the original symbol (@153, @166, etc.)
+                oid: oid
+            })
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            updateStatus(`✅ ${coin_name} order cancelled successfully`);
+            // Show popup message
+            alert(`✅ ${coin_name} order cancelled successfully!`);
+            // The order stream pushes the change; only refetch when it is not running
+            if (!orderStream) {
+                setTimeout(() => getOpenOrders(), 1000);
+            }
+        } else {
+            updateStatus(`❌ Failed to cancel ${coin_name} order`);
+            alert(`❌ Error cancelling ${coin_name} order: ${result.error}`);
+        }
+    } catch (error) {
+        updateStatus(`❌ Network error cancelling order`);
+        alert(`❌ Network error: ${error.message}`);
+    }
+}
+
+async function cancelAllOrders() {
+    const coin = document.getElementById('coinSelect').value;
+    const coinName = getCoinName(coin);
+
+    if (!confirm(`Cancel ALL open ${coinName} orders?`)) {
+        return;
+    }
+
+    updateStatus(`Cancelling all ${coinName} orders...`);
+
+    try {
+        const response = await fetch('/cancel_all_orders', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ coin: coin })
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            const failed = result.data.filter(item => !item.success);
+            updateStatus(`✅ Cancelled ${result.data.length - failed.length} of ${result.data.length} ${coinName} orders`);
+            failed.forEach(item => appendResults(`<pre>❌ Order ${item.oid}: ${item.error}\n</pre>`));
+            if (!orderStream) {
+                setTimeout(() => getOpenOrders(), 1000);
+            }
+        } else {
+            updateStatus(`❌ Failed to cancel ${coinName} orders`);
+            alert(`❌ Error cancelling ${coinName} orders: ${result.error}`);
+        }
+    } catch (error) {
+        updateStatus(`❌ Network error cancelling orders`);
+        alert(`❌ Network error: ${error.message}`);
+    }
+}
+
+// Market ID -> token info from /api/tokens (name, decimals)
+const tokensByMarket = new Map();
+
+async function loadTokens() {
+    try {
+        const response = await fetch('/api/tokens');
+        const result = await response.json();
+        if (!result.success) {
+            return;
+        }
+
+        result.data.forEach(token => tokensByMarket.set(token.market, token));
+
+        // The order form keeps its curated markets; the registry only names them
+        Array.from(document.getElementById('coinSelect').options).forEach(option => {
+            const token = tokensByMarket.get(option.value);
+            if (token) {
+                option.text = token.name;
+            }
+        });
+    } catch (error) {
+        updateStatus('⚠️ Could not load the token list');
+    }
+}
+
+function getCoinName(symbol) {
+    const token = tokensByMarket.get(symbol);
+    return token ? token.name : symbol;
+}
+
+document.addEventListener('DOMContentLoaded', loadTokens);
@@ -0,0 +1,17 @@
+"""
+ux imports example_utils_3, the local module that loads the trading wallet.
+The tests never build an exchange client, so a stand-in is installed when
+it is not on the path.
+"""
+import sys
+import types
+
+try:
+    import example_utils_3  # noqa: F401
+except ImportError:
+    def setup(base_url=None, skip_ws=False, perp_dexs=None):
+        raise RuntimeError("example_utils_3 is a test stand-in; tests must not build an exchange client")
+
+    example_utils_3 = types.ModuleType("example_utils_3")
+    example_utils_3.setup = setup
+    sys.modules["example_utils_3"] = example_utils_3
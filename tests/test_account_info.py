@@ -0,0 +1,152 @@
+"""
+Upstream /info calls made by /get_account_info, counted with a fake post_info.
+
+    python -m pytest tests
+"""
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ux  # noqa: E402
+
+ADDRESS = "0x87d1910BE2AaE6D9C22F15AC9009Ec8Ca8706BAd"
+
+SPOT_META = {
+    "tokens": [
+        {"name": "USDC", "index": 0, "szDecimals": 2},
+        {"name": "HYPE", "index": 150, "szDecimals": 2},
+        {"name": "PURR", "index": 1, "szDecimals": 0},
+    ],
+    "universe": [
+        {"name": "@107", "index": 107, "tokens": [150, 0]},
+        {"name": "PURR/USDC", "index": 0, "tokens": [1, 0]},
+    ],
+}
+ASSET_CTXS = [{"coin": "@107", "midPx": "25.0"}, {"coin": "PURR/USDC", "midPx": "0.2"}]
+BALANCES = [
+    {"coin": "USDC", "token": 0, "total": "100.0", "hold": "0.0", "entryNtl": "0.0"},
+    {"coin": "HYPE", "token": 150, "total": "2.0", "hold": "0.5", "entryNtl": "40.0"},
+    {"coin": "PURR", "token": 1, "total": "1000.0", "hold": "0.0", "entryNtl": "150.0"},
+]
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.status_code = 200
+        self._payload = payload
+        self.text = str(payload)
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+class CountingInfo:
+    """Stands in for post_info, answering from the fixtures above and counting calls by type"""
+
+    def __init__(self, balances=BALANCES):
+        self.balances = balances
+        self.calls = Counter()
+
+    def __call__(self, body, priority=None):
+        request_type = body["type"]
+        self.calls[request_type] += 1
+        if request_type == "spotClearinghouseState":
+            return FakeResponse({"balances": self.balances})
+        if request_type == "spotMetaAndAssetCtxs":
+            return FakeResponse([SPOT_META, ASSET_CTXS])
+        if request_type == "allMids":
+            return FakeResponse({ctx["coin"]: ctx["midPx"] for ctx in ASSET_CTXS})
+        raise AssertionError(f"unexpected /info request {body}")
+
+
+@pytest.fixture
+def info(monkeypatch):
+    """Fresh market data and token caches, and a counting post_info"""
+    fake = CountingInfo()
+    monkeypatch.setattr(ux, "post_info", fake)
+    monkeypatch.setattr(ux, "market_data", ux.MarketDataCache())
+    monkeypatch.setattr(ux, "token_registry", ux.TokenRegistry())
+    monkeypatch.setattr(ux, "PRICE_STREAM_ENABLED", False)
+    return fake
+
+
+def get_account_info(address=ADDRESS):
+    response = ux.app.test_client().post("/get_account_info", json={"address": address})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["success"], body
+    return body["data"]
+
+
+def test_cold_cache_makes_one_call_of_each(info):
+    data = get_account_info()
+
+    assert info.calls["spotClearinghouseState"] == 1
+    assert info.calls["spotMetaAndAssetCtxs"] == 1
+    assert info.calls["allMids"] == 0
+    assert "TOTAL PORTFOLIO VALUE: $350.00 USDC" in data
+
+
+def test_warm_cache_fetches_balances_only(info):
+    get_account_info()
+    info.calls.clear()
+
+    get_account_info()
+
+    assert info.calls["spotClearinghouseState"] == 1
+    assert info.calls["spotMetaAndAssetCtxs"] == 0
+
+
+def test_empty_account_skips_market_data(info):
+    info.balances = []
+
+    get_account_info()
+
+    assert info.calls["spotClearinghouseState"] == 1
+    assert info.calls["spotMetaAndAssetCtxs"] == 0
+
+
+def post_account_info(headers=None):
+    return ux.app.test_client().post("/get_account_info", json={"address": ADDRESS}, headers=headers or {})
+
+
+def test_unchanged_data_answers_304(info):
+    post_account_info()  # loads the market data, which moves its version on
+    etag = post_account_info().headers["ETag"]
+
+    again = post_account_info({"If-None-Match": etag})
+
+    assert again.status_code == 304
+    assert again.get_data() == b""
+    assert again.headers["ETag"] == etag
+    assert info.calls["spotMetaAndAssetCtxs"] == 1
+
+
+def test_gzip_etag_revalidates_too(info, monkeypatch):
+    monkeypatch.setattr(ux, "COMPRESS_MIN_SIZE", 0)
+    post_account_info()
+    first = post_account_info({"Accept-Encoding": "gzip"})
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert first.headers["ETag"].endswith('-gzip"')
+
+    again = post_account_info({"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]})
+
+    assert again.status_code == 304
+
+
+def test_changed_balances_get_a_new_etag(info):
+    post_account_info()
+    etag = post_account_info().headers["ETag"]
+    info.balances = BALANCES[:2]
+
+    changed = post_account_info({"If-None-Match": etag})
+
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert "TOTAL PORTFOLIO VALUE: $150.00 USDC" in changed.get_json()["data"]
@@ -0,0 +1,48 @@
+"""
+walk_bids: selling sizes into padded bid books, for every coin at once.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ux  # noqa: E402
+
+
+def book(*levels):
+    """Bids as (price, size) levels, best first"""
+    return {"bid_px": np.array([px for px, _ in levels]), "bid_sz": np.array([sz for _, sz in levels])}
+
+
+@pytest.mark.parametrize("size, filled, proceeds", [
+    (0.5, 0.5, 5.0),    # inside the best level
+    (1.0, 1.0, 10.0),   # exactly the best level
+    (2.0, 2.0, 19.0),   # into the second level
+    (10.0, 3.0, 28.0),  # more than the book holds
+    (0.0, 0.0, 0.0),
+])
+def test_sale_walks_down_the_levels(size, filled, proceeds):
+    filled_sizes, usdc = ux.walk_bids([book((10.0, 1.0), (9.0, 2.0))], np.array([size]))
+
+    assert filled_sizes[0] == pytest.approx(filled)
+    assert usdc[0] == pytest.approx(proceeds)
+
+
+def test_books_of_different_depth_and_missing_books():
+    books = [book((10.0, 1.0), (9.0, 2.0), (8.0, 5.0)), None, book((2.0, 100.0))]
+
+    filled, usdc = ux.walk_bids(books, np.array([4.0, 3.0, 50.0]))
+
+    assert filled == pytest.approx([4.0, 0.0, 50.0])
+    assert usdc == pytest.approx([36.0, 0.0, 100.0])
+
+
+def test_no_books_at_all():
+    filled, usdc = ux.walk_bids([None, None], np.array([1.0, 2.0]))
+
+    assert filled == pytest.approx([0.0, 0.0])
+    assert usdc == pytest.approx([0.0, 0.0])
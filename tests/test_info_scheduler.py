@@ -0,0 +1,144 @@
+"""
+InfoScheduler: coalescing of identical /info queries and priority order
+when waiting for rate-limit budget.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ux  # noqa: E402
+
+
+def start(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_concurrent_identical_calls_share_one_request():
+    scheduler = ux.InfoScheduler()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def leader():
+        calls.append(1)
+        release.wait(5)
+        return "response"
+
+    threads = [start(lambda: results.append(scheduler.coalesce("key", "allMids", leader)))]
+    while not calls:
+        time.sleep(0.001)
+    threads += [start(lambda: results.append(scheduler.coalesce("key", "allMids", leader))) for _ in range(3)]
+    while scheduler.coalesced < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ["response"] * 4
+
+
+def test_followers_get_the_leaders_exception():
+    scheduler = ux.InfoScheduler()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        release.wait(5)
+        raise ValueError("upstream failed")
+
+    def call():
+        try:
+            scheduler.coalesce("key", "allMids", failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [start(call)]
+    time.sleep(0.05)
+    threads.append(start(call))
+    while scheduler.coalesced < 1:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert errors == ["upstream failed"] * 2
+
+
+def test_finished_calls_are_not_coalesced():
+    scheduler = ux.InfoScheduler()
+
+    assert scheduler.coalesce("key", "allMids", lambda: 1) == 1
+    assert scheduler.coalesce("key", "allMids", lambda: 2) == 2
+    assert scheduler.coalesced == 0
+
+
+def test_higher_priority_overtakes_queued_lower_priority():
+    weight = ux.INFO_WEIGHTS["allMids"]
+    scheduler = ux.InfoScheduler(weight_limit=weight, window=0.5)  # refills one call every 0.5s
+    scheduler.acquire("allMids")  # empty the bucket
+    order = []
+
+    background = start(lambda: (scheduler.acquire("allMids", ux.PRIORITY_BACKGROUND), order.append("background")))
+    time.sleep(0.05)
+    urgent = start(lambda: (scheduler.acquire("allMids", ux.PRIORITY_ORDER), order.append("order")))
+    background.join(5)
+    urgent.join(5)
+
+    assert order == ["order", "background"]
+
+
+@pytest.fixture
+def blocking_post(monkeypatch):
+    """A fresh scheduler and an upstream call that blocks until released, counting calls"""
+    monkeypatch.setattr(ux, "info_scheduler", ux.InfoScheduler())
+    release = threading.Event()
+    calls = []
+
+    def post(body, request_type, priority):
+        calls.append(priority)
+        release.wait(5)
+        return "response"
+
+    monkeypatch.setattr(ux, "_post_info", post)
+    return calls, release
+
+
+def test_post_info_coalesces_within_a_priority(blocking_post):
+    calls, release = blocking_post
+    body = {"type": "allMids"}
+
+    threads = [start(ux.post_info, body, ux.PRIORITY_NORMAL) for _ in range(2)]
+    while ux.info_scheduler.coalesced < 1:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [ux.PRIORITY_NORMAL]
+
+
+def test_post_info_does_not_coalesce_across_priorities(blocking_post):
+    calls, release = blocking_post
+    body = {"type": "allMids"}
+
+    threads = [start(ux.post_info, body, ux.PRIORITY_BACKGROUND)]
+    while not calls:
+        time.sleep(0.001)
+    threads.append(start(ux.post_info, body, ux.PRIORITY_ORDER))
+    while len(calls) < 2:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(calls) == [ux.PRIORITY_ORDER, ux.PRIORITY_BACKGROUND]
+    assert ux.info_scheduler.coalesced == 0
@@ -0,0 +1,214 @@
+"""
+Order checks before signing (rounding, balance reservations) and the
+in-memory open-order mirror's reconcile against openOrders.
+
+    python -m pytest tests
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ux  # noqa: E402
+
+ADDRESS = "0x87d1910BE2AaE6D9C22F15AC9009Ec8Ca8706BAd"
+
+SPOT_META = {
+    "tokens": [
+        {"name": "USDC", "index": 0, "szDecimals": 2},
+        {"name": "HYPE", "index": 150, "szDecimals": 2},
+        {"name": "PURR", "index": 1, "szDecimals": 0},
+    ],
+    "universe": [
+        {"name": "@107", "index": 107, "tokens": [150, 0]},
+        {"name": "PURR/USDC", "index": 0, "tokens": [1, 0]},
+    ],
+}
+BALANCES = [
+    {"coin": "USDC", "token": 0, "total": "100.0", "hold": "10.0"},
+    {"coin": "HYPE", "token": 150, "total": "2.0", "hold": "0.5"},
+]
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = ux.TokenRegistry()
+    registry.update(SPOT_META)
+    monkeypatch.setattr(ux, "token_registry", registry)
+    return registry
+
+
+@pytest.fixture
+def balances(monkeypatch, registry):
+    """A fresh balance cache fed by a fake spotClearinghouseState; returns the fetch count"""
+    fetches = []
+
+    def post_info(body, priority=None):
+        assert body["type"] == "spotClearinghouseState"
+        fetches.append(body["user"])
+        return FakeResponse({"balances": BALANCES})
+
+    monkeypatch.setattr(ux, "balance_cache", ux.BalanceCache())
+    monkeypatch.setattr(ux, "post_info", post_info)
+    return fetches
+
+
+def order(coin="@107", buy=True, size=1.0, price=25.0, cloid=None):
+    return {"coin": coin, "buy_or_sell": buy, "size": size, "price": price, "cloid": cloid}
+
+
+@pytest.mark.parametrize("price, expected", [
+    (25.123456, 25.123),
+    (0.000123456, 0.000123),
+    (123456.0, 123456.0),  # integer prices are exempt from the significant-figure limit
+    (123456.7, 123460.0),
+])
+def test_round_price(registry, price, expected):
+    assert registry.round_price("@107", price) == pytest.approx(expected)
+
+
+def test_round_price_keeps_the_markets_decimals(registry):
+    assert registry.round_price("PURR/USDC", 0.123456789) == 0.12346
+    assert registry.round_price("@999", 0.123456789) == 0.123456789  # unknown market: left to the exchange
+
+
+@pytest.mark.parametrize("size, expected", [(1.239, 1.23), (1.0, 1.0), (0.004, 0.0)])
+def test_round_size_rounds_down_to_the_lot(registry, size, expected):
+    assert registry.round_size("@107", size) == expected
+
+
+def test_order_below_minimum_notional_is_rejected(registry):
+    errors = ux.validate_orders([order(size=0.1, price=25.0)])
+
+    assert "below the $10 minimum" in errors[0]
+
+
+def test_orders_reserve_what_they_spend(balances):
+    # 90 USDC available: the first buy reserves 50, so a second 50 no longer fits
+    assert ux.validate_orders([order(size=2.0, cloid="0x1")], ADDRESS) == [None]
+
+    errors = ux.validate_orders([order(size=2.0, cloid="0x2")], ADDRESS)
+
+    assert errors[0] == "Insufficient USDC: order needs 50, 40 available"
+    assert balances == [ADDRESS]  # the snapshot was fetched once and reused
+
+
+def test_rejected_batch_reserves_nothing(balances):
+    errors = ux.validate_orders([order(size=2.0, cloid="0x1"), order(size=4.0, cloid="0x2")], ADDRESS)
+
+    assert errors == [None, "Insufficient USDC: order needs 100, 40 available"]
+    assert ux.balance_cache.available(ADDRESS)["USDC"] == 90.0
+
+
+def test_released_reservation_is_available_again(balances):
+    ux.validate_orders([order(buy=False, size=1.5, cloid="0x1")], ADDRESS)
+    assert ux.balance_cache.available(ADDRESS)["HYPE"] == 0.0
+
+    ux.balance_cache.release("0x1")
+
+    assert ux.balance_cache.available(ADDRESS)["HYPE"] == 1.5
+
+
+def test_newer_snapshot_replaces_reservations(balances):
+    ux.validate_orders([order(size=2.0, cloid="0x1")], ADDRESS)
+
+    ux.get_spot_asset_balances(ADDRESS)  # requested after the order, so its hold is in the totals
+
+    assert ux.balance_cache.available(ADDRESS)["USDC"] == 90.0
+
+
+def test_stale_snapshot_is_fetched_again(balances):
+    ux.balance_cache.available(ADDRESS)
+    ux.balance_cache.expire(ADDRESS)
+
+    ux.balance_cache.available(ADDRESS)
+
+    assert len(balances) == 2
+
+
+def raw_order(oid, sz="1.0", px="25.0"):
+    return {"coin": "@107", "side": "B", "limitPx": px, "sz": sz, "oid": oid}
+
+
+@pytest.fixture
+def exchange_orders(monkeypatch):
+    """The openOrders answer the mirror reconciles against; edit the dict to change it"""
+    orders = {}
+    monkeypatch.setattr(ux, "get_open_orders", lambda address: (list(orders.values()), bool(orders), None))
+    return orders
+
+
+def test_reconcile_publishes_the_difference(exchange_orders):
+    exchange_orders.update({1: raw_order(1), 2: raw_order(2)})
+    mirror = ux.OrderMirror(ADDRESS)
+    mirror.open_orders()  # seeds the mirror; not drift
+    published = []
+    mirror.subscribe(published.extend)
+
+    del exchange_orders[1]
+    exchange_orders[2] = raw_order(2, sz="0.5")
+    exchange_orders[3] = raw_order(3)
+    assert mirror.reconcile() is None
+
+    assert sorted(published, key=lambda change: change[0]) == [
+        (1, "closed", None), (2, "open", exchange_orders[2]), (3, "open", exchange_orders[3])]
+    assert mirror.drift == 3
+    orders, error = mirror.open_orders()
+    assert sorted(order["oid"] for order in orders) == [2, 3]
+
+
+def test_reconcile_without_differences_publishes_nothing(exchange_orders):
+    exchange_orders[1] = raw_order(1)
+    mirror = ux.OrderMirror(ADDRESS)
+    mirror.open_orders()
+    published = []
+    mirror.subscribe(published.extend)
+
+    mirror.reconcile()
+
+    assert published == []
+    assert mirror.drift == 0
+
+
+def test_reconcile_keeps_local_changes_made_while_it_ran(monkeypatch, exchange_orders):
+    mirror = ux.OrderMirror(ADDRESS)
+    mirror.open_orders()
+
+    def answer_then_place(address):
+        answer = list(exchange_orders.values())
+        mirror.opened(raw_order(4))  # our own order lands after openOrders answered
+        return answer, bool(answer), None
+
+    monkeypatch.setattr(ux, "get_open_orders", answer_then_place)
+    mirror.reconcile()
+
+    orders, error = mirror.open_orders()
+    assert [order["oid"] for order in orders] == [4]
+
+
+@pytest.mark.parametrize("status, expected", [
+    ("open", {"resting": {"oid": 7}}),
+    ("filled", {"filled": {"oid": 7}}),
+    ("rejected", {"error": "Order 7 was rejected"}),
+    ("marginCanceled", {"error": "Order 7 was marginCanceled"}),
+])
+def test_cloid_lookup_maps_statuses(status, expected):
+    class Info:
+        def query_order_by_cloid(self, address, cloid):
+            return {"status": "order", "order": {"order": {"oid": 7}, "status": status}}
+
+    result = asyncio.run(ux.find_order_by_cloid(Info(), ADDRESS, ux.Cloid.from_str("0x" + "00" * 16)))
+
+    assert result["response"]["data"]["statuses"] == [expected]
@@ -1,12 +1,58 @@
-from flask import Flask, render_template_string, request, jsonify
+from flask import Flask, Response, g, has_request_context, request, jsonify
 import requests
+from requests.adapters import HTTPAdapter
 import urllib3
 from datetime import datetime
 import traceback
+import argparse
 import asyncio
-from hyperliquid.utils import constants
+import contextlib
+import cProfile
+import functools
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
+import marshal
+import multiprocessing
+import os
+import queue
+import random
+import secrets
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import eth_account
+from hyperliquid.utils import constants, signing
+from hyperliquid.utils.types import Cloid
 import example_utils_3  # Changed back to example_utils
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Tuple, Callable
+import numpy as np
+import websocket
+
+# prometheus_client picks where metric values live when it is imported: under
+# serve every worker writes them to files in a shared directory, and /metrics
+# adds the files of all workers up (gunicorn.conf.py does the same for gunicorn -c)
+if __name__ == "__main__" and sys.argv[1:2] == ["serve"] and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="hl-metrics-")
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+try:
+    import brotli  # optional; responses fall back to gzip without it
+except ImportError:
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 app = Flask(__name__)
 
@@ -17,21 +63,326 @@ DEX_WALLET = "0x62E485fD0e5c7D32f8cCF11aa356A1179C76e400"
 
 # Error handling configuration
 MAX_RETRIES = 5
-RETRY_DELAY = 10  # seconds between retries
+RETRY_BASE_DELAY = 1  # seconds, doubled on every retry
+RETRY_MAX_DELAY = 30  # cap for a single backoff, before jitter
+
+# Hyperliquid API endpoint (set HL_API_URL to point at a local stub)
+API_URL = os.environ.get("HL_API_URL", constants.MAINNET_API_URL).rstrip("/")
+INFO_URL = f"{API_URL}/info"
+
+# Shared /info HTTP client configuration
+INFO_POOL_SIZE = int(os.environ.get("HL_INFO_POOL_SIZE", "20"))
+DEFAULT_INFO_TIMEOUT = 10  # seconds
+INFO_TIMEOUTS = {
+    "spotMetaAndAssetCtxs": 5,
+}
+DEFAULT_INFO_RETRIES = 1  # extra attempts after the first one
+INFO_RETRIES = {
+    "openOrders": 2,
+    "spotClearinghouseState": 2,
+}
+INFO_RETRY_BACKOFF = 0.25  # seconds, doubled on every retry
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# /info rate limiting; Hyperliquid allows 1200 weight per minute per IP. Under
+# serve every worker gets an equal share (see reset_after_fork); split it by
+# hand between any other processes that share the address
+INFO_WEIGHT_LIMIT = int(os.environ.get("HL_INFO_WEIGHT_LIMIT", "1200"))  # weight per minute
+DEFAULT_INFO_WEIGHT = 20
+INFO_WEIGHTS = {
+    "allMids": 2,
+    "clearinghouseState": 2,
+    "exchangeStatus": 2,
+    "l2Book": 2,
+    "orderStatus": 2,
+    "spotClearinghouseState": 2,
+    "userRole": 60,
+}
+INFO_QUEUE_TIMEOUT = 30  # seconds a request may wait for budget before giving up
+
+# Lower runs first; order-critical queries overtake cosmetic refreshes in the queue
+PRIORITY_ORDER = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = ("order", "normal", "background")
+INFO_PRIORITIES = {
+    "openOrders": PRIORITY_ORDER,
+    "frontendOpenOrders": PRIORITY_ORDER,
+    "orderStatus": PRIORITY_ORDER,
+    "userFills": PRIORITY_ORDER,
+    "allMids": PRIORITY_BACKGROUND,
+    "l2Book": PRIORITY_BACKGROUND,
+    "spotMeta": PRIORITY_BACKGROUND,
+    "spotMetaAndAssetCtxs": PRIORITY_BACKGROUND,
+}
+
+# Prometheus metrics, scraped from /metrics
+METRICS_MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+INFO_LATENCY = Histogram('hl_info_request_seconds', 'Latency of one /info HTTP attempt', ['type'])
+INFO_RETRIES_TOTAL = Counter('hl_info_retries_total', '/info attempts that were retried', ['type'])
+EXCHANGE_LATENCY = Histogram('hl_exchange_request_seconds', 'Latency of signed exchange actions, signing included', ['action'])
+EXCHANGE_ERRORS = Counter('hl_exchange_errors_total', 'Exchange actions that raised', ['action'])
+EXCHANGE_CLIENT_SETUP = Histogram('hl_exchange_client_setup_seconds', 'Time spent building the SDK exchange client',
+                                  buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+ORDER_RETRIES = Counter('hl_order_retries_total', 'Order placements retried after a connection error')
+ORDER_ROUND_TRIP = Histogram('hl_order_submission_seconds', 'Time from queueing an order to its final state', ['status'])
+MARKET_DATA_LOOKUPS = Counter('hl_market_data_lookups_total', 'Market data cache lookups by outcome', ['result'])
+ROUTE_LATENCY = Histogram('hl_http_request_seconds', 'Flask handler time per route', ['route', 'method', 'status'])
+INFO_QUEUE_WAIT = Histogram('hl_info_queue_wait_seconds', 'Time /info attempts waited for rate-limit budget', ['priority'])
+INFO_WEIGHT_USED = Counter('hl_info_weight_total', 'Rate-limit weight spent on /info', ['type'])
+INFO_COALESCED = Counter('hl_info_coalesced_total', '/info calls answered by an identical in-flight request', ['type'])
+SIGNING_LATENCY = Histogram('hl_signing_seconds', 'Time to sign one exchange action, waiting for a signing process included')
+ORDER_MIRROR_DRIFT = Counter('hl_order_mirror_drift_total', 'Open orders the in-memory mirror had wrong when reconciled', ['kind'])
+PARKED_REFUSED = Counter('hl_parked_requests_refused_total', 'SSE streams and status long-polls refused with 503 because the worker was full')
+# Summed over live workers; set on every budget change, read at scrape time when single-process
+INFO_QUEUE_DEPTH = Gauge('hl_info_queue_depth', '/info requests waiting for rate-limit budget', multiprocess_mode='livesum')
+INFO_BUDGET_AVAILABLE = Gauge('hl_info_budget_available', 'Rate-limit weight available right now', multiprocess_mode='livesum')
+
+# Bound once so cache lookups skip the label lookup
+MARKET_DATA_HIT = MARKET_DATA_LOOKUPS.labels(result='hit')
+MARKET_DATA_STALE = MARKET_DATA_LOOKUPS.labels(result='stale')
+MARKET_DATA_MISS = MARKET_DATA_LOOKUPS.labels(result='miss')
+
+def _market_data_hit_ratio():
+    """Share of lookups answered from cache (fresh or stale-while-revalidate)"""
+    counts = {result: REGISTRY.get_sample_value('hl_market_data_lookups_total', {'result': result}) or 0.0
+              for result in ('hit', 'stale', 'miss')}
+    lookups = sum(counts.values())
+    return (counts['hit'] + counts['stale']) / lookups if lookups else 0.0
+
+if not METRICS_MULTIPROCESS:
+    # Callback gauges only see this process; across workers, take the ratio of hl_market_data_lookups_total rates instead
+    Gauge('hl_market_data_cache_hit_ratio', 'Share of market data lookups served from cache').set_function(_market_data_hit_ratio)
+    INFO_QUEUE_DEPTH.set_function(lambda: info_scheduler.queue_depth())
+    INFO_BUDGET_AVAILABLE.set_function(lambda: info_scheduler.available())
+
+# Request tracing; ?profile=1 needs HL_ADMIN_TOKEN set and sent back in X-Admin-Token
+ADMIN_TOKEN = os.environ.get("HL_ADMIN_TOKEN", "")
+
+@contextlib.contextmanager
+def span(name):
+    """Add the time spent in a block to the current request's Server-Timing header"""
+    if not has_request_context():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans = g.setdefault('spans', {})
+        spans[name] = spans.get(name, 0.0) + time.perf_counter() - start
+
+def traced(name):
+    """Decorator form of span(); calls outside a request (background threads) are not timed"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class InfoRateLimited(requests.exceptions.RequestException):
+    """An /info request waited INFO_QUEUE_TIMEOUT without getting rate-limit budget"""
+
+class InfoScheduler:
+    """
+    Rate-limit-aware gate in front of every /info request.
+    
+    A token bucket holds weight_limit weight and refills it over a minute;
+    each attempt waits in a priority queue (FIFO within a priority) until it
+    is at the head and the bucket covers its weight. Identical queries that
+    are already in flight are coalesced: later callers share the first
+    caller's response (or exception) instead of spending budget again.
+    """
+    
+    def __init__(self, weight_limit=INFO_WEIGHT_LIMIT, window=60.0):
+        self.capacity = float(weight_limit)
+        self.refill_rate = weight_limit / window
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._changed = threading.Condition()
+        self._waiting: List[Tuple[int, int]] = []  # heap of (priority, sequence) tickets
+        self._sequence = itertools.count()
+        self._in_flight: Dict[str, Future] = {}
+        self.coalesced = 0
+        self.weight_used = 0
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+    
+    def acquire(self, request_type, priority=None, timeout=INFO_QUEUE_TIMEOUT):
+        """Block until the request is first in line and the bucket covers its weight"""
+        weight = min(INFO_WEIGHTS.get(request_type, DEFAULT_INFO_WEIGHT), self.capacity)
+        priority = INFO_PRIORITIES.get(request_type, PRIORITY_NORMAL) if priority is None else priority
+        ticket = (priority, next(self._sequence))
+        start = time.monotonic()
+        with self._changed:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    self._refill()
+                    first = self._waiting[0] == ticket
+                    if first and self._tokens >= weight:
+                        break
+                    remaining = start + timeout - time.monotonic()
+                    if remaining <= 0:
+                        raise InfoRateLimited(f"{request_type} waited {timeout}s for rate-limit budget")
+                    # The head sleeps until enough weight has refilled; everyone else until it leaves
+                    self._changed.wait(min(remaining, (weight - self._tokens) / self.refill_rate) if first else remaining)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._changed.notify_all()
+            self._tokens -= weight
+            self.weight_used += weight
+            self._publish()
+        INFO_WEIGHT_USED.labels(request_type).inc(weight)
+        INFO_QUEUE_WAIT.labels(PRIORITY_NAMES[priority]).observe(time.monotonic() - start)
+    
+    def throttled(self):
+        """The server answered 429: empty the bucket so every caller backs off"""
+        with self._changed:
+            self._refill()
+            self._tokens = 0.0
+            self._publish()
+    
+    def coalesce(self, key, request_type, func):
+        """Run func() once per key at a time; concurrent callers with the same key get its result"""
+        with self._changed:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            INFO_COALESCED.labels(request_type).inc()
+            return future.result()
+        
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._changed:
+                self._in_flight.pop(key, None)
+    
+    def _publish(self):
+        INFO_QUEUE_DEPTH.set(len(self._waiting))
+        INFO_BUDGET_AVAILABLE.set(self._tokens)
+    
+    def queue_depth(self) -> int:
+        with self._changed:
+            return len(self._waiting)
+    
+    def available(self) -> float:
+        with self._changed:
+            self._refill()
+            return self._tokens
+    
+    def status(self) -> Dict:
+        with self._changed:
+            self._refill()
+            by_priority = {name: 0 for name in PRIORITY_NAMES}
+            for priority, _ in self._waiting:
+                by_priority[PRIORITY_NAMES[priority]] += 1
+            return {
+                'queue_depth': len(self._waiting),
+                'queue_by_priority': by_priority,
+                'budget_capacity': self.capacity,
+                'budget_available': self._tokens,
+                'budget_used_ratio': 1 - self._tokens / self.capacity,
+                'in_flight': len(self._in_flight),
+                'coalesced': self.coalesced,
+                'weight_used': self.weight_used
+            }
+
+info_scheduler = InfoScheduler()
+
+_info_session = None
+_info_session_lock = threading.Lock()
+
+def get_info_session() -> requests.Session:
+    """Return the process-wide pooled keep-alive session for /info calls"""
+    global _info_session
+    if _info_session is None:
+        with _info_session_lock:
+            if _info_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=INFO_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Content-Type": "application/json"})
+                _info_session = session
+    return _info_session
+
+def post_info(body: Dict, priority=None) -> requests.Response:
+    """
+    POST a query to the /info endpoint over the shared session.
+    
+    Identical concurrent queries share one request, and every attempt waits
+    for rate-limit budget in priority order (INFO_PRIORITIES by type unless
+    priority is given). Connection errors, timeouts and retryable status
+    codes are retried with exponential backoff, using the timeout and retry
+    budget configured for the request type. Raises requests.RequestException
+    once the budget is spent. Treat the returned response as read-only, it
+    may be shared.
+    """
+    request_type = body.get("type")
+    priority = INFO_PRIORITIES.get(request_type, PRIORITY_NORMAL) if priority is None else priority
+    # Callers only share a request queued at their own priority, never wait behind a lower one
+    key = f"{priority}:{json.dumps(body, sort_keys=True)}"
+    return info_scheduler.coalesce(key, request_type, lambda: _post_info(body, request_type, priority))
+
+def _post_info(body: Dict, request_type, priority) -> requests.Response:
+    timeout = INFO_TIMEOUTS.get(request_type, DEFAULT_INFO_TIMEOUT)
+    retries = INFO_RETRIES.get(request_type, DEFAULT_INFO_RETRIES)
+    session = get_info_session()
+    
+    latency = INFO_LATENCY.labels(request_type)
+    
+    for attempt in range(retries + 1):
+        info_scheduler.acquire(request_type, priority)
+        try:
+            with latency.time():
+                response = session.post(INFO_URL, json=body, timeout=timeout)
+            if response.status_code == 429:
+                info_scheduler.throttled()
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt == retries:
+                return response
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == retries:
+                raise
+        INFO_RETRIES_TOTAL.labels(request_type).inc()
+        time.sleep(INFO_RETRY_BACKOFF * (2 ** attempt))
+
+_info_executor = None
+
+def get_info_executor() -> ThreadPoolExecutor:
+    """Return the thread pool used to issue /info calls concurrently (sized to the connection pool)"""
+    global _info_executor
+    if _info_executor is None:
+        with _info_session_lock:
+            if _info_executor is None:
+                _info_executor = ThreadPoolExecutor(max_workers=INFO_POOL_SIZE, thread_name_prefix="hl-info")
+    return _info_executor
 
 def make_api_request(request_type, user_address):
     """Make API request to Hyperliquid"""
-    url = "https://api.hyperliquid.xyz/info"
     request_body = {
         "type": request_type,
         "user": user_address
     }
-    headers = {
-        "Content-Type": "application/json"
-    }
     
     try:
-        response = requests.post(url, json=request_body, headers=headers, timeout=10)
+        response = post_info(request_body)
         if response.status_code == 200:
             return response.json(), None
         else:
@@ -39,58 +390,427 @@ def make_api_request(request_type, user_address):
     except requests.exceptions.RequestException as e:
         return None, f"Request failed: {str(e)}"
 
-async def make_an_order(coin, buy_or_sell, size, price, retries=MAX_RETRIES):
-    """Place a buy or sell order"""
+# Exchange client configuration
+EXCHANGE_CLIENT_MAX_AGE = 3600  # seconds before the SDK metadata is reloaded
+
+class ExchangeClientHolder:
+    """
+    Lazily built, thread-safe holder for the (address, info, exchange) trio.
+    
+    example_utils_3.setup loads credentials and downloads exchange metadata, so
+    it runs once per process (and base URL) instead of once per order. The
+    clients are rebuilt after max_age seconds or on an explicit refresh().
+    """
+    
+    def __init__(self, base_url=API_URL, max_age=EXCHANGE_CLIENT_MAX_AGE):
+        self.base_url = base_url
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._clients = None
+        self._created = 0.0
+    
+    def _expired(self):
+        return self._clients is None or time.monotonic() - self._created > self.max_age
+    
+    def get(self):
+        """Return (address, info, exchange), building them on first use"""
+        if not self._expired():
+            return self._clients
+        with self._lock:
+            if self._expired():
+                self._build()
+            return self._clients
+    
+    def refresh(self):
+        """Rebuild the clients, e.g. after a new market was listed"""
+        with self._lock:
+            self._build()
+            return self._clients
+    
+    def _build(self):
+        with EXCHANGE_CLIENT_SETUP.time():
+            self._clients = example_utils_3.setup(base_url=self.base_url, skip_ws=True)
+        self._created = time.monotonic()
+
+_exchange_clients: Dict[str, ExchangeClientHolder] = {}
+_exchange_clients_lock = threading.Lock()
+
+def get_exchange_client(base_url=API_URL, refresh=False):
+    """Return the shared (address, info, exchange) for base_url"""
+    with _exchange_clients_lock:
+        holder = _exchange_clients.get(base_url)
+        if holder is None:
+            holder = _exchange_clients[base_url] = ExchangeClientHolder(base_url)
+    return holder.refresh() if refresh else holder.get()
+
+def trading_address(base_url=API_URL) -> str:
+    """
+    Address the exchange client signs for. A client that isn't built yet is
+    built on the SDK executor and waited for: the order asking would wait for
+    the same build before it could be signed.
+    """
+    holder = _exchange_clients.get(base_url)
+    clients = holder._clients if holder is not None else None
+    if clients is not None:
+        return clients[0]
+    return runtime.run(run_blocking(get_exchange_client, base_url))[0]
+
+# Async runtime configuration
+SDK_EXECUTOR_WORKERS = int(os.environ.get("HL_SDK_WORKERS", "16"))  # concurrent blocking SDK calls
+
+class AsyncRuntime:
+    """
+    One long-lived asyncio event loop on a background thread.
+    
+    Flask handlers hand coroutines over with submit()/run() instead of creating
+    a loop per request. Blocking SDK calls inside those coroutines go through
+    run_blocking(), which uses the loop's thread pool so many orders and
+    cancels can be in flight at once.
+    """
+    
+    def __init__(self, workers=SDK_EXECUTOR_WORKERS):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._loop = None
+    
+    def _ensure_started(self):
+        if self._loop is not None:
+            return self._loop
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hl-sdk"))
+                threading.Thread(target=self._run_loop, args=(loop,), name="hl-asyncio", daemon=True).start()
+                self._loop = loop
+        return self._loop
+    
+    @staticmethod
+    def _run_loop(loop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+    
+    def submit(self, coro):
+        """Schedule coro on the runtime loop and return a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+    
+    def run(self, coro, timeout=None):
+        """Schedule coro and block the calling thread until it completes"""
+        return self.submit(coro).result(timeout)
+
+runtime = AsyncRuntime()
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call on the event loop's executor without stalling the loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+# Signing service configuration
+SIGNING_WORKERS = int(os.environ.get("HL_SIGNING_WORKERS", "0"))  # signing processes; 0 signs on the SDK threads
+
+_worker_wallet = None  # the wallet, inside a signing process
+
+def _init_signing_worker(private_key):
+    global _worker_wallet
+    _worker_wallet = eth_account.Account.from_key(private_key)
+
+def _sign_in_worker(action, vault_address, nonce, expires_after, is_mainnet):
+    return signing.sign_l1_action(_worker_wallet, action, vault_address, nonce, expires_after, is_mainnet)
+
+class SigningService:
+    """
+    Signs L1 actions for the exchange client with strictly increasing nonces.
+    
+    EIP-712 signing is pure Python and holds the GIL, so with workers > 0 it
+    runs in a pool of processes that each hold the wallet's key, and many
+    orders are signed in parallel. The pool is spawned on first use (not
+    forked, the server has threads running) and rebuilt if the wallet
+    changes. Nonces come from one counter, so actions signed in the same
+    millisecond never share one; the exchange accepts them out of order.
+    gunicorn workers signing for the same wallet each own one residue of
+    the nonce modulo nonce_slots (the worker count), so they never collide
+    either.
+    """
+    
+    def __init__(self, workers=SIGNING_WORKERS, nonce_slot=0, nonce_slots=1):
+        self.workers = workers
+        self.nonce_slot = nonce_slot
+        self.nonce_slots = max(nonce_slots, nonce_slot + 1)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_address = None
+        self._last_nonce = 0
+    
+    def next_nonce(self) -> int:
+        """Next millisecond nonce after the last one that falls in this worker's slot"""
+        with self._lock:
+            nonce = max(int(time.time() * 1000), self._last_nonce + 1)
+            self._last_nonce = nonce + (self.nonce_slot - nonce) % self.nonce_slots
+            return self._last_nonce
+    
+    def _get_pool(self, wallet) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None or self._pool_address != wallet.address:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_signing_worker, initargs=(bytes(wallet.key),))
+                self._pool_address = wallet.address
+            return self._pool
+    
+    def start(self, wallet):
+        """Spawn the signing processes ahead of the first order"""
+        if self.workers > 0:
+            list(self._get_pool(wallet).map(abs, range(self.workers)))  # any task makes the pool spawn
+    
+    async def sign(self, exchange, action) -> Tuple[int, Dict]:
+        """Returns (nonce, signature) for action, signed for exchange's wallet and network"""
+        nonce = self.next_nonce()
+        args = (action, exchange.vault_address, nonce, exchange.expires_after, exchange.base_url == constants.MAINNET_API_URL)
+        with SIGNING_LATENCY.time():
+            if self.workers > 0:
+                signature = await asyncio.wrap_future(self._get_pool(exchange.wallet).submit(_sign_in_worker, *args))
+            else:
+                signature = await run_blocking(signing.sign_l1_action, exchange.wallet, *args)
+        return nonce, signature
+    
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+signer = SigningService()
+
+def order_action(exchange, order_requests: List[Dict]) -> Dict:
+    """The SDK's order action for order_requests; KeyError for a coin the client does not know"""
+    return signing.order_wires_to_order_action([
+        signing.order_request_to_order_wire(order, exchange.info.name_to_asset(order["coin"]))
+        for order in order_requests
+    ])
+
+def cancel_action(exchange, cancel_requests: List[Dict]) -> Dict:
+    """The SDK's cancel action for {coin, oid} requests; KeyError for a coin the client does not know"""
+    return {"type": "cancel",
+            "cancels": [{"a": exchange.info.name_to_asset(cancel["coin"]), "o": cancel["oid"]} for cancel in cancel_requests]}
+
+async def post_signed_action(action_name, exchange, action):
+    """Sign action with the shared signer and post it to /exchange, recording latency and errors under action_name"""
+    try:
+        with EXCHANGE_LATENCY.labels(action_name).time():
+            nonce, signature = await signer.sign(exchange, action)
+            return await run_blocking(exchange._post_action, action, signature, nonce)
+    except Exception:
+        EXCHANGE_ERRORS.labels(action_name).inc()
+        raise
+
+def retry_delay(attempt):
+    """Exponential backoff with jitter for the given zero-based attempt"""
+    delay = min(RETRY_BASE_DELAY * (2 ** attempt), RETRY_MAX_DELAY)
+    return random.uniform(delay / 2, delay)
+
+def new_cloid() -> str:
+    """Generate a random client order ID (16 bytes, 0x-prefixed hex)"""
+    return "0x" + secrets.token_hex(16)
+
+async def find_order_by_cloid(info, address, cloid):
+    """
+    Look up an order by client order ID.
+    
+    Returns an order response shaped like exchange.order's if the exchange
+    already knows the order, otherwise None. An order the exchange rejected
+    or cancelled comes back as an error status, so it is not reported placed.
+    """
+    if cloid is None:
+        return None
+    try:
+        lookup = await run_blocking(info.query_order_by_cloid, address, cloid)
+    except Exception as e:
+        print(f"Error looking up order {cloid.to_raw()}: {e}")
+        return None
+    if not isinstance(lookup, dict) or lookup.get("status") != "order":
+        return None
+    
+    order = lookup["order"]
+    oid = order.get("order", {}).get("oid")
+    status = order.get("status")
+    if status in ("open", "triggered"):
+        order_status = {"resting": {"oid": oid}}
+    elif status == "filled":
+        order_status = {"filled": {"oid": oid}}
+    else:
+        # rejected or one of the *Canceled statuses: it landed, but is not working
+        order_status = {"error": f"Order {oid} was {status}"}
+    return {"status": "ok", "response": {"type": "order", "data": {"statuses": [order_status]}}}
+
+async def make_an_order(coin, buy_or_sell, size, price, retries=MAX_RETRIES, cloid=None, submission_id=None):
+    """
+    Place a buy or sell order.
+    
+    Connection errors are retried with exponential backoff and jitter. When a
+    cloid is given, the exchange is asked about it before every retry so an
+    order that landed despite the error is never placed twice.
+    """
     print(f"DEBUG: Attempting to place order - Coin: {coin}, Buy: {buy_or_sell}, Size: {size}, Price: {price}")
-    address, info, exchange = example_utils_3.setup(base_url=constants.MAINNET_API_URL, skip_ws=True)
+    address, info, exchange = await run_blocking(get_exchange_client)
+    refreshed = False
+    order = {'coin': coin, 'buy_or_sell': buy_or_sell, 'size': size, 'price': price,
+             'cloid': cloid.to_raw() if cloid is not None else None}
     
     for attempt in range(retries):
+        update_submission(submission_id, status="submitting", attempts=attempt + 1)
         try:
-            if buy_or_sell:
-                # Place a BUY order
-                order_result = exchange.order(coin, True, size, price, {"limit": {"tif": "Gtc"}})
-                print(f"Buy order: {order_result}")
-            else:
-                # Place a SELL order
-                order_result = exchange.order(coin, False, size, price, {"limit": {"tif": "Gtc"}})
-                print(f"Sell order: {order_result}")
+            action = order_action(exchange, [{"coin": coin, "is_buy": buy_or_sell, "sz": size, "limit_px": price,
+                                              "order_type": {"limit": {"tif": "Gtc"}}, "reduce_only": False, "cloid": cloid}])
+            order_result = await post_signed_action("order", exchange, action)
+            print(f"{'Buy' if buy_or_sell else 'Sell'} order: {order_result}")
+            mirror_order_results(address, [order], split_bulk_result(order_result, 1))
             return order_result
+        except KeyError as e:
+            # Coin unknown to the cached SDK metadata; reload it once in case it was just listed
+            if refreshed:
+                raise
+            print(f"Unknown coin {e}, refreshing exchange metadata...")
+            address, info, exchange = await run_blocking(get_exchange_client, refresh=True)
+            refreshed = True
         except (requests.exceptions.RequestException, urllib3.exceptions.ProtocolError) as e:
             print(f"Error placing order: {e}")
-            print(f"Retrying in {RETRY_DELAY} seconds...")
-            await asyncio.sleep(RETRY_DELAY)
+            existing = await find_order_by_cloid(info, address, cloid)
+            if existing:
+                print(f"Order {cloid.to_raw()} reached the exchange before the error, not retrying")
+                mirror_order_results(address, [order], split_bulk_result(existing, 1))
+                return existing
+            if attempt + 1 < retries:
+                delay = retry_delay(attempt)
+                update_submission(submission_id, status="retrying", error=str(e))
+                ORDER_RETRIES.inc()
+                print(f"Retrying in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
     
     print("Failed to place order after multiple retries.")
     return None
 
-def run_async_make_order(coin, buy_or_sell, size, price):
-    """Wrapper to run async make_order function"""
+def order_result_error(order_result):
+    """Return the exchange's rejection message for an order response, or None if it was accepted"""
+    if not isinstance(order_result, dict) or order_result.get("status") != "ok":
+        return str(order_result.get("response") if isinstance(order_result, dict) else order_result)
+    statuses = order_result.get("response", {}).get("data", {}).get("statuses", [])
+    errors = [status["error"] for status in statuses if isinstance(status, dict) and "error" in status]
+    return "; ".join(errors) if errors else None
+
+# Order submission queue
+MAX_TRACKED_SUBMISSIONS = 1000
+FINAL_SUBMISSION_STATES = ("placed", "rejected", "failed")
+MAX_STATUS_WAIT = 30  # seconds a status request may long-poll
+
+_order_submissions: "OrderedDict[str, Dict]" = OrderedDict()
+_submissions_by_cloid: Dict[str, str] = {}
+_submissions_lock = threading.Lock()
+_submissions_changed = threading.Condition(_submissions_lock)
+
+def submit_order(coin, buy_or_sell, size, price, cloid=None) -> Dict:
+    """
+    Queue an order for background placement and return its submission record.
+    
+    Resubmitting with the same cloid returns the existing submission instead
+    of queueing a second order.
+    """
+    cloid = cloid or new_cloid()
+    with _submissions_lock:
+        existing_id = _submissions_by_cloid.get(cloid)
+        if existing_id in _order_submissions:
+            return dict(_order_submissions[existing_id])
+        
+        submission = {
+            'id': secrets.token_hex(8),
+            'cloid': cloid,
+            'coin': coin,
+            'buy_or_sell': buy_or_sell,
+            'size': size,
+            'price': price,
+            'status': 'queued',
+            'attempts': 0,
+            'result': None,
+            'error': None,
+            'created': time.time(),
+            'updated': time.time()
+        }
+        _order_submissions[submission['id']] = submission
+        _submissions_by_cloid[cloid] = submission['id']
+        _prune_submissions()
+    
+    runtime.submit(_place_submission(submission['id']))
+    return dict(submission)
+
+def _prune_submissions():
+    """Forget the oldest finished submissions; caller holds _submissions_lock"""
+    for submission_id in list(_order_submissions):
+        if len(_order_submissions) <= MAX_TRACKED_SUBMISSIONS:
+            break
+        if _order_submissions[submission_id]['status'] in FINAL_SUBMISSION_STATES:
+            submission = _order_submissions.pop(submission_id)
+            _submissions_by_cloid.pop(submission['cloid'], None)
+
+def update_submission(submission_id, **changes):
+    """Update a tracked submission and wake up anyone waiting on it"""
+    if submission_id is None:
+        return
+    with _submissions_changed:
+        submission = _order_submissions.get(submission_id)
+        if submission is None:
+            return
+        finishing = submission['status'] not in FINAL_SUBMISSION_STATES and changes.get('status') in FINAL_SUBMISSION_STATES
+        submission.update(changes, updated=time.time())
+        _submissions_changed.notify_all()
+    if finishing:
+        ORDER_ROUND_TRIP.labels(submission['status']).observe(submission['updated'] - submission['created'])
+
+def get_submission(submission_id, wait=0.0) -> Optional[Dict]:
+    """Return a copy of the submission, waiting up to wait seconds for it to finish"""
+    deadline = time.monotonic() + wait
+    with _submissions_changed:
+        while True:
+            submission = _order_submissions.get(submission_id)
+            remaining = deadline - time.monotonic()
+            if submission is None or submission['status'] in FINAL_SUBMISSION_STATES or remaining <= 0:
+                return dict(submission) if submission else None
+            _submissions_changed.wait(remaining)
+
+async def _place_submission(submission_id):
+    """Background task that drives one queued order to a final state"""
+    submission = get_submission(submission_id)
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(make_an_order(coin, buy_or_sell, size, price))
-        loop.close()
-        return result
+        order_result = await make_an_order(submission['coin'], submission['buy_or_sell'], submission['size'],
+                                           submission['price'], cloid=Cloid.from_str(submission['cloid']),
+                                           submission_id=submission_id)
     except Exception as e:
-        print(f"Error running make_order function: {str(e)}")
-        return None
+        print(f"Error placing order for submission {submission_id}: {e}")
+        update_submission(submission_id, status='failed', error=str(e))
+        return
+    
+    if order_result is None:
+        update_submission(submission_id, status='failed', error='Failed to place order after multiple retries')
+        return
+    
+    error = order_result_error(order_result)
+    if error:
+        balance_cache.release(submission['cloid'])
+    update_submission(submission_id, status='rejected' if error else 'placed', result=order_result, error=error)
 
+@traced('balances')
 def get_spot_asset_balances(account_address, asset_name=None):
     """Gets the balance of the supplied asset for the supplied address"""
-    url = "https://api.hyperliquid.xyz/info"
-    headers = {
-        "Content-Type": "application/json"
-    }
     body = {
         "type": "spotClearinghouseState",
         "user": account_address
     }
     
     try:
-        response = requests.post(url, headers=headers, json=body, timeout=10)
+        requested_at = time.monotonic()
+        response = post_info(body)
         if response.status_code == 200:
             data = response.json()
             if "balances" in data:
+                balance_cache.update(account_address, data["balances"], requested_at)
                 if asset_name:
                     # Filter out the balance of the specified asset
                     asset_balance = next((balance for balance in data["balances"] if balance["coin"] == asset_name), None)
@@ -105,23 +825,135 @@ def get_spot_asset_balances(account_address, asset_name=None):
         print(f"Error fetching spot balances: {str(e)}")
         return None
 
-def get_all_asset_data() -> Optional[Tuple[Dict[str, str], Dict[str, float]]]:
+# Spot prices allow at most 8 decimals minus the token's size decimals, and 5 significant figures
+SPOT_MAX_PRICE_DECIMALS = 8
+MAX_PRICE_SIG_FIGS = 5
+
+class TokenRegistry:
     """
-    Fetches all asset data and returns both symbol-to-ID mapping and prices.
+    Indexed view of the spot universe, the single source for symbol <-> market ID lookups.
+    
+    Holds O(1) indexes name -> market ('HYPE' -> '@107'), market -> name and
+    token index -> market, plus size/price decimals per market for order
+    rounding. update() only indexes tokens and markets it has not seen yet and
+    swaps in new dicts, so readers never need the lock.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tokens: Dict[int, Dict] = {}  # token index -> token info from spotMeta
+        self.name_to_market: Dict[str, str] = {'USDC': 'USDC'}
+        self.market_to_name: Dict[str, str] = {}
+        self.token_to_market: Dict[int, str] = {}
+        self.markets: Dict[str, Dict] = {}  # market ID -> name, base/quote token, decimals
+    
+    def __len__(self):
+        return len(self.markets)
+    
+    def update(self, spot_meta: Dict) -> int:
+        """Index new tokens and markets from a spotMeta payload; returns how many were added"""
+        with self._lock:
+            new_tokens = [token for token in spot_meta.get('tokens', []) if token['index'] not in self.tokens]
+            new_markets = [market for market in spot_meta.get('universe', []) if market['name'] not in self.markets]
+            if not new_tokens and not new_markets:
+                return 0
+            
+            tokens = dict(self.tokens)
+            tokens.update({token['index']: token for token in new_tokens})
+            name_to_market = dict(self.name_to_market)
+            market_to_name = dict(self.market_to_name)
+            token_to_market = dict(self.token_to_market)
+            markets = dict(self.markets)
+            
+            # Lowest market index first, so a token's oldest USDC market is its primary one
+            for market in sorted(new_markets, key=lambda m: m.get('index', 0)):
+                market_tokens = market.get('tokens', [])
+                if len(market_tokens) < 2:
+                    continue
+                # tokens[1] is usually USDC (index 0), tokens[0] is the actual token
+                base = market_tokens[0] if market_tokens[0] != 0 else market_tokens[1]
+                quote = market_tokens[1] if base == market_tokens[0] else market_tokens[0]
+                token = tokens.get(base)
+                if token is None:
+                    continue
+                
+                market_id = market['name']  # e.g. '@107' or 'PURR/USDC'
+                sz_decimals = token.get('szDecimals', 0)
+                markets[market_id] = {
+                    'market': market_id,
+                    'name': token['name'],
+                    'token_index': base,
+                    'quote_index': quote,
+                    'sz_decimals': sz_decimals,
+                    'price_decimals': max(SPOT_MAX_PRICE_DECIMALS - sz_decimals, 0)
+                }
+                market_to_name[market_id] = token['name']
+                
+                current = token_to_market.get(base)
+                if current is None or (quote == 0 and markets[current]['quote_index'] != 0):
+                    token_to_market[base] = market_id
+                    name_to_market[token['name']] = market_id
+            
+            self.tokens, self.markets = tokens, markets
+            self.name_to_market, self.market_to_name, self.token_to_market = name_to_market, market_to_name, token_to_market
+            return len(new_tokens) + len(new_markets)
+    
+    def coin_name(self, market_id):
+        """'@107' -> 'HYPE'; unknown IDs are returned unchanged"""
+        return self.market_to_name.get(market_id, market_id)
+    
+    def market_id(self, name):
+        """'HYPE' -> '@107'; unknown names are returned unchanged"""
+        return self.name_to_market.get(name, name)
+    
+    def round_size(self, market_id, size):
+        """Round an order size down to the market's lot size, so it never exceeds what was asked"""
+        market = self.markets.get(market_id)
+        if not market:
+            return size
+        rounded = round(size, market['sz_decimals'])
+        if rounded > size:
+            rounded = round(rounded - 10 ** -market['sz_decimals'], market['sz_decimals'])
+        return rounded
+    
+    def round_price(self, market_id, price):
+        """
+        Round a limit price to 5 significant figures and the market's price
+        decimals. Integer prices are valid at any number of significant figures.
+        """
+        market = self.markets.get(market_id)
+        if not market or price <= 0 or price == int(price):
+            return price
+        return round(float(f"{price:.{MAX_PRICE_SIG_FIGS}g}"), market['price_decimals'])
+    
+    def primary_markets(self) -> List[Dict]:
+        """One market per token (its primary one), sorted by token name"""
+        markets = self.markets
+        return sorted((markets[market_id] for market_id in self.token_to_market.values()),
+                      key=lambda m: m['name'])
+
+token_registry = TokenRegistry()
+
+def get_token_registry() -> TokenRegistry:
+    """Return the shared token registry, loading the spot universe on first use"""
+    if not len(token_registry):
+        get_all_asset_data()
+    return token_registry
+
+@traced('universe')
+def _fetch_asset_data() -> Optional[Tuple[Dict[str, str], Dict[str, float]]]:
+    """
+    Downloads spotMetaAndAssetCtxs, updates the token registry and builds prices.
     
     Returns:
         Tuple of (symbol_to_id_dict, price_dict) or None if error
     """
-    url = "https://api.hyperliquid.xyz/info"
-    headers = {
-        "Content-Type": "application/json"
-    }
     body = {
         "type": "spotMetaAndAssetCtxs"
     }
     
     try:
-        response = requests.post(url, headers=headers, json=body, timeout=5)
+        response = post_info(body)
         response.raise_for_status()
         data = response.json()
         
@@ -137,216 +969,835 @@ def get_all_asset_data() -> Optional[Tuple[Dict[str, str], Dict[str, float]]]:
                 if coin_id and midPx is not None:
                     price_dict[coin_id] = float(midPx)
             
-            # Create a mapping from token names to their actual price IDs
-            symbol_to_id = {}
-            
-            # Handle tokens
-            if 'tokens' in universe:
-                token_index_to_name = {}
-                for token in universe['tokens']:
-                    token_name = token['name']
-                    token_index = token['index']
-                    token_index_to_name[token_index] = token_name
-                
-                # Now map universe trading pairs to token names
-                if 'universe' in universe:
-                    for market in universe['universe']:
-                        market_name = market['name']  # e.g., '@1', '@2', etc.
-                        tokens = market.get('tokens', [])
-                        
-                        # If this market has tokens, map the first token to this market ID
-                        if len(tokens) >= 2:
-                            # tokens[0] is usually USDC (index 0), tokens[1] is the actual token
-                            token_index = tokens[0] if tokens[0] != 0 else tokens[1]
-                            if token_index in token_index_to_name:
-                                token_symbol = token_index_to_name[token_index]
-                                symbol_to_id[token_symbol] = market_name
-            
-            # Special handling for known tokens
-            known_mappings = {
-                'HYPE': '@107',
-                'PURR': '@1',
-                'FUSD': '@153',
-                'USDT0': '@166',
-                'USDHL': '@180',
-                # Add more as needed
-            }
-            
-            for symbol, price_id in known_mappings.items():
-                if price_id in price_dict:
-                    symbol_to_id[symbol] = price_id
+            # Only newly listed tokens and markets are indexed
+            added = token_registry.update(universe)
+            if added:
+                print(f"Token registry: indexed {added} new tokens/markets")
             
             # Handle USDC specially
-            symbol_to_id['USDC'] = 'USDC'
             price_dict['USDC'] = 1.0
             
-            return symbol_to_id, price_dict
+            return token_registry.name_to_market, price_dict
+        
+        return None
+        
+    except (requests.RequestException, ValueError, KeyError) as e:
+        print(f"Error fetching asset data: {e}")
+        return None
+
+def _fetch_mid_prices() -> Optional[Dict[str, float]]:
+    """
+    Fetches spot mid prices from allMids, a much smaller payload than spotMetaAndAssetCtxs.
+    
+    Returns:
+        price_dict keyed like the asset contexts ('@107', 'PURR/USDC', 'USDC') or None if error
+    """
+    try:
+        response = post_info({"type": "allMids"})
+        response.raise_for_status()
+        mids = response.json()
+        
+        # allMids also carries perp mids keyed by plain coin names; keep spot markets only
+        price_dict = {
+            coin_id: float(mid)
+            for coin_id, mid in mids.items()
+            if coin_id.startswith('@') or '/' in coin_id
+        }
+        price_dict['USDC'] = 1.0
+        return price_dict
+    
+    except (requests.RequestException, ValueError, AttributeError) as e:
+        print(f"Error fetching mid prices: {e}")
+        return None
+
+# Market data cache configuration
+UNIVERSE_TTL = 300  # seconds before the token universe is revalidated
+PRICE_TTL = 5  # seconds before mid prices are revalidated
+MAX_PRICE_STALENESS = 60  # older prices make callers wait for a refresh instead
+HELD_COIN_TTL = 300  # seconds a valued coin keeps the REST prices revalidating when the stream lacks it
+
+class MarketDataCache:
+    """
+    Process-wide cache of the spot token universe (symbol_to_id) and mid prices.
+    
+    The universe and the prices have separate TTLs. Stale data is served while a
+    single background thread revalidates it, and callers that have to wait (empty
+    cache or prices older than max_staleness) share one upstream fetch. With the
+    price stream up, the REST prices only stop revalidating while the stream
+    has a fresh mid for every coin valued in the last HELD_COIN_TTL seconds.
+    """
+    
+    def __init__(self, universe_ttl=UNIVERSE_TTL, price_ttl=PRICE_TTL, max_staleness=MAX_PRICE_STALENESS):
+        self.universe_ttl = universe_ttl
+        self.price_ttl = price_ttl
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()  # guards the cached values below
+        self._refresh_lock = threading.Lock()  # held while fetching from upstream
+        self._symbol_to_id = None
+        self._prices = None
+        self._universe_time = 0.0
+        self._price_time = 0.0
+        self._refreshing = False
+        self._held: Dict[str, float] = {}  # asset id -> last time a balance of it was valued
+        self._version = 0  # bumped whenever a refresh changes the universe or REST prices
+        self.live_prices = None  # LiveMarketData fed by the WebSocket stream, if enabled
+    
+    def _snapshot(self, live=None):
+        if self._symbol_to_id is None:
+            return None
+        if not live:
+            return self._symbol_to_id, self._prices
+        # Streamed mids win; coins the stream has gone quiet on keep their REST price
+        prices = dict(self._prices)
+        prices.update(live)
+        return self._symbol_to_id, prices
+    
+    def _live(self):
+        return self.live_prices.fresh_mids() if self.live_prices is not None else None
+    
+    def note_held(self, asset_ids):
+        """Record coins that were just valued, so their REST prices stay fresh if the stream lacks them"""
+        now = time.monotonic()
+        with self._lock:
+            self._held.update(dict.fromkeys(asset_ids, now))
+    
+    def _live_covers_held(self, live, now) -> bool:
+        """Whether the stream has a fresh mid for every recently valued coin (call with _lock held)"""
+        if not live:
+            return False
+        cutoff = now - HELD_COIN_TTL
+        for asset_id, valued in list(self._held.items()):
+            if valued < cutoff:
+                del self._held[asset_id]
+            elif asset_id not in live and asset_id not in ('USDC', 'USDC/USD'):
+                return False
+        return True
+    
+    def get(self) -> Optional[Tuple[Dict[str, str], Dict[str, float]]]:
+        """Return (symbol_to_id, price_dict); treat both dicts as read-only"""
+        now = time.monotonic()
+        live = self._live()
+        with self._lock:
+            snapshot = self._snapshot(live)
+            prices_age = 0.0 if self._live_covers_held(live, now) else now - self._price_time
+            fresh = now - self._universe_time <= self.universe_ttl and prices_age <= self.price_ttl
+            if snapshot and fresh:
+                MARKET_DATA_HIT.inc()
+                return snapshot
+            
+            usable = snapshot is not None and prices_age <= self.max_staleness
+            if usable:
+                # Stale-while-revalidate: at most one background refresh at a time
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(target=self._background_refresh, daemon=True).start()
+                MARKET_DATA_STALE.inc()
+                return snapshot
         
+        # Nothing usable cached; concurrent callers queue on the refresh lock
+        MARKET_DATA_MISS.inc()
+        self.refresh()
+        with self._lock:
+            return self._snapshot(live)
+    
+    def refresh(self, force=False):
+        """Fetch whatever is stale (or everything if force) from upstream"""
+        with self._refresh_lock:
+            now = time.monotonic()
+            live = self._live()
+            with self._lock:
+                universe_stale = force or self._symbol_to_id is None or now - self._universe_time > self.universe_ttl
+                prices_stale = force or (not self._live_covers_held(live, now) and now - self._price_time > self.price_ttl)
+            
+            if universe_stale:
+                # The universe download carries prices too
+                asset_data = _fetch_asset_data()
+                if asset_data:
+                    with self._lock:
+                        if asset_data != (self._symbol_to_id, self._prices):
+                            self._version += 1
+                        self._symbol_to_id, self._prices = asset_data
+                        self._universe_time = self._price_time = time.monotonic()
+            elif prices_stale:
+                prices = _fetch_mid_prices()
+                if prices is not None:
+                    with self._lock:
+                        if prices != self._prices:
+                            self._version += 1
+                        self._prices = prices
+                        self._price_time = time.monotonic()
+    
+    def version(self) -> Tuple:
+        """Changes whenever get() may return different data: REST refreshes and streamed updates"""
+        live = self.live_prices
+        if live is None:
+            return (self._version,)
+        return (self._version, live.version, live.stream.connected)
+    
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Error refreshing market data: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+market_data = MarketDataCache()
+
+# WebSocket streaming configuration
+WS_URL = API_URL.replace("https://", "wss://", 1).replace("http://", "ws://", 1) + "/ws"
+WS_PING_INTERVAL = 50  # seconds; the server drops connections that stay silent for 60s
+WS_RECONNECT_MAX_DELAY = 30  # cap for the reconnect backoff, before jitter
+PRICE_STREAM_ENABLED = os.environ.get("HL_PRICE_STREAM", "0") == "1"
+STREAM_BOOK_COINS = [coin for coin in os.environ.get("HL_STREAM_BOOK_COINS", "@153,@166,@180,@107").split(",") if coin]
+MAX_STREAM_PRICE_AGE = 30  # seconds; older streamed mids fall back to the REST snapshot
+
+class HyperliquidStream:
+    """
+    One WebSocket connection to the Hyperliquid API that keeps itself alive.
+    
+    Subscriptions are remembered and re-sent after every reconnect, reconnects
+    back off exponentially with jitter, and incoming messages are dispatched
+    to callbacks by channel.
+    """
+    
+    def __init__(self, url=WS_URL, name="hl-ws"):
+        self.url = url
+        self.name = name
+        self._lock = threading.Lock()
+        self._subscriptions: List[Dict] = []
+        self._handlers: Dict[str, List[Callable]] = {}
+        self._connect_callbacks: List[Callable] = []
+        self._ws = None
+        self._stop = threading.Event()
+        self._started = False
+        self.connected = False
+        self.connections = 0  # successful connects, including reconnects
+        self.last_message_time = 0.0
+    
+    def subscribe(self, subscription: Dict, channel: str, callback: Callable):
+        """Subscribe (now if connected, otherwise on connect) and route channel messages to callback"""
+        with self._lock:
+            if subscription not in self._subscriptions:
+                self._subscriptions.append(subscription)
+            self._handlers.setdefault(channel, []).append(callback)
+            ws = self._ws if self.connected else None
+        if ws is not None:
+            self._send(ws, {"method": "subscribe", "subscription": subscription})
+    
+    def unsubscribe(self, subscription: Dict):
+        """Drop a subscription; channel handlers stay registered"""
+        with self._lock:
+            if subscription not in self._subscriptions:
+                return
+            self._subscriptions.remove(subscription)
+            ws = self._ws if self.connected else None
+        if ws is not None:
+            self._send(ws, {"method": "unsubscribe", "subscription": subscription})
+    
+    def on_connect(self, callback: Callable):
+        """Call callback (on its own thread) after every successful connect, e.g. to resync state"""
+        with self._lock:
+            self._connect_callbacks.append(callback)
+    
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name=self.name, daemon=True).start()
+        threading.Thread(target=self._heartbeat, name=f"{self.name}-ping", daemon=True).start()
+    
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            ws.close()
+    
+    def _send(self, ws, message):
+        try:
+            ws.send(json.dumps(message))
+        except Exception as e:
+            print(f"Error sending to {self.name}: {e}")
+    
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            ws = websocket.WebSocketApp(self.url,
+                                        on_open=self._on_open,
+                                        on_message=self._on_message,
+                                        on_error=self._on_error)
+            self._ws = ws
+            ws.run_forever()
+            
+            was_connected = self.connected
+            self.connected = False
+            if self._stop.is_set():
+                break
+            failures = 0 if was_connected else failures + 1
+            delay = min(2 ** failures, WS_RECONNECT_MAX_DELAY)
+            delay = random.uniform(delay / 2, delay)
+            print(f"{self.name} disconnected, reconnecting in {delay:.1f} seconds...")
+            self._stop.wait(delay)
+    
+    def _heartbeat(self):
+        while not self._stop.wait(WS_PING_INTERVAL):
+            ws = self._ws
+            if ws is not None and self.connected:
+                self._send(ws, {"method": "ping"})
+    
+    def _on_open(self, ws):
+        with self._lock:
+            self.connected = True
+            self.connections += 1
+            subscriptions = list(self._subscriptions)
+            callbacks = list(self._connect_callbacks)
+        for subscription in subscriptions:
+            self._send(ws, {"method": "subscribe", "subscription": subscription})
+        for callback in callbacks:
+            threading.Thread(target=callback, daemon=True).start()
+    
+    def _on_error(self, ws, error):
+        print(f"{self.name} error: {error}")
+    
+    def _on_message(self, ws, message):
+        self.last_message_time = time.monotonic()
+        if message == "Websocket connection established.":
+            return
+        try:
+            msg = json.loads(message)
+        except ValueError:
+            return
+        with self._lock:
+            handlers = list(self._handlers.get(msg.get("channel"), []))
+        for handler in handlers:
+            try:
+                handler(msg.get("data"))
+            except Exception as e:
+                print(f"Error handling {msg.get('channel')} message: {e}")
+
+class LiveMarketData:
+    """
+    In-memory mid prices and L2 books pushed by the WebSocket stream.
+    
+    Every coin keeps its own last-update time; fresh_mids() only returns coins
+    updated within max_age while the connection is up, so valuation falls back
+    to the REST snapshot coin by coin.
+    """
+    
+    def __init__(self, stream: HyperliquidStream, max_age=MAX_STREAM_PRICE_AGE):
+        self.stream = stream
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._mids: Dict[str, float] = {}
+        self._books: Dict[str, Dict] = {}
+        self._updated: Dict[str, float] = {}
+        self.version = 0  # bumped on every streamed update
+    
+    def subscribe(self, book_coins=()):
+        self.stream.subscribe({"type": "allMids"}, "allMids", self._on_all_mids)
+        for coin in book_coins:
+            self.stream.subscribe({"type": "l2Book", "coin": coin}, "l2Book", self._on_l2_book)
+    
+    def _on_all_mids(self, data):
+        now = time.monotonic()
+        mids = {coin: float(mid) for coin, mid in data.get("mids", {}).items() if coin.startswith('@') or '/' in coin}
+        with self._lock:
+            self._mids.update(mids)
+            self._updated.update(dict.fromkeys(mids, now))
+            self.version += 1
+    
+    def _on_l2_book(self, data):
+        coin = data.get("coin")
+        bids, asks = data.get("levels", [[], []])
+        with self._lock:
+            self._books[coin] = {'time': time.monotonic(), 'bids': bids, 'asks': asks}
+            if bids and asks:
+                self._mids[coin] = (float(bids[0]['px']) + float(asks[0]['px'])) / 2
+                self._updated[coin] = time.monotonic()
+            self.version += 1
+    
+    def fresh_mids(self) -> Optional[Dict[str, float]]:
+        """Mids updated within max_age, or None when the stream is down or silent"""
+        if not self.stream.connected:
+            return None
+        cutoff = time.monotonic() - self.max_age
+        with self._lock:
+            mids = {coin: mid for coin, mid in self._mids.items() if self._updated[coin] >= cutoff}
+        return mids or None
+    
+    def book(self, coin) -> Optional[Dict]:
+        """Latest streamed L2 book for coin if it is fresh, else None"""
+        with self._lock:
+            book = self._books.get(coin)
+        if not self.stream.connected or book is None or time.monotonic() - book['time'] > self.max_age:
+            return None
+        return book
+    
+    def status(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            staleness = {coin: now - updated for coin, updated in self._updated.items()}
+        return {
+            'connected': self.stream.connected,
+            'connections': self.stream.connections,
+            'coins': len(staleness),
+            'stale_coins': sorted(coin for coin, age in staleness.items() if age > self.max_age),
+            'staleness_seconds': {coin: staleness[coin] for coin in STREAM_BOOK_COINS if coin in staleness}
+        }
+
+_price_stream_lock = threading.Lock()
+
+def ensure_price_stream():
+    """Start the shared market data stream on first use when HL_PRICE_STREAM=1"""
+    if not PRICE_STREAM_ENABLED or market_data.live_prices is not None:
+        return
+    with _price_stream_lock:
+        if market_data.live_prices is None:
+            live = LiveMarketData(HyperliquidStream(name="hl-ws-market"))
+            live.subscribe(STREAM_BOOK_COINS)
+            live.stream.start()
+            market_data.live_prices = live
+
+@traced('market_data')
+def get_all_asset_data() -> Optional[Tuple[Dict[str, str], Dict[str, float]]]:
+    """
+    Returns both symbol-to-ID mapping and prices from the shared market data cache.
+    
+    With the price stream enabled, prices come from the WebSocket feed without
+    any network call, falling back to the REST snapshot for stale coins.
+    
+    Returns:
+        Tuple of (symbol_to_id_dict, price_dict) or None if error
+    """
+    ensure_price_stream()
+    return market_data.get()
+
+class PortfolioValuation:
+    """
+    Columnar valuation of a wallets x coins balance matrix against one price snapshot.
+    
+    Row i is wallet i, column j is coins[j]. Values, weights and available
+    balances (total - hold) are computed with whole-array operations in one
+    pass; order(i) lists wallet i's columns by USDC value, highest first, and
+    is only sorted for the rows that are turned into records.
+    """
+    
+    def __init__(self, coins, asset_ids, prices, totals, holds):
+        self.coins = coins
+        self.asset_ids = asset_ids
+        self.prices = prices
+        self.totals = totals
+        self.holds = holds
+        self.held = totals > 0
+        self.values = np.where(self.held, totals * prices, 0.0)
+        self.available = totals - holds
+        self.wallet_totals = self.values.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.weights = np.nan_to_num(self.values / self.wallet_totals[:, None])
+    
+    def order(self, row) -> np.ndarray:
+        return np.argsort(-self.values[row], kind='stable')
+    
+    def wallet_assets(self, row) -> List[Dict]:
+        """Non-zero balances of one wallet as dicts, highest value first"""
+        order = self.order(row)
+        columns = order[self.held[row][order]]
+        # Slice whole columns out as Python floats instead of converting cell by cell
+        return [
+            {
+                'coin': self.coins[j],
+                'asset_id': self.asset_ids[j],
+                'total_balance': total,
+                'hold_balance': hold,
+                'available_balance': available,
+                'price_usdc': price,
+                'value_usdc': value,
+                'weight': weight
+            }
+            for j, total, hold, available, price, value, weight in zip(
+                columns.tolist(),
+                self.totals[row, columns].tolist(),
+                self.holds[row, columns].tolist(),
+                self.available[row, columns].tolist(),
+                self.prices[columns].tolist(),
+                self.values[row, columns].tolist(),
+                self.weights[row, columns].tolist()
+            )
+        ]
+
+def _parse_amounts(amounts) -> np.ndarray:
+    """Parse balance strings in one call, falling back per item when some are malformed"""
+    try:
+        return np.asarray(amounts, dtype=np.float64)
+    except (ValueError, TypeError):
+        parsed = np.zeros(len(amounts))
+        for i, amount in enumerate(amounts):
+            try:
+                parsed[i] = float(amount)
+            except (ValueError, TypeError):
+                pass
+        return parsed
+
+@traced('valuation')
+def value_portfolios(balances_by_wallet: List[Optional[List[Dict]]], asset_data) -> PortfolioValuation:
+    """
+    Value many wallets at once; a None entry (failed fetch) becomes an empty row.
+    
+    Args:
+        balances_by_wallet: spotClearinghouseState balances per wallet
+        asset_data: (symbol_to_id, price_dict) snapshot, or None for zero prices
+    """
+    # One flat pass per field; the per-balance work stays in comprehensions and C-level map()
+    flat = [balance for balances in balances_by_wallet if balances for balance in balances]
+    names = [balance.get('coin', '') for balance in flat]
+    coins = list(dict.fromkeys(names))  # columns in order of first appearance
+    coin_columns = {coin: j for j, coin in enumerate(coins)}
+    rows = np.repeat(np.arange(len(balances_by_wallet)), [len(balances) if balances else 0 for balances in balances_by_wallet])
+    cols = np.fromiter(map(coin_columns.__getitem__, names), dtype=np.intp, count=len(names))
+    totals_raw = [balance.get('total') or 0 for balance in flat]
+    holds_raw = [balance.get('hold') or 0 for balance in flat]
+    
+    symbol_to_id, prices = asset_data or ({}, {})
+    asset_ids = [symbol_to_id.get(coin, coin) for coin in coins]  # Fallback to coin name if no mapping found
+    if asset_data:
+        market_data.note_held(asset_ids)
+    price_vector = np.zeros(len(coins))
+    for j, coin in enumerate(coins):
+        if coin == 'USDC' or coin == 'USDC/USD':
+            # USDC is the base currency, so price is 1
+            price_vector[j] = 1.0
+        elif asset_data:
+            # Try the asset ID first, then the original coin name
+            price_vector[j] = prices.get(asset_ids[j], 0.0) or prices.get(coin, 0.0)
+    
+    totals = np.zeros((len(balances_by_wallet), len(coins)))
+    holds = np.zeros_like(totals)
+    if flat:
+        totals[rows, cols] = _parse_amounts(totals_raw)
+        holds[rows, cols] = _parse_amounts(holds_raw)
+    
+    return PortfolioValuation(coins, asset_ids, price_vector, totals, holds)
+
+@traced('fetch')
+def fetch_portfolios(addresses: List[str]) -> Tuple[Dict[str, Optional[List[Dict]]], Optional[Tuple[Dict[str, str], Dict[str, float]]]]:
+    """
+    Fetch balances for every address and one shared price snapshot, all concurrently.
+    
+    Returns:
+        Tuple of ({address: balances_or_None}, asset_data)
+    """
+    executor = get_info_executor()
+    asset_future = executor.submit(get_all_asset_data)
+    balance_futures = {address: executor.submit(get_spot_asset_balances, address) for address in addresses}
+    balances_by_address = {address: future.result() for address, future in balance_futures.items()}
+    return balances_by_address, asset_future.result()
+
+def summarize_portfolios(balances_by_address: Dict[str, Optional[List[Dict]]], asset_data, include_assets=True) -> Dict:
+    """
+    Value every wallet against the same price snapshot and consolidate per coin.
+    
+    Per-wallet asset records are one dict per balance, which costs more than
+    the valuation itself for many wallets; include_assets=False leaves them out.
+    
+    Returns:
+        Dict with 'wallets' (per-address portfolios, with 'assets' unless left
+        out), 'coins' (totals per coin, highest value first) and 'total_value_usdc'
+    """
+    addresses = list(balances_by_address)
+    valuation = value_portfolios([balances_by_address[address] for address in addresses], asset_data)
+    
+    wallets = []
+    for i, address in enumerate(addresses):
+        if balances_by_address[address] is None:
+            wallets.append({'address': address, 'success': False, 'error': 'Failed to fetch spot balances'})
+        else:
+            wallet = {'address': address, 'success': True, 'total_value_usdc': float(valuation.wallet_totals[i])}
+            if include_assets:
+                wallet['assets'] = valuation.wallet_assets(i)
+            wallets.append(wallet)
+    
+    # Consolidate columns across wallets; only positive balances count
+    coin_totals = np.where(valuation.held, valuation.totals, 0.0).sum(axis=0)
+    coin_holds = np.where(valuation.held, valuation.holds, 0.0).sum(axis=0)
+    coin_values = valuation.values.sum(axis=0)
+    coins = [
+        {
+            'coin': valuation.coins[j],
+            'asset_id': valuation.asset_ids[j],
+            'price_usdc': float(valuation.prices[j]),
+            'total_balance': float(coin_totals[j]),
+            'hold_balance': float(coin_holds[j]),
+            'value_usdc': float(coin_values[j])
+        }
+        for j in np.argsort(-coin_values, kind='stable').tolist()
+        if coin_totals[j] > 0
+    ]
+    
+    return {
+        'wallets': wallets,
+        'coins': coins,
+        'total_value_usdc': float(valuation.wallet_totals.sum())
+    }
+
+def build_balance_records(balances, asset_data) -> Tuple[List[Dict], float]:
+    """
+    Build typed balance records (numbers, not display strings) for the JSON API.
+    
+    Every balance is included, even without price data, sorted by USDC value.
+    
+    Returns:
+        Tuple of (records, total_value_usdc)
+    """
+    valuation = value_portfolios([balances], asset_data)
+    order = valuation.order(0)
+    records = [
+        {
+            'coin': valuation.coins[j],
+            'asset_id': valuation.asset_ids[j],
+            'total': total,
+            'hold': hold,
+            'available': available,
+            'price_usdc': price,
+            'value_usdc': value,
+            'weight': weight
+        }
+        for j, total, hold, available, price, value, weight in zip(
+            order.tolist(),
+            valuation.totals[0, order].tolist(),
+            valuation.holds[0, order].tolist(),
+            valuation.available[0, order].tolist(),
+            valuation.prices[order].tolist(),
+            valuation.values[0, order].tolist(),
+            valuation.weights[0, order].tolist()
+        )
+    ]
+    return records, float(valuation.wallet_totals[0])
+
+# Depth-aware exit valuation configuration
+BOOK_TTL = 2  # seconds a REST l2Book snapshot is reused
+BOOK_DEPTH = 20  # levels per side walked; l2Book returns at most 20
+
+def _parse_book(bids, asks) -> Dict[str, np.ndarray]:
+    """Parse l2Book levels ({'px', 'sz', 'n'} strings) into price and size arrays"""
+    bids, asks = bids[:BOOK_DEPTH], asks[:BOOK_DEPTH]
+    return {
+        'bid_px': _parse_amounts([level.get('px') for level in bids]),
+        'bid_sz': _parse_amounts([level.get('sz') for level in bids]),
+        'ask_px': _parse_amounts([level.get('px') for level in asks]),
+        'ask_sz': _parse_amounts([level.get('sz') for level in asks]),
+    }
+
+def _fetch_book(coin) -> Optional[Dict[str, np.ndarray]]:
+    try:
+        response = post_info({"type": "l2Book", "coin": coin}, PRIORITY_NORMAL)
+        if response.status_code != 200:
+            print(f"Error fetching l2Book for {coin}: status {response.status_code}")
+            return None
+        levels = (response.json() or {}).get('levels') or [[], []]
+        return _parse_book(levels[0], levels[1])
+    except Exception as e:
+        print(f"Error fetching l2Book for {coin}: {e}")
         return None
+
+class OrderBookCache:
+    """
+    Short-lived cache of parsed L2 books for exit valuation.
+    
+    A fresh book from the WebSocket stream wins; otherwise a REST snapshot
+    younger than ttl is reused, and the remaining coins are fetched with
+    l2Book concurrently on the /info executor.
+    """
+    
+    def __init__(self, ttl=BOOK_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._books: Dict[str, Tuple[float, Dict[str, np.ndarray]]] = {}
+    
+    def get_many(self, coins: List[str]) -> Dict[str, Optional[Dict[str, np.ndarray]]]:
+        """Books for every coin, None where no book could be had"""
+        books = {}
+        live = market_data.live_prices
+        now = time.monotonic()
+        missing = []
+        for coin in coins:
+            streamed = live.book(coin) if live is not None else None
+            if streamed is not None:
+                books[coin] = _parse_book(streamed['bids'], streamed['asks'])
+                continue
+            with self._lock:
+                cached = self._books.get(coin)
+            if cached is not None and now - cached[0] <= self.ttl:
+                books[coin] = cached[1]
+            else:
+                missing.append(coin)
         
-    except (requests.RequestException, ValueError, KeyError) as e:
-        print(f"Error fetching asset data: {e}")
-        return None
+        executor = get_info_executor()
+        futures = {coin: executor.submit(_fetch_book, coin) for coin in missing}
+        for coin, future in futures.items():
+            book = books[coin] = future.result()
+            if book is not None:
+                with self._lock:
+                    self._books[coin] = (time.monotonic(), book)
+        return books
 
-def calculate_portfolio_value(account_address: str) -> Tuple[List[Dict], float]:
+order_books = OrderBookCache()
+
+def walk_bids(books: List[Optional[Dict[str, np.ndarray]]], sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Calculate the total portfolio value in USDC for all non-zero balances.
+    Sell sizes[i] into the bids of books[i], for every coin at once.
+    
+    The books are padded into coins x levels matrices; the size resting
+    ahead of each level gives how much of it each sale takes, so there is
+    no per-level Python loop.
     
     Returns:
-        Tuple of (portfolio_details, total_value_usdc)
+        Tuple of (filled size, USDC proceeds) per coin
     """
-    # Get all balances for the account
-    balances = get_spot_asset_balances(account_address)
-    if not balances:
-        print("No balances found or error fetching balances")
-        return [], 0.0
+    depth = max((len(book['bid_px']) for book in books if book is not None), default=0)
+    prices = np.zeros((len(books), depth))
+    levels = np.zeros_like(prices)
+    for i, book in enumerate(books):
+        if book is not None:
+            n = len(book['bid_px'])
+            prices[i, :n] = book['bid_px']
+            levels[i, :n] = book['bid_sz']
+    ahead = np.cumsum(levels, axis=1) - levels
+    fills = np.clip(sizes[:, None] - ahead, 0.0, levels)
+    return fills.sum(axis=1), (fills * prices).sum(axis=1)
+
+@traced('exit_value')
+def value_exits(coins: List[str], asset_ids: List[str], sizes: np.ndarray, mids: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Value positions at what selling them into the current bids would fetch.
     
-    # Get asset data (mappings and prices)
-    asset_data = get_all_asset_data()
-    if not asset_data:
-        print("Error fetching asset data")
-        return [], 0.0
+    USDC is taken at par. Size the book cannot absorb is reported as
+    unfilled and adds nothing to the exit value; exit price and slippage
+    (versus the mid) are NaN where nothing could be sold.
     
-    symbol_to_id, prices = asset_data
+    Returns:
+        Dict of arrays: exit_value, exit_price, slippage, unfilled
+    """
+    usdc = np.array([coin in ('USDC', 'USDC/USD') for coin in coins], dtype=bool)
+    sold = (sizes > 0) & ~usdc
+    columns = np.flatnonzero(sold)
+    books = order_books.get_many([asset_ids[j] for j in columns.tolist()])
     
-    portfolio = []
-    total_value_usdc = 0.0
+    filled = np.where(usdc, sizes, 0.0)
+    proceeds = filled.copy()
+    if len(columns):
+        filled[columns], proceeds[columns] = walk_bids([books[asset_ids[j]] for j in columns.tolist()], sizes[columns])
     
-    for balance in balances:
-        coin = balance.get('coin', '')
-        total_balance = balance.get('total', '0')
-        hold_balance = balance.get('hold', '0')
-        
-        # Use total balance for calculations
-        try:
-            balance_amount = float(total_balance)
-            hold_amount = float(hold_balance) if hold_balance else 0.0
-            
-            # Skip if zero or negative balance
-            if balance_amount <= 0:
-                continue
-        except (ValueError, TypeError):
-            continue
-        
-        # Get the asset ID for this coin
-        asset_id = symbol_to_id.get(coin, coin)  # Fallback to coin name if no mapping found
-        
-        # Get price for this asset
-        if coin == 'USDC' or coin == 'USDC/USD':
-            # USDC is the base currency, so price is 1
-            price_usdc = 1.0
-        else:
-            # Try to get price using the asset ID
-            price_usdc = prices.get(asset_id, 0.0)
-            # If not found, try the original coin name
-            if price_usdc == 0.0:
-                price_usdc = prices.get(coin, 0.0)
-        
-        # Calculate USDC value using total balance
-        usdc_value = balance_amount * price_usdc
-        
-        # Add to portfolio
-        asset_info = {
-            'coin': coin,
-            'asset_id': asset_id,
-            'total_balance': balance_amount,
-            'hold_balance': hold_amount,
-            'price_usdc': price_usdc,
-            'value_usdc': usdc_value
-        }
-        portfolio.append(asset_info)
-        total_value_usdc += usdc_value
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exit_price = np.where(filled > 0, proceeds / filled, np.nan)
+        slippage = np.where(mids > 0, 1.0 - exit_price / mids, np.nan)
+    return {
+        'exit_value': proceeds,
+        'exit_price': exit_price,
+        'slippage': slippage,
+        'unfilled': np.where(sizes > 0, sizes - filled, 0.0),
+    }
+
+def _finite_or_none(values: np.ndarray) -> List[Optional[float]]:
+    """NaN is not valid JSON, so missing values go out as null"""
+    return [value if value == value else None for value in values.tolist()]
+
+def add_exit_values(records: List[Dict], size_key: str) -> float:
+    """
+    Add exit_value_usdc, exit_price_usdc, slippage and unfilled to balance
+    records in place, selling record[size_key] of every coin.
     
-    return portfolio, total_value_usdc
+    Returns:
+        Total exit value in USDC
+    """
+    if not records:
+        return 0.0
+    exits = value_exits([record['coin'] for record in records],
+                        [record['asset_id'] for record in records],
+                        np.array([record[size_key] for record in records], dtype=np.float64),
+                        np.array([record['price_usdc'] for record in records], dtype=np.float64))
+    for record, value, price, slippage, unfilled in zip(
+        records,
+        exits['exit_value'].tolist(),
+        _finite_or_none(exits['exit_price']),
+        _finite_or_none(exits['slippage']),
+        exits['unfilled'].tolist()
+    ):
+        record.update(exit_value_usdc=value, exit_price_usdc=price, slippage=slippage, unfilled=unfilled)
+    return float(exits['exit_value'].sum())
+
+def build_order_records(orders) -> List[Dict]:
+    """Build typed open-order records for the JSON API"""
+    records = []
+    for order in orders or []:
+        coin_symbol = order.get('coin', 'N/A')
+        records.append({
+            'coin': coin_symbol,
+            'coin_name': get_coin(coin_symbol),
+            'side': order.get('side'),
+            'is_buy': order.get('side') == 'B',
+            'size': float(order.get('sz') or 0),
+            'orig_size': float(order.get('origSz') or order.get('sz') or 0),
+            'limit_price': float(order.get('limitPx') or 0),
+            'oid': order.get('oid'),
+            'timestamp': order.get('timestamp')
+        })
+    return records
 
-def format_spot_balances_with_values(balances, account_address):
-    """Format spot balances for display with USDC values"""
+@traced('format')
+def format_spot_balances_with_values(balances, asset_data):
+    """Format spot balances for display with USDC values, using a prefetched asset data snapshot"""
     if not balances:
         return "<pre>No spot balances found.\n</pre>"
     
-    # Calculate portfolio values
-    portfolio, total_value = calculate_portfolio_value(account_address)
-    
-    # Create a lookup dict for values by coin
-    value_lookup = {item['coin']: item for item in portfolio}
+    # Valued and sorted by USDC value (descending) in one pass
+    records, total_value = build_balance_records(balances, asset_data)
     
     result_text = "<pre>💰 Spot Balances with USDC Values:\n"
     result_text += "=" * 60 + "\n\n"
     
-    # Sort balances by USDC value (descending)
-    sorted_balances = []
-    for balance in balances:
-        coin = balance.get('coin', 'N/A')
-        total = balance.get('total', '0')
-        hold = balance.get('hold', '0')
-        
-        # Get value info
-        value_info = value_lookup.get(coin, {})
-        asset_id = value_info.get('asset_id', 'N/A')
-        price_usdc = value_info.get('price_usdc', 0.0)
-        value_usdc = value_info.get('value_usdc', 0.0)
-        
-        sorted_balances.append({
-            'coin': coin,
-            'asset_id': asset_id,
-            'total': total,
-            'hold': hold,
-            'price_usdc': price_usdc,
-            'value_usdc': value_usdc
-        })
-    
-    # Sort by USDC value descending
-    sorted_balances.sort(key=lambda x: x['value_usdc'], reverse=True)
-    
-    for balance in sorted_balances:
+    for balance in records:
         coin = balance['coin']
         asset_id = balance['asset_id']
-        total = balance['total']
-        hold = balance['hold']
+        total_float = balance['total']
+        hold_float = balance['hold']
         price_usdc = balance['price_usdc']
         value_usdc = balance['value_usdc']
         
-        # Convert to float and format with commas
-        try:
-            total_float = float(total)
-            hold_float = float(hold)
-            
-            # Format numbers with commas and appropriate decimal places
-            if total_float >= 1:
-                total_formatted = f"{total_float:,.2f}".rstrip('0').rstrip('.')
-            else:
-                total_formatted = f"{total_float:.6f}".rstrip('0').rstrip('.')
-            
-            # Format price and value
-            if price_usdc > 0:
-                price_formatted = f"${price_usdc:.6f}".rstrip('0').rstrip('.')
-                if price_formatted.endswith('$'):
-                    price_formatted = "$0"
-                value_formatted = f"${value_usdc:,.2f}"
-            else:
+        # Format numbers with commas and appropriate decimal places
+        if total_float >= 1:
+            total_formatted = f"{total_float:,.2f}".rstrip('0').rstrip('.')
+        else:
+            total_formatted = f"{total_float:.6f}".rstrip('0').rstrip('.')
+        
+        # Format price and value
+        if price_usdc > 0:
+            price_formatted = f"${price_usdc:.6f}".rstrip('0').rstrip('.')
+            if price_formatted.endswith('$'):
                 price_formatted = "$0"
-                value_formatted = "$0.00"
-            
-            # Create the line with asset ID
-            line = f"{coin} ({asset_id}) bal {total_formatted}"
-            
-            if hold_float > 0:
-                if hold_float >= 1:
-                    hold_formatted = f"{hold_float:,.2f}".rstrip('0').rstrip('.')
-                else:
-                    hold_formatted = f"{hold_float:.6f}".rstrip('0').rstrip('.')
-                line += f" (hold: {hold_formatted})"
-            
-            # Add price and value info
-            if price_usdc > 0:
-                line += f" @ {price_formatted} = {value_formatted}"
+            value_formatted = f"${value_usdc:,.2f}"
+        else:
+            price_formatted = "$0"
+            value_formatted = "$0.00"
+        
+        # Create the line with asset ID
+        line = f"{coin} ({asset_id}) bal {total_formatted}"
+        
+        if hold_float > 0:
+            if hold_float >= 1:
+                hold_formatted = f"{hold_float:,.2f}".rstrip('0').rstrip('.')
             else:
-                line += f" @ {price_formatted} = {value_formatted} (no price data)"
-            
-            result_text += line + "\n"
+                hold_formatted = f"{hold_float:.6f}".rstrip('0').rstrip('.')
+            line += f" (hold: {hold_formatted})"
         
-        except (ValueError, TypeError):
-            result_text += f"{coin} ({asset_id}) bal {total}\n"
+        # Add price and value info
+        if price_usdc > 0:
+            line += f" @ {price_formatted} = {value_formatted}"
+        else:
+            line += f" @ {price_formatted} = {value_formatted} (no price data)"
+        
+        result_text += line + "\n"
     
     # Add total portfolio value
     result_text += "\n" + "=" * 60 + "\n"
@@ -397,6 +1848,7 @@ def format_spot_balances(balances):
     result_text += "\n</pre>"
     return result_text
                 
+@traced('orders')
 def get_open_orders(user_address):
     """Get open orders for a user"""
     orders, error = make_api_request("openOrders", user_address)
@@ -411,34 +1863,445 @@ def get_open_orders(user_address):
 
 def get_coin(symbol):
     """Convert symbol to coin name"""
-    symbol_to_coin = {
-        "@153": "FUSD",
-        "@166": "USDT0", 
-        "@180": "USDHL",
-        "@107": "HYPE"
-    }
-    return symbol_to_coin.get(symbol, symbol)  # Return original symbol if not found
+    return get_token_registry().coin_name(symbol)  # Return original symbol if not found
 
 def get_coin_symbol(coin_name):
     """Convert coin name to symbol"""
-    coin_to_symbol = {
-        "FUSD": "@153",
-        "USDT0": "@166", 
-        "USDHL": "@180",
-        "HYPE": "@107"
+    return get_token_registry().market_id(coin_name)
+
+# Open-order mirror configuration
+ORDER_MIRROR_RECONCILE_INTERVAL = 30  # seconds between openOrders checks of every mirrored address
+ORDER_MIRROR_IDLE_TIMEOUT = 600  # seconds a mirror nobody reads or streams is kept
+
+def _order_state(order: Dict) -> Tuple:
+    """The fields of a raw order that must match the exchange's copy"""
+    try:
+        return order.get('coin'), order.get('side'), float(order.get('limitPx') or 0), float(order.get('sz') or 0)
+    except (ValueError, TypeError):
+        return order.get('coin'), order.get('side'), order.get('limitPx'), order.get('sz')
+
+class OrderMirror:
+    """
+    In-memory open orders of one address, as raw openOrders dicts keyed by oid.
+    
+    Seeded from openOrders on first read, then updated straight from our own
+    order and cancel responses and from fills and order updates while an
+    order feed streams them. reconcile() compares the mirror with openOrders,
+    counts every difference in hl_order_mirror_drift_total and adopts the
+    exchange's view, except for orders changed locally while the openOrders
+    request was in flight (every local change bumps a sequence number), which
+    are newer than its answer. Subscribers get (oid, status, order_or_None)
+    changes.
+    """
+    
+    def __init__(self, address):
+        self.address = address
+        self._lock = threading.Lock()
+        self._seed_lock = threading.Lock()
+        self._reconcile_lock = threading.Lock()
+        self._orders: Dict[int, Dict] = {}
+        self._sequence = 0
+        self._touched: Dict[int, int] = {}  # oid -> sequence of its last local change
+        self._subscribers: List[Callable] = []
+        self.seeded = False
+        self.reconciled_at = 0.0
+        self.last_used = time.monotonic()
+        self.drift = 0
+    
+    def subscribe(self, callback: Callable):
+        with self._lock:
+            self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback: Callable):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+    
+    def has_subscribers(self) -> bool:
+        with self._lock:
+            return bool(self._subscribers)
+    
+    def _touch(self, oid):
+        """Record a local change to oid; the caller holds self._lock"""
+        self._sequence += 1
+        self._touched[oid] = self._sequence
+    
+    def _notify(self, changes):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(changes)
+    
+    def open_orders(self) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """
+        Current open orders from memory, seeding the mirror first if needed.
+        
+        Returns:
+            Tuple of (orders, error_message); orders is None only on error
+        """
+        self.last_used = time.monotonic()
+        if not self.seeded:
+            with self._seed_lock:
+                if not self.seeded:
+                    error = self.reconcile()
+                    if error:
+                        return None, error
+        with self._lock:
+            return list(self._orders.values()), None
+    
+    def reconcile(self) -> Optional[str]:
+        """Replace the mirror with openOrders, counting and publishing every difference; returns an error or None"""
+        with self._reconcile_lock:
+            with self._lock:
+                started = self._sequence
+            orders, has_orders, error = get_open_orders(self.address)
+            if error and error != "No open orders found":
+                print(f"Error reconciling open orders for {self.address}: {error}")
+                return error
+            fresh = {order.get('oid'): order for order in orders or []}
+            with self._lock:
+                previous = self._orders
+                # Orders we placed, cancelled or saw filled after the request went out keep their local state
+                for oid, sequence in self._touched.items():
+                    if sequence <= started:
+                        continue
+                    if oid in previous:
+                        fresh[oid] = previous[oid]
+                    else:
+                        fresh.pop(oid, None)
+                self._touched = {oid: sequence for oid, sequence in self._touched.items() if sequence > started}
+                self._orders = fresh
+                seeded, self.seeded = self.seeded, True
+                self.reconciled_at = time.monotonic()
+        
+        changes = []
+        drift = {'missing': 0, 'extra': 0, 'changed': 0}
+        for oid, order in fresh.items():
+            if oid not in previous:
+                drift['missing'] += 1
+                changes.append((oid, 'open', order))
+            elif _order_state(previous[oid]) != _order_state(order):
+                drift['changed'] += 1
+                changes.append((oid, 'open', order))
+        for oid in previous.keys() - fresh.keys():
+            drift['extra'] += 1
+            changes.append((oid, 'closed', None))
+        
+        # The seed itself is not drift; anything found after it is
+        if seeded and changes:
+            for kind, count in drift.items():
+                if count:
+                    ORDER_MIRROR_DRIFT.labels(kind).inc(count)
+            self.drift += len(changes)
+        if changes:
+            self._notify(changes)
+        return None
+    
+    def opened(self, order: Dict):
+        """Record an order that is now resting on the book"""
+        oid = order.get('oid')
+        with self._lock:
+            self._orders[oid] = order
+            self._touch(oid)
+        self._notify([(oid, 'open', order)])
+    
+    def closed(self, oid, status='canceled'):
+        """Drop an order that was cancelled, filled or rejected"""
+        with self._lock:
+            known = self._orders.pop(oid, None) is not None
+            self._touch(oid)
+        if known:
+            self._notify([(oid, status, None)])
+    
+    def filled(self, oid, size):
+        """Take a fill of size off an order's remaining size"""
+        with self._lock:
+            order = self._orders.get(oid)
+            if order is None:
+                return
+            self._touch(oid)
+            remaining = float(order.get('sz') or 0) - float(size or 0)
+            if remaining > 0:
+                order = self._orders[oid] = dict(order, sz=str(remaining))
+            else:
+                del self._orders[oid]
+                order = None
+        self._notify([(oid, 'open', order) if order is not None else (oid, 'filled', None)])
+    
+    def status(self) -> Dict:
+        with self._lock:
+            count = len(self._orders)
+        return {
+            'address': self.address,
+            'seeded': self.seeded,
+            'orders': count,
+            'seconds_since_reconcile': time.monotonic() - self.reconciled_at if self.seeded else None,
+            'drift': self.drift,
+            'streaming': self.has_subscribers()
+        }
+
+class OrderReconciler:
+    """
+    Background thread that reconciles every mirror each ORDER_MIRROR_RECONCILE_INTERVAL
+    seconds and forgets mirrors nobody has used for ORDER_MIRROR_IDLE_TIMEOUT.
+    """
+    
+    def __init__(self, interval=ORDER_MIRROR_RECONCILE_INTERVAL, idle_timeout=ORDER_MIRROR_IDLE_TIMEOUT):
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._started = False
+        self.reconciles = 0
+    
+    def start(self):
+        with self._lock:
+            if self._started or self.interval <= 0:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="hl-order-reconciler", daemon=True).start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            with _order_mirrors_lock:
+                for key, mirror in list(_order_mirrors.items()):
+                    if now - mirror.last_used > self.idle_timeout and not mirror.has_subscribers():
+                        del _order_mirrors[key]
+                mirrors = list(_order_mirrors.values())
+            for mirror in mirrors:
+                if not mirror.seeded:
+                    continue
+                try:
+                    mirror.reconcile()
+                    self.reconciles += 1
+                except Exception as e:
+                    print(f"Error reconciling open orders for {mirror.address}: {e}")
+
+_order_mirrors: Dict[str, OrderMirror] = {}
+_order_mirrors_lock = threading.Lock()
+order_reconciler = OrderReconciler()
+
+def get_order_mirror(address) -> OrderMirror:
+    """Return the open-order mirror for address (case-insensitive), creating it on first use"""
+    key = address.lower()
+    with _order_mirrors_lock:
+        mirror = _order_mirrors.get(key)
+        if mirror is None:
+            mirror = _order_mirrors[key] = OrderMirror(address)
+    order_reconciler.start()
+    return mirror
+
+def order_from_request(order: Dict, oid) -> Dict:
+    """Raw openOrders-shaped dict for an order we just placed"""
+    size = str(float(order['size']))
+    return {
+        'coin': order['coin'],
+        'side': 'B' if order['buy_or_sell'] else 'A',
+        'limitPx': str(float(order['price'])),
+        'sz': size,
+        'oid': oid,
+        'timestamp': int(time.time() * 1000),
+        'origSz': size,
+        'cloid': order.get('cloid'),
     }
-    return coin_to_symbol.get(coin_name, coin_name)
+
+def mirror_order_results(address, orders: List[Dict], results: List[Tuple[bool, object]]):
+    """Add the orders the exchange says are resting to address's mirror"""
+    mirror = get_order_mirror(address)
+    for order, (success, status) in zip(orders, results):
+        if success and isinstance(status, dict) and 'resting' in status:
+            mirror.opened(order_from_request(order, status['resting'].get('oid')))
+
+def mirror_cancel_results(address, oids: List[int], results: List[Tuple[bool, object]]):
+    """
+    Drop cancelled orders from address's mirror. A cancel the exchange refuses
+    because the order was already cancelled or filled means it is gone too.
+    """
+    mirror = get_order_mirror(address)
+    for oid, (success, status) in zip(oids, results):
+        if success or 'already canceled, or filled' in str(status):
+            mirror.closed(oid, 'canceled' if success else 'closed')
+
+# Order stream configuration
+ORDER_FEED_IDLE_TIMEOUT = 60  # seconds an address feed outlives its last browser tab
+ORDER_FEED_QUEUE_SIZE = 256  # events buffered per browser tab before it gets a fresh snapshot
+SSE_HEARTBEAT_INTERVAL = 15  # seconds between keep-alive comments on idle streams
+
+# SSE streams and status long-polls hold a worker thread for as long as they
+# are open; past this many per worker they get a 503 so ordinary requests
+# still find a free thread. 0 means half the worker's threads under gunicorn
+# and no cap on the development server.
+MAX_PARKED_REQUESTS = int(os.environ.get("HL_MAX_PARKED", "0"))
+PARKED_RETRY_AFTER = 15  # seconds a refused stream or long-poll is told to wait
+
+def limit_parked_requests(threads=None):
+    """Cap this worker's open streams and long-polls, leaving threads for everything else"""
+    global _parked_slots
+    limit = MAX_PARKED_REQUESTS or (max(threads // 2, 1) if threads else 0)
+    _parked_slots = threading.BoundedSemaphore(limit) if limit else None
+
+def park_request() -> bool:
+    """Take a parked-request slot; False when the worker has none left"""
+    return _parked_slots is None or _parked_slots.acquire(blocking=False)
+
+def unpark_request():
+    """Give back a slot taken by park_request"""
+    if _parked_slots is not None:
+        _parked_slots.release()
+
+def parked_requests_full():
+    """503 for a stream or long-poll refused because every parked slot is taken"""
+    PARKED_REFUSED.inc()
+    response = jsonify({'success': False, 'error': 'Too many open streams and long-polls on this server, retry shortly'})
+    response.headers['Retry-After'] = str(PARKED_RETRY_AFTER)
+    return response, 503
+
+limit_parked_requests()
+
+class OrderFeed:
+    """
+    Live open-order stream for one address, shared by every browser tab watching it.
+    
+    The orderUpdates and userFills subscriptions keep the address's
+    OrderMirror current (and it is reconciled again after every reconnect);
+    mirror changes are pushed to each listener queue as small diffs.
+    orderUpdates messages do not name the user, so every address gets its
+    own WebSocket connection.
+    """
+    
+    def __init__(self, address):
+        self.address = address
+        self.mirror = get_order_mirror(address)
+        self.stream = HyperliquidStream(name=f"hl-ws-orders-{address[:10]}")
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()  # held through the first resync, so callers wait for it
+        self._started = False
+        self._listeners: List[queue.Queue] = []
+        self._reap_timer = None
+    
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+            self.mirror.subscribe(self._on_mirror_changes)
+            self.stream.subscribe({"type": "orderUpdates", "user": self.address}, "orderUpdates", self._on_order_updates)
+            self.stream.subscribe({"type": "userFills", "user": self.address}, "userFills", self._on_user_fills)
+            self.resync()
+            self.stream.on_connect(self.resync)
+            self.stream.start()
+    
+    def stop(self):
+        with self._start_lock:
+            self.stream.stop()
+            self.mirror.unsubscribe(self._on_mirror_changes)
+    
+    def resync(self):
+        """Reconcile the mirror with openOrders; whatever changed while we were not listening gets pushed"""
+        self.mirror.reconcile()
+    
+    def snapshot_event(self) -> Dict:
+        orders, error = self.mirror.open_orders()
+        return {'type': 'snapshot', 'address': self.address, 'orders': build_order_records(orders)}
+    
+    def listen(self) -> queue.Queue:
+        """Register a browser tab; its queue starts with a full snapshot"""
+        listener = queue.Queue(maxsize=ORDER_FEED_QUEUE_SIZE)
+        listener.put(self.snapshot_event())
+        with self._lock:
+            self._listeners.append(listener)
+            if self._reap_timer is not None:
+                self._reap_timer.cancel()
+                self._reap_timer = None
+        return listener
+    
+    def unlisten(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+            if not self._listeners and self._reap_timer is None:
+                self._reap_timer = threading.Timer(ORDER_FEED_IDLE_TIMEOUT, release_order_feed, args=(self,))
+                self._reap_timer.daemon = True
+                self._reap_timer.start()
+    
+    def has_listeners(self):
+        with self._lock:
+            return bool(self._listeners)
+    
+    def _broadcast(self, event):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener.put_nowait(event)
+            except queue.Full:
+                # A tab that fell this far behind just gets the current state again
+                with listener.mutex:
+                    listener.queue.clear()
+                listener.put_nowait(self.snapshot_event())
+    
+    def _on_mirror_changes(self, changes):
+        for oid, status, order in changes:
+            record = build_order_records([order])[0] if order is not None else None
+            self._broadcast({'type': 'order', 'oid': oid, 'status': status, 'order': record})
+    
+    def _on_order_updates(self, updates):
+        for update in updates or []:
+            order = update.get('order', {})
+            if update.get('status') == 'open':
+                self.mirror.opened(order)
+            else:
+                self.mirror.closed(order.get('oid'), update.get('status'))
+    
+    def _on_user_fills(self, data):
+        if not data or data.get('isSnapshot'):
+            return  # the first message replays historical fills
+        for fill in data.get('fills', []):
+            self._broadcast({'type': 'fill', 'oid': fill.get('oid'), 'fill': fill})
+            self.mirror.filled(fill.get('oid'), fill.get('sz'))
+
+_order_feeds: Dict[str, OrderFeed] = {}
+_order_feeds_lock = threading.Lock()
+
+def get_order_feed(address) -> OrderFeed:
+    """Return the shared order feed for address, starting it on first use"""
+    # Keyed like the mirrors, so tabs using different checksum casing share one feed
+    with _order_feeds_lock:
+        feed = _order_feeds.get(address.lower())
+        if feed is None:
+            feed = _order_feeds[address.lower()] = OrderFeed(address)
+    # The first resync goes to the network; only callers for this address wait on it
+    feed.start()
+    return feed
+
+def release_order_feed(feed: OrderFeed):
+    """Close an address feed once no browser tab has been listening for a while"""
+    with _order_feeds_lock:
+        if feed.has_listeners() or _order_feeds.get(feed.address.lower()) is not feed:
+            return
+        del _order_feeds[feed.address.lower()]
+    feed.stop()
 
 async def cancel_order(coin, oid):
     print(f"DEBUG: Attempting to cancel order - Coin: {coin}, OID: {oid}")
-    address, info, exchange = example_utils_3.setup(base_url=constants.MAINNET_API_URL, skip_ws=True)
+    address, info, exchange = await run_blocking(get_exchange_client)
     
     try:
         # Convert oid to integer as it might be expected as a number, not string
         oid_int = int(oid)
-        print(f"DEBUG: Calling exchange.cancel with coin='{coin}', oid={oid_int} (converted to int)")
-        cancel_result = exchange.cancel(coin, oid_int)
+        print(f"DEBUG: Cancelling with coin='{coin}', oid={oid_int} (converted to int)")
+        try:
+            cancel_result = await post_signed_action("cancel", exchange, cancel_action(exchange, [{"coin": coin, "oid": oid_int}]))
+        except KeyError:
+            address, info, exchange = await run_blocking(get_exchange_client, refresh=True)
+            cancel_result = await post_signed_action("cancel", exchange, cancel_action(exchange, [{"coin": coin, "oid": oid_int}]))
         print(f"DEBUG: Cancel result: {cancel_result}")
+        mirror_cancel_results(address, [oid_int], split_bulk_result(cancel_result, 1))
+        balance_cache.expire(address)  # the cancelled order's hold is released
         return True, f"Order cancelled successfully: {cancel_result}"
         
     except ValueError as ve:
@@ -453,471 +2316,723 @@ async def cancel_order(coin, oid):
 def run_async_cancel(coin, oid):
     """Wrapper to run async cancel function"""
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        success, result = loop.run_until_complete(cancel_order(coin, oid))
-        loop.close()
-        return success, result
+        return runtime.run(cancel_order(coin, oid))
     except Exception as e:
         return False, f"Error running cancel function: {str(e)}"
 
-@app.route('/')
-def index():
-    """Main page"""
-    html_template = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Hyperliquid Trading Interface</title>
-    <link rel="stylesheet" href="/static/style.css">
-    <style>
-        /* Additional styles for the order form */
-        .order-form {
-            background: linear-gradient(135deg, #e6f3ff, #f0f8ff);
-            border: 2px solid #4a90e2;
-            border-radius: 15px;
-            padding: 20px;
-            margin: 15px 0;
-        }
-        
-        .order-form h3 {
-            color: #2c5282;
-            margin-bottom: 15px;
-            text-align: center;
-        }
-        
-        .form-row {
-            display: flex;
-            gap: 15px;
-            margin-bottom: 15px;
-        }
-        
-        .form-row .form-group {
-            flex: 1;
-            margin-bottom: 0;
-        }
-        
-        .order-type-group {
-            display: flex;
-            gap: 10px;
-            margin-bottom: 15px;
-        }
-        
-        .order-type-group label {
-            flex: 1;
-            text-align: center;
-            padding: 10px;
-            border: 2px solid #e2e8f0;
-            border-radius: 8px;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            background: white;
-        }
-        
-        .order-type-group input[type="radio"] {
-            display: none;
-        }
-        
-        .order-type-group input[type="radio"]:checked + span {
-            background: #4a90e2;
-            color: white;
-            font-weight: bold;
-        }
-        
-        .buy-order {
-            border-color: #48bb78 !important;
-        }
-        
-        .buy-order input[type="radio"]:checked + span {
-            background: #48bb78 !important;
-        }
-        
-        .sell-order {
-            border-color: #f56565 !important;
-        }
-        
-        .sell-order input[type="radio"]:checked + span {
-            background: #f56565 !important;
-        }
-        
-        .btn.place-order {
-            background: linear-gradient(135deg, #4a90e2, #357abd);
-            font-size: 1.1rem;
-            padding: 16px 25px;
-            margin-top: 10px;
-        }
+def parse_order_request(data) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Validate the coin/buy_or_sell/size/price/cloid fields of an order request.
+    
+    Returns:
+        Tuple of (order_dict, error_message); exactly one of them is None
+    """
+    if not isinstance(data, dict):
+        return None, 'Order must be an object'
+    
+    coin = data.get('coin')  # This will be @153, @166, etc.
+    buy_or_sell = data.get('buy_or_sell')  # True for buy, False for sell
+    size = data.get('size')
+    price = data.get('price')
+    
+    if coin is None or buy_or_sell is None or size is None or price is None:
+        return None, 'All fields (coin, buy_or_sell, size, price) are required'
+    
+    try:
+        size = float(size)
+        price = float(price)
+    except (ValueError, TypeError):
+        return None, 'Size and price must be valid numbers'
+    
+    if size <= 0 or price <= 0:
+        return None, 'Size and price must be greater than 0'
+    
+    cloid = data.get('cloid')
+    if cloid is not None:
+        try:
+            cloid = Cloid.from_str(cloid).to_raw()
+        except Exception:
+            return None, 'cloid must be a 0x-prefixed 16-byte hex string'
+    
+    return {'coin': coin, 'buy_or_sell': bool(buy_or_sell), 'size': size, 'price': price, 'cloid': cloid}, None
+
+# Pre-trade validation configuration
+MIN_ORDER_NOTIONAL = 10.0  # USDC; the exchange rejects smaller spot orders
+BALANCE_MAX_AGE = 10  # seconds a balance snapshot is trusted before an order check fetches a new one
+
+class BalanceCache:
+    """
+    Available (total - hold) balance per coin, for each address, as of the
+    last get_spot_asset_balances call.
+    
+    Orders accepted since a snapshot's request went out are reserved against
+    it by cloid, so a burst of orders can't spend the same balance twice; an
+    order the exchange rejects gives its reservation back. A snapshot older
+    than max_age is not trusted: available() fetches a new one first, and
+    returns None (no check) if that fails.
+    """
+    
+    def __init__(self, max_age=BALANCE_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._balances: Dict[str, Tuple[float, Dict[str, float]]] = {}
+        self._reserved: Dict[str, List[Tuple[float, str, float, str]]] = {}  # (time, coin, amount, cloid) per address
+    
+    def update(self, address, balances: List[Dict], fetched_at=None):
+        """Replace address's snapshot with balances requested at fetched_at (time.monotonic())"""
+        available = {}
+        for balance in balances:
+            try:
+                available[balance.get('coin')] = float(balance.get('total') or 0) - float(balance.get('hold') or 0)
+            except (ValueError, TypeError):
+                pass
+        key = address.lower()
+        fetched_at = time.monotonic() if fetched_at is None else fetched_at
+        with self._lock:
+            self._balances[key] = (time.monotonic(), available)
+            # Orders placed before the request went out are in its holds now
+            self._reserved[key] = [reserved for reserved in self._reserved.get(key, []) if reserved[0] > fetched_at]
+    
+    def reserve(self, address, coin, amount, cloid):
+        """Take amount of coin off address's balance until a newer snapshot includes the order's hold"""
+        with self._lock:
+            self._reserved.setdefault(address.lower(), []).append((time.monotonic(), coin, amount, cloid))
+    
+    def release(self, cloid):
+        """Give back what the order with cloid reserved; it was rejected, so it holds nothing"""
+        with self._lock:
+            for key, reserved in self._reserved.items():
+                self._reserved[key] = [entry for entry in reserved if entry[3] != cloid]
+    
+    def expire(self, address):
+        """Make the next check fetch address's balances, e.g. because a cancel released holds"""
+        key = address.lower()
+        with self._lock:
+            entry = self._balances.get(key)
+            if entry is not None:
+                self._balances[key] = (0.0, entry[1])
+    
+    def available(self, address) -> Optional[Dict[str, float]]:
+        """{coin: available} for address less reservations, or None if no recent balances can be had"""
+        key = address.lower()
+        with self._lock:
+            entry = self._balances.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.max_age:
+            get_spot_asset_balances(address)
+            with self._lock:
+                entry = self._balances.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.max_age:
+                return None
         
-        .btn.place-order:hover {
-            box-shadow: 0 10px 20px rgba(74, 144, 226, 0.3);
-        }
+        available = dict(entry[1])
+        with self._lock:
+            for _, coin, amount, _ in self._reserved.get(key, []):
+                available[coin] = available.get(coin, 0.0) - amount
+        return available
+
+balance_cache = BalanceCache()
+
+def validate_orders(orders: List[Dict], address=None) -> List[Optional[str]]:
+    """
+    Check and round parsed orders locally, before anything is signed.
+    
+    Prices are rounded to the market's tick and sizes down to its lot size,
+    in place; the rounded order must still be worth MIN_ORDER_NOTIONAL.
+    Against recent balances of address, the orders together may not spend
+    more than is available: buys spend the quote token, sells the base token.
+    When every order passes, each one's spend is reserved in balance_cache
+    under its cloid. Markets the registry does not know are left to the
+    exchange.
+    
+    Returns:
+        One error message, or None, per order
+    """
+    registry = get_token_registry()
+    available = balance_cache.available(address) if address else None
+    spent: Dict[str, float] = {}
+    reservations = []
+    errors = []
+    for order in orders:
+        market = registry.markets.get(order['coin'])
+        if market is None:
+            errors.append(None)
+            continue
         
-        .collapsible {
-            cursor: pointer;
-            user-select: none;
-        }
+        order['price'] = registry.round_price(order['coin'], order['price'])
+        order['size'] = registry.round_size(order['coin'], order['size'])
+        if order['size'] <= 0:
+            errors.append(f"Size is below the lot size of {10 ** -market['sz_decimals']:g}")
+            continue
+        notional = order['size'] * order['price']
+        if market['quote_index'] == 0 and notional < MIN_ORDER_NOTIONAL:
+            errors.append(f"Order value ${notional:.2f} is below the ${MIN_ORDER_NOTIONAL:g} minimum")
+            continue
         
-        .collapsible:hover {
-            background: rgba(102, 126, 234, 0.1);
+        if available is not None:
+            token = registry.tokens.get(market['quote_index'] if order['buy_or_sell'] else market['token_index'], {}).get('name')
+            needed = notional if order['buy_or_sell'] else order['size']
+            balance = available.get(token, 0.0) - spent.get(token, 0.0)
+            if token is not None and needed > balance + 1e-9:
+                errors.append(f"Insufficient {token}: order needs {needed:g}, {max(balance, 0.0):g} available")
+                continue
+            if token is not None:
+                spent[token] = spent.get(token, 0.0) + needed
+                reservations.append((token, needed, order.get('cloid')))
+        errors.append(None)
+    
+    if not any(errors):
+        for token, amount, cloid in reservations:
+            balance_cache.reserve(address, token, amount, cloid)
+    return errors
+
+def split_bulk_result(bulk_result, count) -> List[Tuple[bool, object]]:
+    """Split a bulk order/cancel response into one (success, status_or_error) pair per request"""
+    if not isinstance(bulk_result, dict) or bulk_result.get('status') != 'ok':
+        return [(False, order_result_error(bulk_result))] * count
+    
+    statuses = bulk_result.get('response', {}).get('data', {}).get('statuses', [])
+    results = []
+    for i in range(count):
+        status = statuses[i] if i < len(statuses) else None
+        if status is None:
+            results.append((False, 'No status returned by the exchange'))
+        elif isinstance(status, dict) and 'error' in status:
+            results.append((False, status['error']))
+        else:
+            results.append((True, status))
+    return results
+
+async def make_orders(orders: List[Dict]) -> List[Tuple[bool, object]]:
+    """
+    Place several orders with one signed bulk order action.
+    
+    Every order gets a cloid (generated if missing) so a caller that sees a
+    connection error can find out what landed. There is no automatic retry.
+    """
+    address, info, exchange = await run_blocking(get_exchange_client)
+    order_requests = [
+        {
+            "coin": order['coin'],
+            "is_buy": order['buy_or_sell'],
+            "sz": order['size'],
+            "limit_px": order['price'],
+            "order_type": {"limit": {"tif": "Gtc"}},
+            "reduce_only": False,
+            "cloid": Cloid.from_str(order['cloid']),
         }
+        for order in orders
+    ]
+    
+    try:
+        try:
+            bulk_result = await post_signed_action("bulk_order", exchange, order_action(exchange, order_requests))
+        except KeyError:
+            address, info, exchange = await run_blocking(get_exchange_client, refresh=True)
+            bulk_result = await post_signed_action("bulk_order", exchange, order_action(exchange, order_requests))
+    except Exception as e:
+        print(f"Error placing {len(orders)} orders: {e}")
+        return [(False, f"Failed to place orders: {str(e)}")] * len(orders)
+    
+    results = split_bulk_result(bulk_result, len(orders))
+    mirror_order_results(address, orders, results)
+    for order, (success, _) in zip(orders, results):
+        if not success:
+            balance_cache.release(order['cloid'])
+    return results
+
+async def cancel_orders(cancels: List[Dict]) -> List[Tuple[bool, object]]:
+    """Cancel several orders with one signed bulk cancel action; cancels are dicts with coin and oid"""
+    address, info, exchange = await run_blocking(get_exchange_client)
+    cancel_requests = [{"coin": cancel['coin'], "oid": int(cancel['oid'])} for cancel in cancels]
+    
+    try:
+        try:
+            bulk_result = await post_signed_action("bulk_cancel", exchange, cancel_action(exchange, cancel_requests))
+        except KeyError:
+            address, info, exchange = await run_blocking(get_exchange_client, refresh=True)
+            bulk_result = await post_signed_action("bulk_cancel", exchange, cancel_action(exchange, cancel_requests))
+    except Exception as e:
+        print(f"Error cancelling {len(cancels)} orders: {e}")
+        return [(False, f"Failed to cancel orders: {str(e)}")] * len(cancels)
+    
+    results = split_bulk_result(bulk_result, len(cancels))
+    mirror_cancel_results(address, [cancel['oid'] for cancel in cancel_requests], results)
+    balance_cache.expire(address)  # the cancelled orders' holds are released
+    return results
+
+def batch_response(items, results):
+    """Attach each (success, status_or_error) result to its request item"""
+    response = []
+    for item, (success, outcome) in zip(items, results):
+        entry = dict(item, success=success)
+        entry['status' if success else 'error'] = outcome
+        response.append(entry)
+    return response
+
+# Portfolio history configuration
+DATA_DIR = os.path.join(os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_DATA_HOME")
+                        or os.path.expanduser(os.path.join("~", ".local", "share")), "hyperliquid-ux")
+HISTORY_DB_PATH = os.environ.get("HL_HISTORY_DB", os.path.join(DATA_DIR, "portfolio_history.db"))
+SNAPSHOT_INTERVAL = int(os.environ.get("HL_SNAPSHOT_INTERVAL", "0"))  # seconds between snapshots; 0 (default) disables them
+SNAPSHOT_ADDRESSES = [address for address in os.environ.get(
+    "HL_SNAPSHOT_ADDRESSES", f"{LEDGER_ADDRESS},{TRADE_WALLET},{DEX_WALLET}").split(",") if address]
+ROLLUP_BUCKET = 3600  # seconds; hourly OHLC rows are kept alongside the raw snapshots
+HISTORY_MAX_POINTS = 2000  # buckets per query before the bucket size is widened
+HISTORY_MAX_RAW_ROWS = 5000  # raw snapshots a query may scan before it is served from the rollup
+WALLET_TOTAL = ""  # coin key of the whole-wallet value series
+
+class HistoryStore:
+    """
+    Append-only SQLite (WAL) store of portfolio snapshots.
+    
+    Every snapshot appends one row per held coin plus a WALLET_TOTAL row per
+    wallet, and upserts the matching hourly OHLC rollup row in the same
+    transaction. Range queries read the rollup whenever the bucket is a whole
+    number of hours, so months of minute data cost a few thousand rows.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS snapshots (
+            address TEXT NOT NULL,
+            coin TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            total REAL NOT NULL,
+            hold REAL NOT NULL,
+            price REAL NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (address, coin, ts)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS snapshots_hourly (
+            address TEXT NOT NULL,
+            coin TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            open REAL NOT NULL,
+            high REAL NOT NULL,
+            low REAL NOT NULL,
+            close REAL NOT NULL,
+            samples INTEGER NOT NULL,
+            PRIMARY KEY (address, coin, bucket)
+        ) WITHOUT ROWID;
+    """
+    
+    ROLLUP_UPSERT = """
+        INSERT INTO snapshots_hourly (address, coin, bucket, open, high, low, close, samples)
+        VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+        ON CONFLICT (address, coin, bucket) DO UPDATE SET
+            high = max(high, excluded.high),
+            low = min(low, excluded.low),
+            close = excluded.close,
+            samples = samples + 1
+    """
+    
+    def __init__(self, path=HISTORY_DB_PATH):
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._write_lock:
+            conn = self._connection()
+            conn.executescript(self.SCHEMA)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside the writer"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def append(self, rows: List[Tuple[int, str, str, float, float, float, float]]):
+        """
+        Append snapshot rows in one transaction.
         
-        .order-content {
-            display: none;
-            animation: slideDown 0.3s ease;
-        }
+        Args:
+            rows: (ts, address, coin, total, hold, price, value) tuples, in time order;
+                a row repeating an (address, coin, ts) key fails the whole batch
+        """
+        if not rows:
+            return
+        with self._write_lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT INTO snapshots (ts, address, coin, total, hold, price, value) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows)
+                conn.executemany(self.ROLLUP_UPSERT,
+                                 [(address, coin, ts - ts % ROLLUP_BUCKET, value, value, value, value)
+                                  for ts, address, coin, _, _, _, value in rows])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+    
+    def record(self, ts: int, addresses: List[str], valuation: 'PortfolioValuation'):
+        """Append one snapshot of every wallet row in a valuation"""
+        rows = []
+        for i, address in enumerate(addresses):
+            for j in np.flatnonzero(valuation.held[i]).tolist():
+                rows.append((ts, address, valuation.coins[j], float(valuation.totals[i, j]), float(valuation.holds[i, j]),
+                             float(valuation.prices[j]), float(valuation.values[i, j])))
+            total = float(valuation.wallet_totals[i])
+            rows.append((ts, address, WALLET_TOTAL, total, 0.0, 1.0, total))
+        self.append(rows)
+    
+    def query(self, address, coin=WALLET_TOTAL, start=0, end=None, bucket=ROLLUP_BUCKET) -> Dict[str, List]:
+        """
+        Downsample one series into OHLC buckets of `bucket` seconds over [start, end).
         
-        .order-content.active {
-            display: block;
-        }
+        Returns:
+            Dict of equal-length columns: 't' (bucket start), 'open', 'high',
+            'low', 'close' and 'samples'
+        """
+        end = int(time.time()) + 1 if end is None else end
+        conn = self._connection()
+        if bucket % ROLLUP_BUCKET == 0:
+            cursor = conn.execute(
+                "SELECT bucket, open, high, low, close, samples FROM snapshots_hourly "
+                "WHERE address = ? AND coin = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+                (address, coin, start - start % ROLLUP_BUCKET, end))
+            rows = cursor.fetchall()
+            if not rows:
+                return self._columns([], [], [], [], [], [])
+            ts, opens, highs, lows, closes, samples = (np.array(column) for column in zip(*rows))
+        else:
+            cursor = conn.execute(
+                "SELECT ts, value FROM snapshots WHERE address = ? AND coin = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                (address, coin, start, end))
+            rows = cursor.fetchall()
+            if not rows:
+                return self._columns([], [], [], [], [], [])
+            ts, values = (np.array(column) for column in zip(*rows))
+            opens = highs = lows = closes = values
+            samples = np.ones(len(ts), dtype=np.int64)
         
-        @keyframes slideDown {
-            from { opacity: 0; transform: translateY(-10px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🚀 Hyperliquid Trading Interface</h1>
-            <p>Professional trading dashboard for Hyperliquid DEX</p>
-        </div>
-
-        <div class="main-content">
-            <div class="control-panel">
-                <h2>⚡ Control Panel</h2>
-                
-                <div class="form-group">
-                    <label>Select Wallet:</label>
-                    <div class="radio-group">
-                        <label>
-                            <input type="radio" name="wallet" value="ledger" checked>
-                            📱 Ledger
-                        </label>
-                        <label>
-                            <input type="radio" name="wallet" value="trade">
-                            💼 Trade Wallet
-                        </label>
-                        <label>
-                            <input type="radio" name="wallet" value="dex">
-                            🏦 DEX Wallet
-                        </label>
-                    </div>
-                </div>
-
-                <div class="form-group">
-                    <label for="customAddress">Custom Address:</label>
-                    <input type="text" id="customAddress" placeholder="0x..." />
-                </div>
-
-                <div class="form-group">
-                    <label>Actions:</label>
-                    <button class="btn" onclick="getOpenOrders()">📋 Get Open Orders</button>
-                    <button class="btn secondary" onclick="getAccountInfo()">💰 Get Portfolio Value</button>
-                    
-                    <!-- Collapsible Make Order Section -->
-                    <button class="btn place-order collapsible" onclick="toggleOrderForm()">🎯 Make Order</button>
-                    
-                    <div class="order-content" id="orderContent">
-                        <div class="order-form">
-                            <h3>📈 Place New Order</h3>
-                            
-                            <div class="order-type-group">
-                                <label class="buy-order">
-                                    <input type="radio" name="orderType" value="buy" checked>
-                                    <span>🟢 BUY</span>
-                                </label>
-                                <label class="sell-order">
-                                    <input type="radio" name="orderType" value="sell">
-                                    <span>🔴 SELL</span>
-                                </label>
-                            </div>
-                            
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="coinSelect">Coin:</label>
-                                    <select id="coinSelect">
-                                        <option value="@153">FUSD</option>
-                                        <option value="@166">USDT0</option>
-                                        <option value="@180">USDHL</option>
-                                        <option value="@107">HYPE</option>
-                                    </select>
-                                </div>
-                                <div class="form-group">
-                                    <label for="orderSize">Size:</label>
-                                    <input type="number" id="orderSize" placeholder="50" step="0.01" min="0.01">
-                                </div>
-                            </div>
-                            
-                            <div class="form-group">
-                                <label for="orderPrice">Price:</label>
-                                <input type="number" id="orderPrice" placeholder="1.001" step="0.001" min="0.001">
-                            </div>
-                            
-                            <button class="btn place-order" onclick="placeOrder()">⚡ Place Order</button>
-                        </div>
-                    </div>
-                    
-                    <button class="btn danger" onclick="clearResults()">🗑️ Clear Results</button>
-                </div>
-            </div>
-
-            <div class="results-panel">
-                <h2>📈 Results</h2>
-                <div class="loading" id="loading">Loading data...</div>
-                <div class="results-content" id="results">
-Welcome to Hyperliquid Trading Interface! 🎉
-================================================
-
-Default Addresses:
-🏦 Ledger: {{ ledger_address }}
-💼 Trade Wallet: {{ trade_wallet }}
-🏦 DEX Wallet: {{ dex_wallet }}
-
-Ready to trade! Select an action to begin...
-                </div>
-            </div>
-        </div>
-
-        <div class="status-bar">
-            <span id="status">Ready to trade ✨</span>
-        </div>
-    </div>
-
-    <script>
-        const LEDGER_ADDRESS = '{{ ledger_address }}';
-        const TRADE_WALLET = '{{ trade_wallet }}';
-        const DEX_WALLET = '{{ dex_wallet }}';
-        
-        function updateStatus(message) {
-            document.getElementById('status').textContent = new Date().toLocaleTimeString() + ' - ' + message;
-        }
+        # Rows are time-ordered, so each bucket is one contiguous run
+        buckets = ts // bucket * bucket
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(buckets)] - 1
+        return self._columns(buckets[starts].tolist(),
+                             opens[starts].tolist(),
+                             np.maximum.reduceat(highs, starts).tolist(),
+                             np.minimum.reduceat(lows, starts).tolist(),
+                             closes[ends].tolist(),
+                             np.add.reduceat(samples, starts).tolist())
+    
+    @staticmethod
+    def _columns(ts, opens, highs, lows, closes, samples) -> Dict[str, List]:
+        return {'t': ts, 'open': opens, 'high': highs, 'low': lows, 'close': closes, 'samples': samples}
 
-        function showLoading() {
-            document.getElementById('loading').style.display = 'block';
-            document.getElementById('results').style.display = 'none';
-        }
+_history_store: Optional[HistoryStore] = None
+_history_lock = threading.Lock()
 
-        function hideLoading() {
-            document.getElementById('loading').style.display = 'none';
-            document.getElementById('results').style.display = 'block';
-        }
+def get_history_store() -> HistoryStore:
+    """Open the shared history store on first use"""
+    global _history_store
+    if _history_store is None:
+        with _history_lock:
+            if _history_store is None:
+                _history_store = HistoryStore()
+    return _history_store
 
-        function appendResults(text) {
-            const resultsDiv = document.getElementById('results');
-            resultsDiv.innerHTML += text;
-            resultsDiv.scrollTop = resultsDiv.scrollHeight;
-        }
+def history_bucket(start, end, bucket=None) -> int:
+    """
+    Pick the bucket size for a range query.
+    
+    Buckets are widened to return at most HISTORY_MAX_POINTS of them, and
+    sub-hour buckets over ranges longer than HISTORY_MAX_RAW_ROWS snapshots
+    become hourly. Anything an hour or wider is rounded up to whole hours so
+    the rollup table serves it.
+    """
+    min_bucket = max(1, SNAPSHOT_INTERVAL or 60)  # history may come from a snapshotting worker even when this one is off
+    bucket = max(bucket or 0, min_bucket, -(-(end - start) // HISTORY_MAX_POINTS))
+    if (end - start) // min_bucket > HISTORY_MAX_RAW_ROWS or bucket >= ROLLUP_BUCKET:
+        bucket = -(-bucket // ROLLUP_BUCKET) * ROLLUP_BUCKET
+    return bucket
 
-        function setResults(text) {
-            const resultsDiv = document.getElementById('results');
-            resultsDiv.innerHTML = text;
-            resultsDiv.scrollTop = resultsDiv.scrollHeight;
-        }
+def take_snapshot(addresses: List[str] = None) -> bool:
+    """Value every snapshot wallet against one price snapshot and append it to the history"""
+    addresses = addresses or SNAPSHOT_ADDRESSES
+    balances_by_address, asset_data = fetch_portfolios(addresses)
+    if asset_data is None:
+        print("Skipping portfolio snapshot: failed to fetch market data")
+        return False
+    
+    # A wallet whose balances failed to load is skipped rather than recorded as empty
+    fetched = [address for address in addresses if balances_by_address[address] is not None]
+    valuation = value_portfolios([balances_by_address[address] for address in fetched], asset_data)
+    get_history_store().record(int(time.time()), fetched, valuation)
+    return True
 
-        function clearResults() {
-            document.getElementById('results').innerHTML = '';
-            updateStatus('Results cleared 🧹');
-        }
+class Snapshotter:
+    """
+    Background thread that calls take_snapshot every SNAPSHOT_INTERVAL seconds.
+    
+    Every server worker runs one, but only the holder of an exclusive lock on
+    the history database's lock file records; the others take over if it exits.
+    The lock is flock on POSIX and msvcrt.locking on Windows.
+    """
+    
+    def __init__(self, interval=SNAPSHOT_INTERVAL, addresses=None, lock_path=None):
+        self.interval = interval
+        self.addresses = addresses or SNAPSHOT_ADDRESSES
+        self.lock_path = lock_path or HISTORY_DB_PATH + ".lock"
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._started = False
+        self._lock_file = None
+        self.snapshots = 0
+        self.last_snapshot_time = 0.0
+    
+    def start(self):
+        with self._lock:
+            if self._started or self.interval <= 0:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="hl-snapshotter", daemon=True).start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _is_leader(self) -> bool:
+        """Try to take (or confirm we hold) the cross-process snapshot lock"""
+        if self._lock_file is not None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        lock_file = open(self.lock_path, "a")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+    
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                if self._is_leader() and take_snapshot(self.addresses):
+                    self.snapshots += 1
+                    self.last_snapshot_time = time.time()
+            except Exception as e:
+                print(f"Error taking portfolio snapshot: {e}")
+            # Keep a steady cadence regardless of how long the snapshot took
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
 
-        function toggleOrderForm() {
-            const orderContent = document.getElementById('orderContent');
-            orderContent.classList.toggle('active');
-        }
+snapshotter = Snapshotter()
 
-        function getCurrentAddress() {
-            const customAddress = document.getElementById('customAddress').value.trim();
-            if (customAddress) {
-                return customAddress;
-            }
-            
-            const selectedWallet = document.querySelector('input[name="wallet"]:checked').value;
-            if (selectedWallet === 'ledger') return LEDGER_ADDRESS;
-            if (selectedWallet === 'trade') return TRADE_WALLET;
-            if (selectedWallet === 'dex') return DEX_WALLET;
-            return LEDGER_ADDRESS;
-        }
+# Static asset caching
+STATIC_MAX_AGE = 31536000  # one year; asset URLs change whenever their content does
 
-        async function makeRequest(endpoint, address) {
-            showLoading();
-            try {
-                const response = await fetch(`/${endpoint}`, {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({ address: address })
-                });
-                
-                const data = await response.json();
-                hideLoading();
-                return data;
-            } catch (error) {
-                hideLoading();
-                return { success: false, error: 'Network error: ' + error.message };
-            }
-        }
+_asset_versions: Dict[str, str] = {}
 
-        async function placeOrder() {
-            const coin = document.getElementById('coinSelect').value;
-            const size = parseFloat(document.getElementById('orderSize').value);
-            const price = parseFloat(document.getElementById('orderPrice').value);
-            const orderType = document.querySelector('input[name="orderType"]:checked').value;
-            const buy_or_sell = orderType === 'buy';
-            
-            // Validation
-            if (!size || size <= 0) {
-                alert('Please enter a valid size');
-                return;
-            }
-            
-            if (!price || price <= 0) {
-                alert('Please enter a valid price');
-                return;
-            }
-            
-            const coinName = getCoinName(coin);
-            const orderTypeText = buy_or_sell ? 'BUY' : 'SELL';
-            
-            if (!confirm(`Place ${orderTypeText} order for ${size} ${coinName} at $${price}?`)) {
-                return;
-            }
-            
-            updateStatus(`Placing ${orderTypeText} order for ${coinName}...`);
-            appendResults(`\\n⚡ Placing ${orderTypeText} order for ${size} ${coinName} at $${price}...\\n`);
-            
-            try {
-                showLoading();
-                const response = await fetch('/make_order', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({
-                        coin: coin,
-                        buy_or_sell: buy_or_sell,
-                        size: size,
-                        price: price
-                    })
-                });
-                
-                const result = await response.json();
-                hideLoading();
-                
-                if (result.success) {
-                    updateStatus(`✅ ${orderTypeText} order placed successfully`);
-                    appendResults(`<pre>✅ ${orderTypeText} Order Placed Successfully!\\nResult: ${JSON.stringify(result.data, null, 2)}\\n</pre>`);
-                    
-                    // Clear form
-                    document.getElementById('orderSize').value = '';
-                    document.getElementById('orderPrice').value = '';
-                    
-                    // Show success popup
-                    alert(`✅ ${orderTypeText} order for ${size} ${coinName} placed successfully!`);
-                } else {
-                    updateStatus(`❌ Failed to place ${orderTypeText} order`);
-                    appendResults(`<pre>❌ Error placing order: ${result.error}\\n</pre>`);
-                    alert(`❌ Error placing order: ${result.error}`);
-                }
-            } catch (error) {
-                hideLoading();
-                updateStatus(`❌ Network error placing order`);
-                appendResults(`<pre>❌ Network error: ${error.message}\\n</pre>`);
-                alert(`❌ Network error: ${error.message}`);
-            }
-        }
+def asset_url(filename):
+    """Return the static URL for filename, versioned with a hash of its content"""
+    version = _asset_versions.get(filename)
+    if version is None:
+        with open(os.path.join(app.static_folder, filename), 'rb') as f:
+            version = hashlib.sha256(f.read()).hexdigest()[:12]
+        _asset_versions[filename] = version
+    return f"{app.static_url_path}/{filename}?v={version}"
 
-        async function getOpenOrders() {
-            const address = getCurrentAddress();
-            updateStatus(`Fetching open orders for ${address.substring(0, 10)}...`);
-            appendResults(`\\n🔍 Fetching open orders for: ${address}\\n`);
-            
-            const result = await makeRequest('get_open_orders', address);
-            
-            if (result.success) {
-                setResults(result.data);
-                updateStatus('✅ Open orders retrieved successfully');
-            } else {
-                appendResults(`<pre>❌ Error: ${result.error}\n</pre>`);
-                updateStatus('❌ Error fetching open orders');
-            }
-        }
+def build_index_page() -> Tuple[bytes, str]:
+    """
+    Render templates/index.html once.
+    
+    The only dynamic parts are the default wallet addresses, which are fixed
+    for the life of the process.
+    
+    Returns:
+        Tuple of (html_bytes, etag)
+    """
+    template = app.jinja_env.get_template('index.html')
+    html = template.render(asset_url=asset_url,
+                           ledger_address=LEDGER_ADDRESS,
+                           trade_wallet=TRADE_WALLET,
+                           dex_wallet=DEX_WALLET)
+    body = html.encode('utf-8')
+    return body, hashlib.sha256(body).hexdigest()
 
-        async function getAccountInfo() {
-            const address = getCurrentAddress();
-            updateStatus(`Fetching portfolio info for ${address.substring(0, 10)}...`);
-            appendResults(`\\n💰 Fetching portfolio info for: ${address}\\n`);
-            
-            const result = await makeRequest('get_account_info', address);
-            
-            if (result.success) {
-                setResults(result.data);
-                updateStatus('✅ Portfolio info retrieved successfully');
-            } else {
-                appendResults(`<pre>❌ Error: ${result.error}\n</pre>`);
-                updateStatus('❌ Error fetching portfolio info');
-            }
-        }
+_index_page = build_index_page()
 
-        async function cancelOrder(coin_symbol, oid) {
-            // Get the friendly name for display purposes
-            const coin_name = getCoinName(coin_symbol);
-            
-            if (!confirm(`Are you sure you want to cancel this ${coin_name} order?`)) {
-                return;
-            }
-            
-            updateStatus(`Cancelling ${coin_name} order...`);
-            
-            try {
-                const response = await fetch('/cancel_order', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({ 
-                        coin: coin_symbol,  // Pass the original symbol (@153, @166, etc.)
-                        oid: oid
-                    })
-                });
-                
-                const result = await response.json();
-                
-                if (result.success) {
-                    updateStatus(`✅ ${coin_name} order cancelled successfully`);
-                    // Show popup message
-                    alert(`✅ ${coin_name} order cancelled successfully!`);
-                    // Refresh open orders automatically
-                    setTimeout(() => getOpenOrders(), 1000);
-                } else {
-                    updateStatus(`❌ Failed to cancel ${coin_name} order`);
-                    alert(`❌ Error cancelling ${coin_name} order: ${result.error}`);
-                }
-            } catch (error) {
-                updateStatus(`❌ Network error cancelling order`);
-                alert(`❌ Network error: ${error.message}`);
-            }
-        }
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
 
-        function getCoinName(symbol) {
-            const symbolToCoin = {
-                "@153": "FUSD",
-                "@166": "USDT0", 
-                "@180": "USDHL",
-                "@107": "HYPE"
-            };
-            return symbolToCoin[symbol] || symbol;
-        }
-    </script>
-</body>
-</html>
+_profile_lock = threading.Lock()
+
+@app.before_request
+def start_profiler():
+    """Profile this request with cProfile when an admin asks for ?profile=1"""
+    if request.args.get('profile') != '1':
+        return None
+    if not ADMIN_TOKEN or not secrets.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({'success': False, 'error': 'Profiling requires a valid X-Admin-Token'}), 403
+    # One profile at a time; Python 3.12+ only allows a single active profiler anyway
+    if not _profile_lock.acquire(blocking=False):
+        return jsonify({'success': False, 'error': 'Another request is being profiled'}), 409
+    g.profiler = cProfile.Profile()
+    g.profiler.enable()
+
+@app.after_request
+def record_request_time(response):
+    """
+    Observe handler time per route pattern and report the request's spans in
+    a Server-Timing header. Streamed bodies are timed up to the first byte.
+    """
+    start = g.pop('request_start', None)
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        ROUTE_LATENCY.labels(route, request.method, response.status_code).observe(elapsed)
+        timings = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in g.pop('spans', {}).items()]
+        timings.append(f"total;dur={elapsed * 1000:.1f}")
+        response.headers['Server-Timing'] = ", ".join(timings)
+    return response
+
+@app.after_request
+def return_profile(response):
+    """Swap the response for the .prof artifact (pstats/snakeviz format) of a profiled request"""
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    profiler.disable()
+    _profile_lock.release()
+    profiler.create_stats()
+    
+    endpoint = request.endpoint or 'unmatched'
+    filename = f"profile-{endpoint}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.prof"
+    return Response(marshal.dumps(profiler.stats), mimetype='application/octet-stream',
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"',
+                             'X-Profiled-Status': str(response.status_code)})
+
+@app.teardown_request
+def stop_profiler(exc):
+    """Release the profiler if the handler raised before return_profile ran"""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        _profile_lock.release()
+
+@app.after_request
+def add_static_cache_headers(response):
+    """Let browsers keep content-versioned static assets for good"""
+    if request.path.startswith(app.static_url_path + '/') and request.args.get('v'):
+        response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}, immutable'
+    return response
+
+# Response compression and conditional requests
+COMPRESS_MIN_SIZE = 500  # bytes; smaller bodies aren't worth the CPU or the extra header
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # per-request bodies; versioned static assets get the maximum level, once
+COMPRESSIBLE_MIMETYPES = ('text/html', 'text/css', 'text/plain', 'text/javascript', 'application/javascript',
+                          'application/json', 'image/svg+xml')
+# Read-only dashboard endpoints; If-None-Match is honoured on their POSTs too
+CONDITIONAL_ENDPOINTS = {'index', 'api_get_open_orders', 'api_get_account_info', 'api_get_portfolio_summary',
+                         'api_v1_balances', 'api_v1_orders', 'api_history', 'api_tokens'}
+
+_compressed_assets: Dict[Tuple[str, str, str], bytes] = {}
+
+def accepted_encoding() -> Optional[str]:
+    """'br' (if brotli is installed) or 'gzip' when the client accepts it, else None"""
+    if brotli is not None and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def compress(data: bytes, encoding, best=False) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if best else BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9 if best else GZIP_LEVEL, mtime=0)
+
+@app.after_request
+def compress_response(response):
+    """
+    gzip or brotli text bodies for clients that accept it. Static assets are
+    compressed once per version and encoding; a strong ETag gets the encoding
+    appended, since the compressed bytes are a different representation.
     """
+    if (response.status_code != 200 or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers or request.endpoint == 'stream_orders'):
+        return response
+    static = request.endpoint == 'static'
+    if response.is_streamed and not static:
+        return response
+    response.direct_passthrough = False  # send_file hands static files over as a stream
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = accepted_encoding()
+    if encoding is None:
+        return response
     
-    return render_template_string(html_template, 
-                                ledger_address=LEDGER_ADDRESS, 
-                                trade_wallet=TRADE_WALLET,
-                                dex_wallet=DEX_WALLET)
+    etag, weak = response.get_etag()
+    if static:
+        key = (request.path, etag or '', encoding)
+        body = _compressed_assets.get(key)
+        if body is None:
+            body = _compressed_assets[key] = compress(data, encoding, best=True)
+    else:
+        body = compress(data, encoding)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+def _not_modified(etag) -> Optional[Response]:
+    """304 Not Modified if If-None-Match names etag in any encoding, else None"""
+    matched = next((tag for tag in (etag, f"{etag}-gzip", f"{etag}-br") if tag in request.if_none_match), None)
+    if matched is None:
+        return None
+    response = Response(status=304)
+    response.set_etag(matched)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+def check_not_modified(*parts) -> Optional[Response]:
+    """
+    Tag the response from what it is built of (raw upstream payloads, price
+    version, options) rather than its body, and return the 304 for a client
+    that already has it, so the view can skip valuation and formatting.
+    """
+    g.data_etag = hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    return _not_modified(g.data_etag)
+
+@app.after_request
+def add_conditional_etag(response):
+    """
+    Strong ETag on read-only dashboard data (the one check_not_modified
+    computed or the view set, else a hash of the body), and 304 Not Modified
+    when If-None-Match already names it, for POST queries as well as GETs.
+    Runs before compress_response, so it sees the plain body.
+    """
+    if request.endpoint not in CONDITIONAL_ENDPOINTS or response.status_code != 200 or response.is_streamed:
+        return response
+    if response.get_etag()[0] is None:
+        if 'data_etag' in g:
+            response.set_etag(g.data_etag)
+        else:
+            response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'  # browsers revalidate GETs with If-None-Match on their own
+    return _not_modified(response.get_etag()[0]) or response
+
+@app.route('/')
+def index():
+    """Main page"""
+    body, etag = _index_page
+    response = Response(body, mimetype='text/html')
+    response.set_etag(etag)  # revalidated through add_conditional_etag
+    return response
 
 @app.route('/get_open_orders', methods=['POST'])
 def api_get_open_orders():
@@ -929,12 +3044,18 @@ def api_get_open_orders():
         if not address:
             return jsonify({'success': False, 'error': 'Address is required'})
         
-        orders, has_orders, error = get_open_orders(address)
+        # Served from the in-memory mirror; see OrderMirror
+        orders, error = get_order_mirror(address).open_orders()
         
         if error:
             return jsonify({'success': False, 'error': error})
         
-        if has_orders:
+        # Coin names come from the token registry, so a new listing changes the page too
+        not_modified = check_not_modified(orders, len(token_registry))
+        if not_modified:
+            return not_modified
+        
+        if orders:
             result_text = f"<pre>Found {len(orders)} open order(s):\n"
             result_text += "=" * 50 + "\n\n"
             
@@ -980,53 +3101,296 @@ def api_get_account_info():
         if spot_balances is None:
             return jsonify({'success': False, 'error': 'Failed to fetch spot balances'})
         
+        # One price/mapping snapshot is shared by valuation and formatting; the
+        # version is read first, so the tag can lag the prices used but never lead them
+        version = market_data.version()
+        asset_data = get_all_asset_data() if spot_balances else None
+        not_modified = check_not_modified(spot_balances, version)
+        if not_modified:
+            return not_modified
+        
         # Format the balances with values for display
-        formatted_balances = format_spot_balances_with_values(spot_balances, address)
+        formatted_balances = format_spot_balances_with_values(spot_balances, asset_data)
         
         return jsonify({'success': True, 'data': formatted_balances})
         
     except Exception as e:
         return jsonify({'success': False, 'error': f'Server error: {str(e)}'})
 
+@app.route('/api/v1/balances', methods=['GET'])
+def api_v1_balances():
+    """
+    JSON API: typed spot balance records with USDC values for ?address=
+    
+    With ?exit=1 every record also carries what selling it into the current
+    bids would fetch (exit_value_usdc, exit_price_usdc, slippage, unfilled).
+    """
+    address = request.args.get('address')
+    exit_value = request.args.get('exit') == '1'
+    
+    if not address:
+        return jsonify({'success': False, 'error': 'Address is required'}), 400
+    
+    try:
+        spot_balances = get_spot_asset_balances(address)
+        
+        if spot_balances is None:
+            return jsonify({'success': False, 'error': 'Failed to fetch spot balances'}), 502
+        
+        version = market_data.version()
+        asset_data = get_all_asset_data() if spot_balances else None
+        if not exit_value:  # exit values depend on order books, so those responses are tagged by their body
+            not_modified = check_not_modified(address, spot_balances, version)
+            if not_modified:
+                return not_modified
+        records, total_value = build_balance_records(spot_balances, asset_data)
+        data = {
+            'address': address,
+            'balances': records,
+            'total_value_usdc': total_value,
+            'has_prices': asset_data is not None
+        }
+        if exit_value:
+            data['total_exit_value_usdc'] = add_exit_values(records, 'total')
+        
+        return jsonify({'success': True, 'data': data})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
+
+@app.route('/api/v1/orders', methods=['GET'])
+def api_v1_orders():
+    """JSON API: typed open-order records for ?address="""
+    address = request.args.get('address')
+    
+    if not address:
+        return jsonify({'success': False, 'error': 'Address is required'}), 400
+    
+    try:
+        orders, error = get_order_mirror(address).open_orders()
+        
+        if error:
+            return jsonify({'success': False, 'error': error}), 502
+        
+        not_modified = check_not_modified(address, orders, len(token_registry))
+        if not_modified:
+            return not_modified
+        
+        return jsonify({'success': True, 'data': {
+            'address': address,
+            'orders': build_order_records(orders)
+        }})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint; under serve it reports every worker's metrics combined"""
+    if not METRICS_MULTIPROCESS:
+        return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+@app.route('/api/tokens', methods=['GET'])
+def api_tokens():
+    """JSON API: tradable spot tokens with their market IDs and rounding decimals"""
+    try:
+        registry = get_token_registry()
+        return jsonify({'success': True, 'data': registry.primary_markets()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
+
+@app.route('/stream/orders', methods=['GET'])
+def stream_orders():
+    """Server-Sent Events stream of open-order diffs and fills for ?address="""
+    address = request.args.get('address')
+    
+    if not address:
+        return jsonify({'success': False, 'error': 'Address is required'}), 400
+    
+    if not park_request():
+        return parked_requests_full()
+    
+    try:
+        feed = get_order_feed(address)
+        listener = feed.listen()
+    except Exception:
+        unpark_request()
+        raise
+    
+    def events():
+        try:
+            while True:
+                try:
+                    event = listener.get(timeout=SSE_HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            feed.unlisten(listener)
+    
+    response = Response(events(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(unpark_request)
+    return response
+
+@app.route('/api/v1/info_scheduler/status', methods=['GET'])
+def api_v1_info_scheduler_status():
+    """JSON API: /info rate-limit budget, queue depth and coalescing counts"""
+    return jsonify({'success': True, 'data': info_scheduler.status()})
+
+@app.route('/api/v1/order_mirror/status', methods=['GET'])
+def api_v1_order_mirror_status():
+    """JSON API: mirrored addresses, their order counts, reconcile age and drift repaired"""
+    with _order_mirrors_lock:
+        mirrors = list(_order_mirrors.values())
+    return jsonify({'success': True, 'data': {
+        'reconcile_interval': order_reconciler.interval,
+        'reconciles': order_reconciler.reconciles,
+        'mirrors': [mirror.status() for mirror in mirrors]
+    }})
+
+@app.route('/api/v1/market_data/status', methods=['GET'])
+def api_v1_market_data_status():
+    """JSON API: health of the streaming price feed"""
+    live = market_data.live_prices
+    if live is None:
+        return jsonify({'success': True, 'data': {'enabled': PRICE_STREAM_ENABLED, 'connected': False}})
+    return jsonify({'success': True, 'data': dict(live.status(), enabled=True)})
+
+# Maximum number of wallets in one portfolio summary request
+MAX_SUMMARY_ADDRESSES = 50
+
+@app.route('/get_portfolio_summary', methods=['POST'])
+def api_get_portfolio_summary():
+    """
+    API endpoint for valuing several wallets at once, with consolidated per-coin totals.
+    
+    "include_assets": false leaves each wallet's asset list out of the response.
+    """
+    try:
+        data = request.json or {}
+        addresses = data.get('addresses') or [LEDGER_ADDRESS, TRADE_WALLET, DEX_WALLET]
+        
+        if not isinstance(addresses, list) or not all(isinstance(address, str) and address for address in addresses):
+            return jsonify({'success': False, 'error': 'addresses must be a list of wallet addresses'})
+        
+        addresses = list(dict.fromkeys(addresses))  # de-duplicate, keep order
+        if len(addresses) > MAX_SUMMARY_ADDRESSES:
+            return jsonify({'success': False, 'error': f'At most {MAX_SUMMARY_ADDRESSES} addresses per request'})
+        
+        version = market_data.version()
+        balances_by_address, asset_data = fetch_portfolios(addresses)
+        
+        if asset_data is None:
+            return jsonify({'success': False, 'error': 'Failed to fetch market data'})
+        
+        include_assets = data.get('include_assets', True)
+        if not data.get('exit_value'):
+            not_modified = check_not_modified(balances_by_address, version, include_assets)
+            if not_modified:
+                return not_modified
+        
+        summary = summarize_portfolios(balances_by_address, asset_data, include_assets)
+        if data.get('exit_value'):
+            # Coins are consolidated first, so each book is walked with the combined size
+            summary['total_exit_value_usdc'] = add_exit_values(summary['coins'], 'total_balance')
+        
+        return jsonify({'success': True, 'data': summary})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Server error: {str(e)}'})
+
+@app.route('/api/history', methods=['GET'])
+def api_history():
+    """
+    JSON API: downsampled value history for ?address=, optionally one &coin=.
+    
+    Query parameters: start/end (unix seconds, default the last 24 hours),
+    bucket (seconds, sized automatically when omitted) and mode ('ohlc' or
+    'last', which returns only each bucket's closing value).
+    """
+    address = request.args.get('address')
+    
+    if not address:
+        return jsonify({'success': False, 'error': 'Address is required'}), 400
+    
+    try:
+        now = int(time.time())
+        end = request.args.get('end', type=int) or now + 1
+        start = request.args.get('start', type=int)
+        start = end - 86400 if start is None else start
+        mode = request.args.get('mode', 'ohlc')
+        
+        if start >= end:
+            return jsonify({'success': False, 'error': 'start must be before end'}), 400
+        if mode not in ('ohlc', 'last'):
+            return jsonify({'success': False, 'error': "mode must be 'ohlc' or 'last'"}), 400
+        
+        coin = request.args.get('coin', WALLET_TOTAL)
+        bucket = history_bucket(start, end, request.args.get('bucket', type=int))
+        series = get_history_store().query(address, coin, start, end, bucket)
+        if mode == 'last':
+            series = {'t': series['t'], 'value': series['close']}
+        
+        return jsonify({'success': True, 'data': dict(series, address=address, coin=coin or None,
+                                                      start=start, end=end, bucket=bucket, mode=mode)})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
+
 @app.route('/make_order', methods=['POST'])
 def api_make_order():
     """API endpoint for making an order"""
     try:
         data = request.json
-        coin = data.get('coin')  # This will be @153, @166, etc.
-        buy_or_sell = data.get('buy_or_sell')  # True for buy, False for sell
-        size = data.get('size')
-        price = data.get('price')
         
-        print(f"DEBUG: Received order request - Coin: '{coin}', Buy: {buy_or_sell}, Size: {size}, Price: {price}")
+        print(f"DEBUG: Received order request - Coin: '{data.get('coin')}', Buy: {data.get('buy_or_sell')}, Size: {data.get('size')}, Price: {data.get('price')}")
         print(f"DEBUG: Request data: {data}")
         
         # Validation
-        if coin is None or buy_or_sell is None or size is None or price is None:
-            return jsonify({'success': False, 'error': 'All fields (coin, buy_or_sell, size, price) are required'})
-        
-        try:
-            size = float(size)
-            price = float(price)
-        except (ValueError, TypeError):
-            return jsonify({'success': False, 'error': 'Size and price must be valid numbers'})
-        
-        if size <= 0 or price <= 0:
-            return jsonify({'success': False, 'error': 'Size and price must be greater than 0'})
+        order, error = parse_order_request(data)
+        if error:
+            return jsonify({'success': False, 'error': error})
+        order['cloid'] = order['cloid'] or new_cloid()
+        error = validate_orders([order], trading_address())[0]
+        if error:
+            return jsonify({'success': False, 'error': error})
         
-        # Place the order
-        order_result = run_async_make_order(coin, buy_or_sell, size, price)
+        # Queue the order; placement and retries happen in the background
+        submission = submit_order(order['coin'], order['buy_or_sell'], order['size'], order['price'], cloid=order['cloid'])
         
-        if order_result is not None:
-            return jsonify({'success': True, 'data': order_result})
-        else:
-            return jsonify({'success': False, 'error': 'Failed to place order after multiple retries'})
+        return jsonify({'success': True, 'data': submission})
         
     except Exception as e:
         error_msg = f'Server error: {str(e)}'
         print(f"DEBUG: Exception in api_make_order: {error_msg}")
         return jsonify({'success': False, 'error': error_msg})
 
+@app.route('/order_status/<submission_id>', methods=['GET'])
+def api_order_status(submission_id):
+    """API endpoint for polling a queued order; ?wait=N long-polls up to N seconds for a final state"""
+    try:
+        wait = min(max(float(request.args.get('wait', 0)), 0.0), MAX_STATUS_WAIT)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'wait must be a number of seconds'})
+    
+    if wait and not park_request():
+        return parked_requests_full()
+    try:
+        submission = get_submission(submission_id, wait=wait)
+    finally:
+        if wait:
+            unpark_request()
+    
+    if submission is None:
+        return jsonify({'success': False, 'error': f'Unknown submission {submission_id}'})
+    
+    return jsonify({'success': True, 'data': submission})
+
 @app.route('/cancel_order', methods=['POST'])
 def api_cancel_order():
     """API endpoint for cancelling an order"""
@@ -1053,8 +3417,209 @@ def api_cancel_order():
         print(f"DEBUG: Exception in api_cancel_order: {error_msg}")
         return jsonify({'success': False, 'error': error_msg})
 
-if __name__ == '__main__':
+@app.route('/make_orders', methods=['POST'])
+def api_make_orders():
+    """API endpoint for placing a list of orders in one signed bulk request"""
+    try:
+        data = request.json
+        items = data.get('orders')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'success': False, 'error': 'orders must be a non-empty list'})
+        
+        orders = []
+        for i, item in enumerate(items):
+            order, error = parse_order_request(item)
+            if error:
+                return jsonify({'success': False, 'error': f'Order #{i + 1}: {error}'})
+            order['cloid'] = order['cloid'] or new_cloid()
+            orders.append(order)
+        
+        # Checked together, so the batch as a whole has to fit the available balances
+        for i, error in enumerate(validate_orders(orders, trading_address())):
+            if error:
+                return jsonify({'success': False, 'error': f'Order #{i + 1}: {error}'})
+        
+        results = runtime.run(make_orders(orders))
+        
+        return jsonify({'success': True, 'data': batch_response(orders, results)})
+        
+    except Exception as e:
+        error_msg = f'Server error: {str(e)}'
+        print(f"Error in api_make_orders: {e}")
+        return jsonify({'success': False, 'error': error_msg})
+
+@app.route('/cancel_orders', methods=['POST'])
+def api_cancel_orders():
+    """API endpoint for cancelling a list of orders in one signed bulk request"""
+    try:
+        data = request.json
+        items = data.get('cancels')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'success': False, 'error': 'cancels must be a non-empty list'})
+        
+        cancels = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict) or not all([item.get('coin'), item.get('oid')]):
+                return jsonify({'success': False, 'error': f'Cancel #{i + 1}: both coin and oid are required'})
+            try:
+                cancels.append({'coin': item['coin'], 'oid': int(item['oid'])})
+            except (ValueError, TypeError):
+                return jsonify({'success': False, 'error': f"Cancel #{i + 1}: invalid order ID format: {item['oid']}"})
+        
+        results = runtime.run(cancel_orders(cancels))
+        
+        return jsonify({'success': True, 'data': batch_response(cancels, results)})
+        
+    except Exception as e:
+        error_msg = f'Server error: {str(e)}'
+        print(f"Error in api_cancel_orders: {e}")
+        return jsonify({'success': False, 'error': error_msg})
+
+@app.route('/cancel_all_orders', methods=['POST'])
+def api_cancel_all_orders():
+    """API endpoint for cancelling every open order for one coin"""
+    try:
+        data = request.json
+        coin = data.get('coin')  # This will be @153, @166, etc.
+        
+        if not coin:
+            return jsonify({'success': False, 'error': 'coin is required'})
+        
+        # Orders can only be cancelled for the wallet the exchange client signs for
+        address = trading_address()
+        if data.get('address') and data['address'].lower() != address.lower():
+            return jsonify({'success': False, 'error': f'Can only cancel orders for the trading wallet {address}'})
+        
+        # The unwind action must not miss orders the mirror hasn't seen yet (other workers, other clients)
+        mirror = get_order_mirror(address)
+        error = mirror.reconcile()
+        if error:
+            return jsonify({'success': False, 'error': f'Could not load open orders: {error}'})
+        orders, error = mirror.open_orders()
+        if error:
+            return jsonify({'success': False, 'error': error})
+        
+        cancels = [{'coin': order['coin'], 'oid': order['oid']} for order in orders if order.get('coin') == coin]
+        if not cancels:
+            return jsonify({'success': True, 'data': []})
+        
+        results = runtime.run(cancel_orders(cancels))
+        
+        return jsonify({'success': True, 'data': batch_response(cancels, results)})
+        
+    except Exception as e:
+        error_msg = f'Server error: {str(e)}'
+        print(f"Error in api_cancel_all_orders: {e}")
+        return jsonify({'success': False, 'error': error_msg})
+
+# Production serving
+GUNICORN_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+WARM_UP_ON_FORK = os.environ.get("HL_WARM_UP", "1") == "1"
+
+def reset_after_fork(workers=1, nonce_slot=0):
+    """
+    Give a freshly forked worker its own connections, threads, locks and caches.
+    
+    gunicorn imports this module once in the master (preload_app) and forks
+    the workers from it; pooled sockets, executor threads and any lock held
+    at fork time must not be shared, so every worker starts from scratch.
+    The /info weight budget and the wallet's nonces are what the workers
+    still share: each gets INFO_WEIGHT_LIMIT / workers and every
+    workers-th nonce, starting at nonce_slot.
+    """
+    global info_scheduler, _info_session, _info_session_lock, _info_executor
+    global _exchange_clients, _exchange_clients_lock, runtime
+    global _submissions_lock, _submissions_changed
+    global market_data, _price_stream_lock, _order_feeds, _order_feeds_lock
+    global _history_store, _history_lock, snapshotter, _profile_lock, order_books
+    global _order_mirrors, _order_mirrors_lock, order_reconciler, balance_cache, signer
+    
+    info_scheduler = InfoScheduler(INFO_WEIGHT_LIMIT / max(workers, 1))
+    _info_session, _info_session_lock, _info_executor = None, threading.Lock(), None
+    _exchange_clients, _exchange_clients_lock = {}, threading.Lock()
+    runtime = AsyncRuntime()
+    signer = SigningService(nonce_slot=nonce_slot, nonce_slots=workers)
+    _order_submissions.clear()
+    _submissions_by_cloid.clear()
+    _submissions_lock = threading.Lock()
+    _submissions_changed = threading.Condition(_submissions_lock)
+    market_data, _price_stream_lock = MarketDataCache(), threading.Lock()
+    _order_feeds, _order_feeds_lock = {}, threading.Lock()
+    _order_mirrors, _order_mirrors_lock, order_reconciler = {}, threading.Lock(), OrderReconciler()
+    balance_cache = BalanceCache()
+    _history_store, _history_lock = None, threading.Lock()
+    snapshotter, _profile_lock = Snapshotter(), threading.Lock()
+    order_books = OrderBookCache()
+
+def warm_up():
+    """Build the exchange client and load market data so the first request doesn't pay for it"""
+    try:
+        address, info, exchange = get_exchange_client()
+        signer.start(exchange.wallet)
+        get_all_asset_data()
+        get_spot_asset_balances(address)  # seeds the pre-trade balance cache
+    except Exception as e:
+        print(f"Error warming up worker: {e}")
+
+def assign_nonce_slot(server, worker):
+    """gunicorn pre_fork hook: give the new worker the lowest nonce slot no live worker holds"""
+    taken = {getattr(live, "nonce_slot", None) for live in server.WORKERS.values()}
+    worker.nonce_slot = next(slot for slot in itertools.count() if slot not in taken)
+
+def worker_started(workers=1, threads=None, nonce_slot=0):
+    """gunicorn post_fork hook: reset inherited state, then start this worker's background work"""
+    reset_after_fork(workers, nonce_slot)
+    limit_parked_requests(threads)
+    snapshotter.start()
+    if WARM_UP_ON_FORK:
+        threading.Thread(target=warm_up, name="hl-warm-up", daemon=True).start()
+
+def serve(bind="0.0.0.0:5000", workers=2, threads=8):
+    """Serve the app under gunicorn with gunicorn.conf.py, overriding bind/workers/threads"""
+    from gunicorn.app.base import Application
+    
+    class PortfolioApplication(Application):
+        def load_config(self):
+            self.load_config_from_file(GUNICORN_CONFIG)
+            self.cfg.set("bind", [bind])
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            # Hook into this module, which is __main__ when started as `python ux.py serve`
+            self.cfg.set("pre_fork", assign_nonce_slot)
+            self.cfg.set("post_fork", lambda server, worker: worker_started(server.num_workers, server.cfg.threads,
+                                                                            worker.nonce_slot))
+        
+        def load(self):
+            return app
+    
+    PortfolioApplication().run()
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperliquid Trading Interface")
+    commands = parser.add_subparsers(dest="command")
+    dev = commands.add_parser("dev", help="Flask development server with the debugger and reloader (default)")
+    dev.add_argument("--port", type=int, default=5000)
+    serve_parser = commands.add_parser("serve", help="production server: gunicorn with preforked gthread workers")
+    serve_parser.add_argument("--bind", default=os.environ.get("HL_BIND", "0.0.0.0:5000"))
+    serve_parser.add_argument("--workers", type=int, default=int(os.environ.get("HL_WORKERS", "2")))
+    serve_parser.add_argument("--threads", type=int, default=int(os.environ.get("HL_THREADS", "8")))
+    args = parser.parse_args()
+    
+    if args.command == "serve":
+        print(f"🚀 Serving Hyperliquid Trading Interface on {args.bind} ({args.workers} workers x {args.threads} threads)")
+        serve(args.bind, args.workers, args.threads)
+        return
+    
+    port = getattr(args, "port", 5000)
     print("🚀 Starting Hyperliquid Trading Interface...")
-    print("📱 Open your browser and go to: http://localhost:5000")
+    print(f"📱 Open your browser and go to: http://localhost:{port}")
     print("🛑 Press Ctrl+C to stop the server")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # The debug reloader imports this module twice; only the serving child snapshots
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        snapshotter.start()
+    app.run(debug=True, host='0.0.0.0', port=port)
+
+if __name__ == '__main__':
+    main()